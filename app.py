@@ -4,10 +4,22 @@ from app.controllers.auth_controller import AuthController
 from app.controllers.admin_controller import AdminController
 from app.controllers.librarian_controller import LibrarianController
 from app.controllers.student_controller import StudentController
+from app.controllers.search_controller import SearchController
+from app.controllers.metrics_controller import MetricsController
+from app.utils.database import QueryProfiler
 from app.utils.db_initializer import DatabaseInitializer
+from app.models.overdue_tracker import OverdueTracker
+from app.models.reservation_queue import ReservationQueue
+from app.utils.metrics import Metrics
+from app.utils.notifications import NotificationJob
+from app.utils.scheduler import Scheduler
+from app.utils.session_store import ServerSessionInterface
 
 app = Flask(__name__, template_folder='app/views/templates', static_folder='app/views/static')
 app.config.from_object(Config)
+app.session_interface = ServerSessionInterface()
+QueryProfiler.init_app(app)
+Metrics.init_app(app)
 
 @app.route('/', methods=['GET', 'POST'])
 @app.route('/login', methods=['GET', 'POST'])
@@ -70,6 +82,18 @@ def admin_book_status():
 def admin_fines_detail():
     return AdminController.fines_detail()
 
+@app.route('/admin/query-profile')
+def admin_query_profile():
+    return AdminController.query_profile()
+
+@app.route('/admin/reports/circulation')
+def admin_circulation_reports():
+    return AdminController.circulation_reports()
+
+@app.route('/admin/reports/circulation.json')
+def admin_circulation_report_data():
+    return AdminController.circulation_report_data()
+
 @app.route('/librarian/dashboard')
 def librarian_dashboard():
     return LibrarianController.librarian_dashboard()
@@ -90,6 +114,10 @@ def librarian_book_return():
 def librarian_transaction_history():
     return LibrarianController.transaction_history()
 
+@app.route('/librarian/transaction-history/export')
+def librarian_transaction_export():
+    return LibrarianController.export_transaction_history()
+
 @app.route('/librarian/book-issue-return')
 def librarian_book_issue_return():
     return LibrarianController.book_issue_return()
@@ -102,7 +130,7 @@ def librarian_notification_system():
 def librarian_book_status():
     return LibrarianController.book_status()
 
-@app.route('/librarian/fines-management')
+@app.route('/librarian/fines-management', methods=['GET', 'POST'])
 def librarian_fines_management():
     return LibrarianController.fines_management()
 
@@ -111,8 +139,8 @@ def librarian_book_reservation():
     return LibrarianController.book_reservation()
 
 @app.route('/student/dashboard')
-def student_dashboard():
-    return StudentController.student_dashboard()
+async def student_dashboard():
+    return await StudentController.student_dashboard()
 
 @app.route('/student/book-status')
 def student_book_status():
@@ -123,13 +151,29 @@ def student_book_reservation():
     return StudentController.book_reservation()
 
 @app.route('/student/account-status')
-def student_account_status():
-    return StudentController.account_status()
+async def student_account_status():
+    return await StudentController.account_status()
 
 @app.route('/student/your-books')
 def student_your_books():
     return StudentController.your_books()
 
+@app.route('/api/books/search')
+def api_book_search():
+    return SearchController.search_books()
+
+@app.route('/metrics')
+def metrics():
+    return MetricsController.metrics()
+
+if Config.SCHEDULER_ENABLED:
+    Scheduler.every('overdue-sweep', Config.OVERDUE_SWEEP_INTERVAL,
+                    lambda: OverdueTracker.sweep(batch_size=Config.OVERDUE_SWEEP_BATCH_SIZE))
+    Scheduler.every('notifications', Config.NOTIFICATION_INTERVAL, NotificationJob.run)
+    Scheduler.every('reservation-holds', Config.RESERVATION_SWEEP_INTERVAL,
+                    lambda: ReservationQueue.expire_holds(batch_size=Config.RESERVATION_SWEEP_BATCH_SIZE))
+    Scheduler.start()
+
 if __name__ == '__main__':
     DatabaseInitializer.initialize_all()
     app.run(debug=True)
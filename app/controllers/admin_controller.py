@@ -1,7 +1,12 @@
-from flask import render_template, session, redirect, url_for, flash, request
+from datetime import date, timedelta
+from flask import render_template, session, redirect, url_for, flash, request, jsonify
 from app.models.user import User
 from app.models.book import Book
-from app.utils.database import Database
+from app.models.circulation_rollup import CirculationRollup
+from app.utils.database import Database, QueryProfiler
+from app.utils.query_batch import QueryBatch
+from app.utils.session_store import SessionStore
+from config import Config
 
 class AdminController:
     @staticmethod
@@ -188,13 +193,14 @@ class AdminController:
     
     @staticmethod
     def update_member(user_id, name, email, role, new_password=None):
+        # Hash before checking out a connection; the KDF is deliberately slow.
+        hashed_password = User.hash_password(new_password) if new_password else None
         connection = Database.get_connection()
         if connection:
             try:
                 cursor = connection.cursor()
                 
-                if new_password:
-                    hashed_password = User.hash_password(new_password)
+                if hashed_password:
                     query = "UPDATE users SET Name = %s, Email = %s, Role = %s, Password = %s WHERE UserID = %s"
                     cursor.execute(query, (name, email, role, hashed_password, user_id))
                 else:
@@ -202,6 +208,8 @@ class AdminController:
                     cursor.execute(query, (name, email, role, user_id))
                 
                 connection.commit()
+                # Signed-in sessions still carry the old role; make them log in again.
+                SessionStore.revoke_user(user_id)
                 return True
             except Exception as e:
                 print(f"Error updating member: {e}")
@@ -265,6 +273,7 @@ class AdminController:
                 query = "DELETE FROM users WHERE UserID = %s"
                 cursor.execute(query, (user_id,))
                 connection.commit()
+                SessionStore.revoke_user(user_id)
                 return cursor.rowcount > 0
             except Exception as e:
                 print(f"Error deleting member: {e}")
@@ -333,12 +342,18 @@ class AdminController:
                 
                 return redirect(url_for('admin_book_management'))
         
-        books = Book.get_all_books_with_filter(subject_filter, sort_by)
+        page = Book.get_books_page(subject_filter, sort_by,
+                                   cursor=request.args.get('cursor'),
+                                   direction=request.args.get('direction', 'next'),
+                                   page_size=request.args.get('page_size'))
         subjects = Book.get_all_subjects()
         
         return render_template('admin/book_management.html', 
                              user_name=session.get('user_name'),
-                             books=books,
+                             books=page['books'],
+                             page=page,
+                             pagination_args={'subject': subject_filter, 'sort': sort_by, 'page_size': request.args.get('page_size')},
+                             status_counts=Book.get_status_counts(),
                              subjects=subjects,
                              current_subject=subject_filter,
                              current_sort=sort_by)
@@ -349,11 +364,23 @@ class AdminController:
         if access_check:
             return access_check
         
-        books = Book.get_all_books()
+        search_text = request.args.get('q', '').strip()
+        if search_text:
+            page = Book.search_books(search_text,
+                                     cursor=request.args.get('cursor'),
+                                     page_size=request.args.get('page_size'))
+        else:
+            page = Book.get_books_page(cursor=request.args.get('cursor'),
+                                       direction=request.args.get('direction', 'next'),
+                                       page_size=request.args.get('page_size'))
         
         return render_template('admin/book_status.html', 
                              user_name=session.get('user_name'),
-                             books=books)
+                             books=page['books'],
+                             page=page,
+                             pagination_args={'q': search_text or None, 'page_size': request.args.get('page_size')},
+                             search_text=search_text,
+                             status_counts=Book.get_status_counts())
     
     @staticmethod
     def fines_detail():
@@ -362,3 +389,87 @@ class AdminController:
             return access_check
         
         return render_template('admin/fines_detail.html', user_name=session.get('user_name'))
+    
+    @staticmethod
+    def query_profile():
+        access_check = AdminController.check_admin_access()
+        if access_check:
+            return access_check
+        
+        return render_template('admin/query_profile.html',
+                             user_name=session.get('user_name'),
+                             recent_requests=QueryProfiler.recent_requests(),
+                             statements=QueryProfiler.top_statements(),
+                             threshold_ms=Config.SLOW_QUERY_THRESHOLD_MS)
+    
+    @staticmethod
+    def get_report_range():
+        today = date.today()
+        try:
+            end = date.fromisoformat(request.args.get('end', ''))
+        except ValueError:
+            end = today
+        try:
+            start = date.fromisoformat(request.args.get('start', ''))
+        except ValueError:
+            start = end - timedelta(days=29)
+        if start > end:
+            start, end = end, start
+        
+        granularity = request.args.get('granularity', 'day')
+        if granularity not in ('day', 'month', 'year'):
+            granularity = 'day'
+        return start, end, granularity
+    
+    @staticmethod
+    def get_circulation_report(start, end, granularity):
+        # Reads only the rollup tables, never issued_books or transaction.
+        batch = QueryBatch()
+        batch.add('totals', CirculationRollup.get_totals, start, end, granularity)
+        batch.add('subjects', CirculationRollup.get_by_subject, start, end)
+        batch.add('top_books', CirculationRollup.get_top_books, start, end)
+        return batch.run()
+    
+    @staticmethod
+    def circulation_reports():
+        access_check = AdminController.check_admin_access()
+        if access_check:
+            return access_check
+        
+        start, end, granularity = AdminController.get_report_range()
+        report = AdminController.get_circulation_report(start, end, granularity)
+        
+        return render_template('admin/circulation_reports.html',
+                             user_name=session.get('user_name'),
+                             start=start,
+                             end=end,
+                             granularity=granularity,
+                             totals=report['totals'],
+                             subjects=report['subjects'],
+                             top_books=report['top_books'])
+    
+    @staticmethod
+    def circulation_report_data():
+        if 'user_id' not in session or session.get('user_role') != 'Admin':
+            return jsonify({'error': 'Admin access required'}), 403
+        
+        start, end, granularity = AdminController.get_report_range()
+        report = AdminController.get_circulation_report(start, end, granularity)
+        
+        def measures(row):
+            return {
+                'issued': int(row['issued'] or 0),
+                'returned': int(row['returned'] or 0),
+                'returned_late': int(row['returned_late'] or 0),
+                'fines': float(row['fines'] or 0)
+            }
+        
+        return jsonify({
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'granularity': granularity,
+            'totals': [dict(period=row['period'].isoformat(), **measures(row)) for row in report['totals']],
+            'subjects': [dict(subject=row['subject'], **measures(row)) for row in report['subjects']],
+            'top_books': [dict(book_id=row['book_id'], title=row['title'], author=row['author'],
+                               subject=row['subject'], **measures(row)) for row in report['top_books']]
+        })
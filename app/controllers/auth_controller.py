@@ -1,5 +1,6 @@
 from flask import render_template, request, redirect, url_for, session, flash
 from app.models.user import User
+from app.models.book import Book
 
 class AuthController:
     @staticmethod
@@ -99,4 +100,5 @@ class AuthController:
             flash('Access denied', 'error')
             return redirect(url_for('login'))
         
-        return render_template('dashboard/admin_dashboard.html', user_name=session.get('user_name'))
+        return render_template('dashboard/admin_dashboard.html', user_name=session.get('user_name'),
+                             recent_activities=Book.get_recent_activities())
@@ -1,7 +1,11 @@
-from flask import render_template, request, redirect, url_for, session, flash
+from flask import render_template, request, redirect, url_for, session, flash, Response, stream_with_context
 from app.models.book import Book
+from app.models.fine_ledger import FineLedger
 from app.models.issued_book import IssuedBook
+from app.models.notification import Notification
 from app.utils.database import Database
+from app.utils.export import csv_stream, ndjson_stream
+from app.utils.query_batch import QueryBatch
 from datetime import datetime
 
 
@@ -13,7 +17,8 @@ class LibrarianController:
             return redirect(url_for('login'))
         
         return render_template('dashboard/librarian_dashboard.html', 
-                             user_name=session.get('user_name'))
+                             user_name=session.get('user_name'),
+                             recent_activities=Book.get_recent_activities())
     
     @staticmethod
     def book_management():
@@ -73,12 +78,18 @@ class LibrarianController:
                 
                 return redirect(url_for('librarian_book_management'))
         
-        books = Book.get_all_books_with_filter(subject_filter, sort_by)
+        page = Book.get_books_page(subject_filter, sort_by,
+                                   cursor=request.args.get('cursor'),
+                                   direction=request.args.get('direction', 'next'),
+                                   page_size=request.args.get('page_size'))
         subjects = Book.get_all_subjects()
         
         return render_template('librarian/book_management.html', 
                              user_name=session.get('user_name'),
-                             books=books,
+                             books=page['books'],
+                             page=page,
+                             pagination_args={'subject': subject_filter, 'sort': sort_by, 'page_size': request.args.get('page_size')},
+                             status_counts=Book.get_status_counts(),
                              subjects=subjects,
                              current_subject=subject_filter,
                              current_sort=sort_by)
@@ -106,19 +117,22 @@ class LibrarianController:
             
             return redirect(url_for('librarian_book_issue'))
         
-        books = IssuedBook.get_available_books()
-        students = IssuedBook.get_students()
+        batch = QueryBatch()
+        batch.add('books', IssuedBook.get_available_books)
+        batch.add('students', IssuedBook.get_students)
+        batch.add('borrowed_counts', IssuedBook.get_borrowed_counts)
+        batch.add('issued_books', IssuedBook.get_all_issued_books)
+        results = batch.run()
         
+        students = results['students']
         for student in students:
-            student['borrowed_count'] = IssuedBook.get_student_borrowed_count(student['UserID'])
-        
-        issued_books = IssuedBook.get_all_issued_books()
+            student['borrowed_count'] = results['borrowed_counts'].get(student['UserID'], 0)
         
         return render_template('librarian/book_issue.html', 
                              user_name=session.get('user_name'),
-                             books=books,
+                             books=results['books'],
                              students=students,
-                             issued_books=issued_books)
+                             issued_books=results['issued_books'])
     
     @staticmethod
     def book_return():
@@ -146,12 +160,16 @@ class LibrarianController:
             
             return redirect(url_for('librarian_book_return'))
         
-        issued_books = IssuedBook.get_all_issued_books()
+        page = IssuedBook.get_issued_books_page(cursor=request.args.get('cursor'),
+                                                direction=request.args.get('direction', 'next'),
+                                                page_size=request.args.get('page_size'))
         today = datetime.now().date()
         
         return render_template('librarian/book_return.html', 
                              user_name=session.get('user_name'),
-                             issued_books=issued_books,
+                             issued_books=page['issued_books'],
+                             page=page,
+                             pagination_args={'page_size': request.args.get('page_size')},
                              today=today)
     
     @staticmethod
@@ -166,6 +184,42 @@ class LibrarianController:
                              user_name=session.get('user_name'),
                              transactions=transactions)
     
+    @staticmethod
+    def export_transaction_history():
+        if 'user_id' not in session or session.get('user_role') != 'Librarian':
+            flash('Access denied', 'error')
+            return redirect(url_for('login'))
+        
+        export_format = request.args.get('format', 'csv').lower()
+        if export_format not in ('csv', 'ndjson'):
+            flash('Export format must be CSV or NDJSON', 'error')
+            return redirect(url_for('librarian_transaction_history'))
+        
+        try:
+            start_date = datetime.strptime(request.args['start'], '%Y-%m-%d').date() if request.args.get('start') else None
+            end_date = datetime.strptime(request.args['end'], '%Y-%m-%d').date() if request.args.get('end') else None
+        except ValueError:
+            flash('Dates must be in YYYY-MM-DD format', 'error')
+            return redirect(url_for('librarian_transaction_history'))
+        
+        if start_date and end_date and start_date > end_date:
+            flash('Start date must be on or before end date', 'error')
+            return redirect(url_for('librarian_transaction_history'))
+        
+        rows = IssuedBook.iter_transaction_history(start_date, end_date)
+        if export_format == 'csv':
+            body = csv_stream(rows, IssuedBook.EXPORT_COLUMNS)
+            mimetype = 'text/csv'
+        else:
+            body = ndjson_stream(rows, IssuedBook.EXPORT_COLUMNS)
+            mimetype = 'application/x-ndjson'
+        
+        filename = f"transactions_{start_date or 'all'}_{end_date or 'all'}.{export_format}"
+        return Response(stream_with_context(body), mimetype=mimetype, headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'X-Accel-Buffering': 'no'
+        })
+    
     @staticmethod
     def book_issue_return():
         if 'user_id' not in session or session.get('user_role') != 'Librarian':
@@ -180,7 +234,15 @@ class LibrarianController:
             flash('Access denied', 'error')
             return redirect(url_for('login'))
         
-        return render_template('librarian/notification_system.html', user_name=session.get('user_name'))
+        batch = QueryBatch()
+        batch.add('stats', Notification.get_outbox_stats)
+        batch.add('notifications', Notification.get_recent)
+        results = batch.run()
+        
+        return render_template('librarian/notification_system.html', 
+                             user_name=session.get('user_name'),
+                             stats=results['stats'],
+                             notifications=results['notifications'])
     
     @staticmethod
     def book_status():
@@ -188,11 +250,23 @@ class LibrarianController:
             flash('Access denied', 'error')
             return redirect(url_for('login'))
         
-        books = Book.get_all_books()
+        search_text = request.args.get('q', '').strip()
+        if search_text:
+            page = Book.search_books(search_text,
+                                     cursor=request.args.get('cursor'),
+                                     page_size=request.args.get('page_size'))
+        else:
+            page = Book.get_books_page(cursor=request.args.get('cursor'),
+                                       direction=request.args.get('direction', 'next'),
+                                       page_size=request.args.get('page_size'))
         
         return render_template('librarian/book_status.html', 
                              user_name=session.get('user_name'),
-                             books=books)
+                             books=page['books'],
+                             page=page,
+                             pagination_args={'q': search_text or None, 'page_size': request.args.get('page_size')},
+                             search_text=search_text,
+                             status_counts=Book.get_status_counts())
     
     @staticmethod
     def fines_management():
@@ -200,13 +274,37 @@ class LibrarianController:
             flash('Access denied', 'error')
             return redirect(url_for('login'))
         
-        users_with_fines = IssuedBook.get_users_with_fines()
-        fines_summary = IssuedBook.get_fines_summary()
+        if request.method == 'POST':
+            user_id = request.form.get('user_id')
+            amount = request.form.get('amount', '')
+            
+            if not user_id:
+                flash('Please select a student', 'error')
+            else:
+                result = FineLedger.record_payment(user_id, amount, recorded_by=session.get('user_id'),
+                                                   note=request.form.get('note') or None)
+                if result == "invalid_amount":
+                    flash('Please enter a payment amount greater than zero', 'error')
+                elif result == "no_balance":
+                    flash('This student has no outstanding fines', 'error')
+                elif result == "exceeds_balance":
+                    flash('Payment is larger than the outstanding balance', 'error')
+                elif result:
+                    flash(f"Payment of {result['paid']:.2f} Taka recorded. Remaining balance: {result['balance']:.2f} Taka", 'success')
+                else:
+                    flash('Failed to record payment', 'error')
+            
+            return redirect(url_for('librarian_fines_management'))
+        
+        batch = QueryBatch()
+        batch.add('users_with_fines', IssuedBook.get_users_with_fines)
+        batch.add('fines_summary', IssuedBook.get_fines_summary)
+        results = batch.run()
         
         return render_template('librarian/fines_management.html', 
                              user_name=session.get('user_name'),
-                             users_with_fines=users_with_fines,
-                             fines_summary=fines_summary)
+                             users_with_fines=results['users_with_fines'],
+                             fines_summary=results['fines_summary'])
     
     @staticmethod
     def book_reservation():
@@ -231,17 +329,13 @@ class LibrarianController:
                 if total_after_reservation > 3:
                     flash(f'Student already has {current_reservations} reservations. Cannot reserve {len(selected_books)} more books (limit: 3)', 'error')
                 else:
-                    success_count = 0
+                    result = Book.reserve_books(selected_books, student_id)
+                    success_count = len(result['reserved']) + len(result['queued']) if result else 0
                     failed_books = []
-                    
-                    for book_id in selected_books:
-                        result = Book.create_reservation(book_id, student_id)
-                        if result == True:
-                            success_count += 1
-                        elif result == "limit_exceeded":
-                            flash('Student has reached the reservation limit of 3 books', 'error')
-                            break
-                        else:
+                    if result and result['limit_exceeded']:
+                        flash('Student has reached the reservation limit of 3 books', 'error')
+                    elif result:
+                        for book_id in result['unavailable'] + result['already_reserved']:
                             book = Book.get_book_by_id(book_id)
                             if book:
                                 failed_books.append(book['title'])
@@ -267,11 +361,12 @@ class LibrarianController:
         
         try:
             reservations_query = """
-            SELECT br.reservation_id, b.title, u.Name as full_name, br.reservation_date 
+            SELECT br.reservation_id, b.title, u.Name as full_name, br.reservation_date,
+                   br.status, br.hold_expires_at
             FROM book_reservations br 
             JOIN books b ON br.book_id = b.book_id 
             JOIN users u ON br.user_id = u.UserID 
-            WHERE br.status = 'Active' 
+            WHERE br.status IN ('Active', 'Queued') 
             ORDER BY br.reservation_date DESC LIMIT 10
             """
             reservations = Database.execute_query(reservations_query) or []
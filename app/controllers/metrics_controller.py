@@ -0,0 +1,16 @@
+import hmac
+
+from flask import request, Response
+from config import Config
+from app.utils.metrics import Metrics
+
+
+class MetricsController:
+    @staticmethod
+    def metrics():
+        if Config.METRICS_TOKEN:
+            supplied = request.headers.get('Authorization', '')
+            if not hmac.compare_digest(supplied, f'Bearer {Config.METRICS_TOKEN}'):
+                return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        
+        return Response(Metrics.render(), mimetype='text/plain; version=0.0.4')
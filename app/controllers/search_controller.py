@@ -0,0 +1,30 @@
+from flask import request, session, jsonify
+from app.models.book import Book
+
+
+class SearchController:
+    @staticmethod
+    def search_books():
+        if 'user_id' not in session:
+            return jsonify({'error': 'Authentication required'}), 401
+        
+        page = Book.search_books(request.args.get('q', ''),
+                                 cursor=request.args.get('cursor'),
+                                 page_size=request.args.get('page_size'))
+        
+        return jsonify({
+            'query': page['query'],
+            'books': [
+                {
+                    'book_id': book['book_id'],
+                    'title': book['title'],
+                    'author': book['author'],
+                    'subject': book['subject'],
+                    'isbn': book['isbn'],
+                    'status': book['status']
+                }
+                for book in page['books']
+            ],
+            'next_cursor': page['next_cursor'],
+            'prev_cursor': page['prev_cursor']
+        })
@@ -1,18 +1,25 @@
+import asyncio
 from flask import render_template, request, redirect, url_for, session, flash
 from app.models.book import Book
+from app.models.fine_ledger import FineLedger
 from app.models.issued_book import IssuedBook
+from app.models.notification import Notification
+from config import Config
 
 
 class StudentController:
     @staticmethod
-    def student_dashboard():
+    async def student_dashboard():
         if 'user_id' not in session or session.get('user_role') != 'Student':
             flash('Access denied', 'error')
             return redirect(url_for('login'))
         
         user_id = session.get('user_id')
-        user_reservation_count = Book.get_user_reservation_count(user_id)
-        student_fines = IssuedBook.get_student_fines(user_id)
+        user_reservation_count, student_fines, notifications = await asyncio.gather(
+            Book.get_user_reservation_count_async(user_id),
+            IssuedBook.get_student_fines_async(user_id),
+            Notification.get_for_user_async(user_id)
+        )
         
         dummy_stats = {
             'issued_books': 3,
@@ -21,16 +28,10 @@ class StudentController:
             'reservations': user_reservation_count
         }
         
-        dummy_notifications = [
-            {'message': 'Book "Python Programming" is due in 2 days', 'time': '2 hours ago'},
-            {'message': 'Your reservation for "Data Structures" is ready', 'time': '1 day ago'},
-            {'message': 'Fine of $15.50 has been added to your account', 'time': '3 days ago'}
-        ]
-        
         return render_template('dashboard/student_dashboard.html', 
                              user_name=session.get('user_name'),
                              stats=dummy_stats,
-                             notifications=dummy_notifications)
+                             notifications=notifications)
     
     @staticmethod
     def book_status():
@@ -38,11 +39,23 @@ class StudentController:
             flash('Access denied', 'error')
             return redirect(url_for('login'))
         
-        books = Book.get_all_books()
+        search_text = request.args.get('q', '').strip()
+        if search_text:
+            page = Book.search_books(search_text,
+                                     cursor=request.args.get('cursor'),
+                                     page_size=request.args.get('page_size'))
+        else:
+            page = Book.get_books_page(cursor=request.args.get('cursor'),
+                                       direction=request.args.get('direction', 'next'),
+                                       page_size=request.args.get('page_size'))
         
         return render_template('student/book_status.html', 
                              user_name=session.get('user_name'),
-                             books=books)
+                             books=page['books'],
+                             page=page,
+                             pagination_args={'q': search_text or None, 'page_size': request.args.get('page_size')},
+                             search_text=search_text,
+                             status_counts=Book.get_status_counts())
     
     @staticmethod
     def book_reservation():
@@ -64,17 +77,23 @@ class StudentController:
                 remaining_slots = 3 - current_reservation_count
                 flash(f'You can only reserve {remaining_slots} more book(s). You selected {len(selected_books)} books.', 'error')
             else:
-                success_count = Book.create_multiple_reservations(selected_books, user_id)
-                if success_count > 0:
+                result = Book.reserve_books(selected_books, user_id)
+                success_count = len(result['reserved']) + len(result['queued']) if result else 0
+                if result and result['limit_exceeded']:
+                    flash('You already have 3 book reservations. Cannot reserve more books.', 'error')
+                elif success_count > 0:
                     if success_count == len(selected_books):
                         flash(f'All {success_count} book reservations created successfully', 'success')
                     else:
                         flash(f'{success_count} out of {len(selected_books)} reservations created successfully', 'warning')
+                    if result['queued']:
+                        flash(f"{len(result['queued'])} book(s) are on loan; you have joined the waiting list", 'success')
                     current_reservation_count = Book.get_user_reservation_count(user_id)
                 else:
                     flash('Failed to create reservations. Books may already be reserved by you or not available', 'error')
         
-        books = Book.get_all_available_books()
+        # Books on loan or held for someone else can still be queued for.
+        books = Book.get_all_books()
         user_reservations = Book.get_user_reservations(user_id)
         remaining_slots = 3 - current_reservation_count
         
@@ -82,37 +101,41 @@ class StudentController:
                              user_name=session.get('user_name'),
                              books=books,
                              user_reservations=user_reservations,
-                             remaining_slots=remaining_slots)
+                             remaining_slots=remaining_slots,
+                             hold_days=Config.RESERVATION_HOLD_DAYS)
     
     @staticmethod
-    def account_status():
+    async def account_status():
         if 'user_id' not in session or session.get('user_role') != 'Student':
             flash('Access denied', 'error')
             return redirect(url_for('login'))
         
         user_id = session.get('user_id')
-        total_fines = IssuedBook.get_student_fines(user_id)
-        fine_history = IssuedBook.get_student_fine_history(user_id)
+        balance, entries = await asyncio.gather(
+            FineLedger.get_balance_async(user_id),
+            FineLedger.get_entries_async(user_id)
+        )
+        statuses = FineLedger.settle(entries, balance['balance'])
         
         formatted_fine_history = []
-        for record in fine_history:
+        for entry in entries:
             formatted_fine_history.append({
-                'description': f'Late return - {record["book_title"]}',
-                'amount': record['Fine'],
-                'date': record['ReturnDate'].strftime('%Y-%m-%d') if record['ReturnDate'] else 'N/A',
-                'status': 'Pending'
+                'description': entry['note'] or ('Late return' if entry['entry_type'] == 'Charge' else 'Payment received'),
+                'amount': entry['amount'],
+                'date': entry['created_at'].strftime('%Y-%m-%d'),
+                'status': statuses.get(entry['entry_id'], 'Received')
             })
         
-        dummy_account = {
-            'total_fines': total_fines,
-            'paid_fines': 0.00,
-            'pending_fines': total_fines,
+        account = {
+            'total_fines': balance['charged'],
+            'paid_fines': balance['paid'],
+            'pending_fines': balance['balance'],
             'account_status': 'Active'
         }
         
         return render_template('student/account_status.html', 
                              user_name=session.get('user_name'),
-                             account=dummy_account,
+                             account=account,
                              fine_history=formatted_fine_history)
     
     @staticmethod
@@ -121,12 +144,8 @@ class StudentController:
             flash('Access denied', 'error')
             return redirect(url_for('login'))
         
-        dummy_borrowed_books = [
-            {'id': 1, 'title': 'Python Programming', 'author': 'John Doe', 'issue_date': '2025-08-01', 'due_date': '2025-08-20'},
-            {'id': 2, 'title': 'Data Structures', 'author': 'Jane Smith', 'issue_date': '2025-08-05', 'due_date': '2025-08-25'},
-            {'id': 3, 'title': 'Algorithm Design', 'author': 'Bob Wilson', 'issue_date': '2025-07-28', 'due_date': '2025-08-18'}
-        ]
+        borrowed_books = IssuedBook.get_user_loans(session.get('user_id')) or []
         
         return render_template('student/your_books.html', 
                              user_name=session.get('user_name'),
-                             borrowed_books=dummy_borrowed_books)
+                             borrowed_books=borrowed_books)
@@ -1,7 +1,25 @@
 from app.utils.database import Database
+from app.utils.async_database import AsyncDatabase
+from app.models.book_counter import BookCounter
+from app.models.circulation_event import CirculationEvent
+from app.models.overdue_tracker import OverdueTracker
+from app.models.reservation_queue import ReservationQueue
+from app.utils.cache import Cache
+from app.utils.pagination import clamp_page_size, decode_cursor, encode_cursor, keyset_condition, order_clause, paginate_rows
+import re
 import uuid
 
 
+SEARCH_STOPWORDS = {
+    'a', 'about', 'an', 'are', 'as', 'at', 'be', 'by', 'com', 'de', 'en', 'for', 'from', 'how', 'i',
+    'in', 'is', 'it', 'la', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'what', 'when',
+    'where', 'who', 'will', 'with', 'und', 'www'
+}
+SEARCH_MIN_TOKEN_LENGTH = 3
+SEARCH_MAX_TERMS = 8
+SEARCH_MAX_RESULTS = 1000
+
+
 class Book:
     @staticmethod
     def get_total_books():
@@ -32,16 +50,8 @@ class Book:
     
     @staticmethod
     def get_overdue_books():
-        try:
-            query = """
-            SELECT COUNT(*) as overdue 
-            FROM book_issues bi
-            WHERE bi.due_date < CURDATE() AND bi.status = 'Borrowed'
-            """
-            result = Database.execute_single_query(query)
-            return result['overdue'] if result and 'overdue' in result else 3
-        except:
-            return 3
+        summary = OverdueTracker.get_summary()
+        return summary['overdue_loans'] if summary else 0
     
     @staticmethod
     def get_reservations():
@@ -53,52 +63,84 @@ class Book:
             return 7
     
     @staticmethod
-    def get_recent_activities():
-        try:
-            query = """
-            SELECT 
-                CONCAT('Book "', b.title, '" was issued to ', u.full_name) as activity,
-                CONCAT(TIMESTAMPDIFF(HOUR, bi.created_at, NOW()), ' hours ago') as time_ago
-            FROM book_issues bi
-            JOIN books b ON bi.book_id = b.book_id
-            JOIN users u ON bi.user_id = u.user_id
-            WHERE DATE(bi.created_at) >= DATE_SUB(CURDATE(), INTERVAL 7 DAY)
-            ORDER BY bi.created_at DESC
-            LIMIT 4
-            """
-            result = Database.execute_query(query)
-            if result and len(result) > 0:
-                return result
-        except:
-            pass
-        
-        return [
-            {'activity': 'Book "Python Programming" was returned', 'time_ago': '2 hours ago'},
-            {'activity': 'Book "Web Development" was issued', 'time_ago': '4 hours ago'},
-            {'activity': 'Book "Database Design" was returned', 'time_ago': '6 hours ago'},
-            {'activity': 'Book "Machine Learning" was issued', 'time_ago': '1 day ago'}
-        ]
+    def get_recent_activities(limit=4):
+        return CirculationEvent.get_feed(limit)
     
     @staticmethod
     def get_library_stats():
-        total_books = Book.get_total_books()
-        available_books = Book.get_available_books()
-        issued_books = Book.get_issued_books()
-        overdue_books = Book.get_overdue_books()
-        reservations = Book.get_reservations()
+        counters = Book.get_library_counters()
+        total_books = counters['total_books']
+        available_books = counters['available_books']
         
         availability_percentage = int((available_books / total_books * 100)) if total_books > 0 else 0
         
         return {
             'total_books': total_books,
             'available_books': available_books,
-            'issued_books': issued_books,
-            'overdue_books': overdue_books,
-            'reservations': reservations,
+            'issued_books': counters['issued_books'],
+            'overdue_books': counters['overdue_books'],
+            'reservations': counters['reservations'],
             'availability_percentage': availability_percentage
         }
     
     @staticmethod
+    def get_library_counters():
+        counters = {
+            'total_books': 120,
+            'available_books': 95,
+            'issued_books': 18,
+            'overdue_books': 3,
+            'reservations': 7
+        }
+        
+        connection = Database.get_connection()
+        if not connection:
+            return counters
+        
+        cursor = None
+        try:
+            cursor = connection.cursor(dictionary=True)
+            
+            try:
+                cursor.execute("SELECT counter_name, counter_value FROM book_counters")
+                status_counts = {row['counter_name']: int(row['counter_value']) for row in cursor.fetchall()}
+                
+                overdue = OverdueTracker.get_summary(counts=status_counts)
+                if overdue:
+                    counters['overdue_books'] = overdue['overdue_loans']
+                
+                if all(status in status_counts for status in BookCounter.STATUSES):
+                    counters['total_books'] = sum(status_counts[status] for status in BookCounter.STATUSES)
+                    counters['available_books'] = status_counts['Available']
+                    counters['issued_books'] = status_counts['Borrowed']
+                else:
+                    cursor.execute("""
+                    SELECT COUNT(*) as total_books,
+                           COALESCE(SUM(status = 'Available'), 0) as available_books,
+                           COALESCE(SUM(status = 'Borrowed'), 0) as issued_books
+                    FROM books
+                    """)
+                    row = cursor.fetchone()
+                    if row:
+                        for key in ('total_books', 'available_books', 'issued_books'):
+                            counters[key] = int(row[key])
+            except Exception as e:
+                print(f"Error loading book counters: {e}")
+            
+            try:
+                cursor.execute("SELECT COUNT(*) as reservations FROM book_reservations WHERE status = 'Active'")
+                row = cursor.fetchone()
+                if row:
+                    counters['reservations'] = int(row['reservations'])
+            except Exception as e:
+                print(f"Error loading reservation counter: {e}")
+            
+            return counters
+        finally:
+            Database.close_connection(connection, cursor)
+    
+    @staticmethod
+    @Cache.cached('catalogue', fallback=[])
     def get_all_available_books():
         query = """
         SELECT book_id, title, author, isbn, subject, status 
@@ -106,8 +148,7 @@ class Book:
         WHERE status = 'Available'
         ORDER BY title
         """
-        result = Database.execute_query(query)
-        return result if result else []
+        return Database.execute_query(query)
     
     @staticmethod
     def get_all_students():
@@ -122,46 +163,104 @@ class Book:
     
     @staticmethod
     def create_multiple_reservations(book_ids, user_id):
-        connection = Database.get_connection()
-        if not connection:
-            return 0
+        result = Book.reserve_books(book_ids, user_id)
+        return len(result['reserved']) if result else 0
+    
+    @staticmethod
+    def reserve_books(book_ids, user_id, limit=3):
+        # An available copy is held for the student straight away; a copy that
+        # is on loan or held for someone else puts the student in its queue.
+        # Both count towards the limit.
+        book_ids = list(dict.fromkeys(book_id for book_id in book_ids if book_id))
+        if not book_ids:
+            return {'reserved': [], 'queued': [], 'unavailable': [], 'already_reserved': [], 'limit_exceeded': False}
         
-        try:
-            cursor = connection.cursor()
-            success_count = 0
+        def work(cursor):
+            result = {'reserved': [], 'queued': [], 'unavailable': [], 'already_reserved': [], 'limit_exceeded': False}
+            
+            # Locking the student row serialises concurrent reservations for the
+            # same student, so the limit check below cannot be raced.
+            cursor.execute("SELECT UserID, Name FROM users WHERE UserID = %s FOR UPDATE", (user_id,))
+            student = cursor.fetchone()
+            if student is None:
+                return None
+            
+            cursor.execute("""
+            SELECT book_id FROM book_reservations
+            WHERE user_id = %s AND status IN ('Active', 'Queued')
+            """, (user_id,))
+            active = {row[0] for row in cursor.fetchall()}
+            
+            result['already_reserved'] = [book_id for book_id in book_ids if book_id in active]
+            requested = [book_id for book_id in book_ids if book_id not in active]
+            if not requested:
+                return result
+            
+            placeholders = ', '.join(['%s'] * len(requested))
+            cursor.execute(f"""
+            SELECT book_id, status, title FROM books
+            WHERE book_id IN ({placeholders})
+            ORDER BY book_id
+            FOR UPDATE
+            """, tuple(requested))
+            rows = cursor.fetchall()
+            statuses = {book_id: status for book_id, status, _ in rows}
+            titles = {book_id: title for book_id, _, title in rows}
             
-            for book_id in book_ids:
-                check_existing_query = """
-                SELECT COUNT(*) as count FROM book_reservations 
-                WHERE book_id = %s AND user_id = %s AND status = 'Active'
-                """
-                cursor.execute(check_existing_query, (book_id, user_id))
-                existing = cursor.fetchone()
+            # Queueing for a copy the student already has on loan makes no sense.
+            cursor.execute("SELECT book_id FROM issued_books WHERE UserID = %s", (user_id,))
+            on_loan = {row[0] for row in cursor.fetchall()}
+            
+            reservable = [book_id for book_id in requested if statuses.get(book_id) == 'Available']
+            queueable = [book_id for book_id in requested
+                         if statuses.get(book_id) in ('Borrowed', 'Reserved') and book_id not in on_loan]
+            result['unavailable'] = [book_id for book_id in requested
+                                     if book_id not in reservable and book_id not in queueable]
+            # Only ids that would actually be reserved or queued count, so a
+            # mistyped or unavailable id cannot push the student over.
+            if len(active) + len(reservable) + len(queueable) > limit:
+                result['limit_exceeded'] = True
+                return result
+            
+            if reservable:
+                hold_expires_at = ReservationQueue.hold_expiry()
+                cursor.executemany("""
+                INSERT INTO book_reservations (reservation_id, book_id, user_id, reservation_date, status, hold_expires_at)
+                VALUES (%s, %s, %s, CURDATE(), 'Active', %s)
+                """, [(str(uuid.uuid4()), book_id, user_id, hold_expires_at) for book_id in reservable])
                 
-                if existing[0] == 0:
-                    check_book_available_query = """
-                    SELECT status FROM books WHERE book_id = %s
-                    """
-                    cursor.execute(check_book_available_query, (book_id,))
-                    book_status = cursor.fetchone()
-                    
-                    if book_status and book_status[0] == 'Available':
-                        insert_query = """
-                        INSERT INTO book_reservations (book_id, user_id, reservation_date, status) 
-                        VALUES (%s, %s, CURDATE(), 'Active')
-                        """
-                        cursor.execute(insert_query, (book_id, user_id))
-                        success_count += 1
+                placeholders = ', '.join(['%s'] * len(reservable))
+                cursor.execute(f"""
+                UPDATE books SET status = 'Reserved'
+                WHERE book_id IN ({placeholders}) AND status = 'Available'
+                """, tuple(reservable))
+                if cursor.rowcount != len(reservable):
+                    raise RuntimeError("book status changed under a row lock")
+                BookCounter.move(cursor, 'Available', 'Reserved', len(reservable))
             
-            connection.commit()
-            return success_count
-        except Exception as e:
-            connection.rollback()
-            return 0
-        finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+            if queueable:
+                cursor.executemany("""
+                INSERT INTO book_reservations (reservation_id, book_id, user_id, reservation_date, status)
+                VALUES (%s, %s, %s, CURDATE(), 'Queued')
+                """, [(str(uuid.uuid4()), book_id, user_id) for book_id in queueable])
+            
+            CirculationEvent.record_many(cursor, [
+                ('reserve', f'Book "{titles[book_id]}" was reserved by {student[1]}', book_id, user_id)
+                for book_id in reservable
+            ] + [
+                ('queue', f'{student[1]} joined the waiting list for "{titles[book_id]}"', book_id, user_id)
+                for book_id in queueable
+            ])
+            
+            result['reserved'] = reservable
+            result['queued'] = queueable
+            return result
+        
+        result = Database.run_in_transaction(work)
+        if result and (result['reserved'] or result['queued']):
+            Cache.invalidate('catalogue')
+            CirculationEvent.mark_stale()
+        return result
     
     @staticmethod
     def get_user_by_email(email):
@@ -202,11 +301,16 @@ class Book:
     def get_user_reservations(user_id):
         try:
             query = """
-            SELECT br.reservation_id, br.reservation_date, br.status,
-                   b.title, b.author, b.isbn, b.subject
+            SELECT br.reservation_id, br.reservation_date, br.status, br.hold_expires_at,
+                   b.title, b.author, b.isbn, b.subject,
+                   CASE WHEN br.status = 'Queued' THEN (
+                       SELECT COUNT(*) FROM book_reservations ahead
+                       WHERE ahead.book_id = br.book_id AND ahead.status = 'Queued'
+                         AND (ahead.created_at, ahead.reservation_id) < (br.created_at, br.reservation_id)
+                   ) + 1 END as queue_position
             FROM book_reservations br
             JOIN books b ON br.book_id = b.book_id
-            WHERE br.user_id = %s AND br.status = 'Active'
+            WHERE br.user_id = %s AND br.status IN ('Active', 'Queued')
             ORDER BY br.created_at DESC
             """
             result = Database.execute_query(query, (user_id,))
@@ -214,13 +318,17 @@ class Book:
         except:
             return []
     
+    @staticmethod
+    async def get_user_reservations_async(user_id):
+        return await AsyncDatabase.run(Book.get_user_reservations, user_id)
+    
     @staticmethod
     def get_user_reservation_count(user_id):
         try:
             query = """
             SELECT COUNT(*) as count
             FROM book_reservations
-            WHERE user_id = %s AND status = 'Active'
+            WHERE user_id = %s AND status IN ('Active', 'Queued')
             """
             result = Database.execute_single_query(query, (user_id,))
             return result['count'] if result and 'count' in result else 0
@@ -228,6 +336,11 @@ class Book:
             return 0
     
     @staticmethod
+    async def get_user_reservation_count_async(user_id):
+        return await AsyncDatabase.run(Book.get_user_reservation_count, user_id)
+    
+    @staticmethod
+    @Cache.cached('catalogue', fallback=[])
     def get_all_books():
         try:
             query = """
@@ -235,10 +348,9 @@ class Book:
             FROM books 
             ORDER BY title
             """
-            result = Database.execute_query(query)
-            return result if result else []
+            return Database.execute_query(query)
         except:
-            return []
+            return None
     
     @staticmethod
     def get_all_books_with_filter(subject=None, sort_by='title'):
@@ -268,36 +380,182 @@ class Book:
             return []
     
     @staticmethod
+    def get_books_page(subject=None, sort_by='title', cursor=None, direction='next', page_size=None):
+        sort_columns = {
+            'title': ['title', 'book_id'],
+            'subject': ['subject', 'title', 'book_id'],
+            'author': ['author', 'title', 'book_id']
+        }
+        if sort_by not in sort_columns:
+            sort_by = 'title'
+        columns = sort_columns[sort_by]
+        page_size = clamp_page_size(page_size)
+        direction = 'prev' if direction == 'prev' else 'next'
+        cursor_values = decode_cursor(cursor, sort_by)
+        if cursor_values is not None and len(cursor_values) != len(columns):
+            cursor_values = None
+        
+        conditions = []
+        params = []
+        if subject and subject != 'all':
+            conditions.append("subject = %s")
+            params.append(subject)
+        if cursor_values is not None:
+            condition, condition_params = keyset_condition(columns, cursor_values, descending=direction == 'prev')
+            conditions.append(condition)
+            params.extend(condition_params)
+        
+        query = """
+        SELECT book_id, title, author, subject, isbn, status 
+        FROM books
+        """
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY " + order_clause(columns, descending=direction == 'prev')
+        query += " LIMIT %s"
+        params.append(page_size + 1)
+        
+        try:
+            rows = Database.execute_query(query, tuple(params)) or []
+        except:
+            rows = []
+        
+        page = paginate_rows(rows, page_size, direction, cursor_values is not None, sort_by,
+                             lambda book: [book[column] for column in columns])
+        page['books'] = page.pop('items')
+        return page
+    
+    @staticmethod
+    def parse_search_terms(search_text):
+        terms = []
+        for term in re.findall(r'\w+', (search_text or '').lower()):
+            if len(term) >= SEARCH_MIN_TOKEN_LENGTH and term not in SEARCH_STOPWORDS and term not in terms:
+                terms.append(term)
+        return terms[:SEARCH_MAX_TERMS]
+    
+    @staticmethod
+    def search_books(search_text, cursor=None, page_size=None):
+        search_text = (search_text or '').strip()
+        page_size = clamp_page_size(page_size, default=20)
+        offset_values = decode_cursor(cursor, 'search')
+        offset = offset_values[0] if offset_values and isinstance(offset_values[0], int) else 0
+        offset = max(0, min(offset, SEARCH_MAX_RESULTS - page_size))
+        
+        page = {'books': [], 'next_cursor': None, 'prev_cursor': None, 'page_size': page_size, 'query': search_text}
+        if not search_text:
+            return page
+        
+        # The exact ISBN hit and the title matches are separate branches of a
+        # UNION ALL, so each is read from its own index; an OR across them
+        # would make MySQL give up on the FULLTEXT index and scan the table.
+        # The ISBN hit sorts first and is not repeated by the second branch.
+        limit = offset + page_size + 1
+        terms = Book.parse_search_terms(search_text)
+        if terms:
+            # Every term is required and matched as a prefix; title hits weigh double.
+            boolean_query = ' '.join(f'+{term}*' for term in terms)
+            match_query = """
+            (SELECT book_id, title, author, subject, isbn, status, 0 as exact,
+                    MATCH(title) AGAINST(%s IN BOOLEAN MODE) * 2
+                    + MATCH(title, author, subject, isbn) AGAINST(%s IN BOOLEAN MODE) as score
+             FROM books
+             WHERE MATCH(title, author, subject, isbn) AGAINST(%s IN BOOLEAN MODE)
+               AND NOT (isbn <=> %s)
+             ORDER BY score DESC, title, book_id
+             LIMIT %s)
+            """
+            match_params = (boolean_query, boolean_query, boolean_query, search_text, limit)
+        else:
+            match_query = """
+            (SELECT book_id, title, author, subject, isbn, status, 0 as exact, 0 as score
+             FROM books
+             WHERE title LIKE %s AND NOT (isbn <=> %s)
+             ORDER BY title, book_id
+             LIMIT %s)
+            """
+            prefix = search_text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            match_params = (prefix, search_text, limit)
+        
+        query = """
+        (SELECT book_id, title, author, subject, isbn, status, 1 as exact, 0 as score
+         FROM books
+         WHERE isbn = %s
+         LIMIT %s)
+        UNION ALL
+        """ + match_query + """
+        ORDER BY exact DESC, score DESC, title, book_id
+        LIMIT %s OFFSET %s
+        """
+        params = (search_text, limit) + match_params + (page_size + 1, offset)
+        
+        try:
+            rows = Database.execute_query(query, params) or []
+        except:
+            rows = []
+        
+        page['books'] = rows[:page_size]
+        if len(rows) > page_size and offset + page_size < SEARCH_MAX_RESULTS:
+            page['next_cursor'] = encode_cursor('search', [offset + page_size])
+        if offset > 0:
+            page['prev_cursor'] = encode_cursor('search', [max(0, offset - page_size)])
+        return page
+    
+    @staticmethod
+    def get_status_counts():
+        counts = BookCounter.get_counts() or {}
+        if not all(status in counts for status in BookCounter.STATUSES):
+            rows = Database.execute_query("SELECT status, COUNT(*) as count FROM books GROUP BY status") or []
+            counts = {row['status']: int(row['count']) for row in rows}
+        
+        status_counts = {status: counts.get(status, 0) for status in BookCounter.STATUSES}
+        status_counts['total'] = sum(status_counts.values())
+        return status_counts
+    
+    @staticmethod
+    async def get_status_counts_async():
+        return await AsyncDatabase.run(Book.get_status_counts)
+    
+    @staticmethod
+    @Cache.cached('catalogue', fallback=[])
     def get_all_subjects():
         try:
             query = "SELECT DISTINCT subject FROM books ORDER BY subject"
             result = Database.execute_query(query)
-            return [row['subject'] for row in result] if result else []
+            return [row['subject'] for row in result] if result is not None else None
         except:
-            return []
+            return None
     
     @staticmethod
     def add_book(title, author, subject, isbn):
+        connection = Database.get_connection()
+        if not connection:
+            return False
+        
+        cursor = None
         try:
             book_id = str(uuid.uuid4())
-            connection = Database.get_connection()
-            if connection:
-                cursor = connection.cursor()
-                query = """
-                INSERT INTO books (book_id, title, author, subject, isbn, status) 
-                VALUES (%s, %s, %s, %s, %s, 'Available')
-                """
-                cursor.execute(query, (book_id, title, author, subject, isbn))
-                connection.commit()
-                cursor.close()
-                connection.close()
-                return True
+            cursor = connection.cursor()
+            connection.start_transaction()
+            query = """
+            INSERT INTO books (book_id, title, author, subject, isbn, status) 
+            VALUES (%s, %s, %s, %s, %s, 'Available')
+            """
+            cursor.execute(query, (book_id, title, author, subject, isbn))
+            BookCounter.adjust(cursor, 'Available', 1)
+            CirculationEvent.record(cursor, 'book_added', f'Book "{title}" was added to the catalogue', book_id)
+            connection.commit()
+            Cache.invalidate('catalogue')
+            CirculationEvent.mark_stale()
+            return True
         except Exception as e:
             print(f"Error adding book: {e}")
+            connection.rollback()
             return False
-        return False
+        finally:
+            Database.close_connection(connection, cursor)
     
     @staticmethod
+    @Cache.cached('catalogue')
     def get_book_by_id(book_id):
         try:
             query = "SELECT * FROM books WHERE book_id = %s"
@@ -308,58 +566,63 @@ class Book:
     
     @staticmethod
     def update_book(book_id, title, author, subject, isbn):
-        try:
-            connection = Database.get_connection()
-            if connection:
-                cursor = connection.cursor()
-                query = """
-                UPDATE books 
-                SET title = %s, author = %s, subject = %s, isbn = %s 
-                WHERE book_id = %s
-                """
-                cursor.execute(query, (title, author, subject, isbn, book_id))
-                connection.commit()
-                result = cursor.rowcount > 0
-                cursor.close()
-                connection.close()
-                return result
-        except Exception as e:
-            print(f"Error updating book: {e}")
-            return False
-        return False
+        def work(cursor):
+            query = """
+            UPDATE books 
+            SET title = %s, author = %s, subject = %s, isbn = %s 
+            WHERE book_id = %s
+            """
+            cursor.execute(query, (title, author, subject, isbn, book_id))
+            result = cursor.rowcount > 0
+            if result:
+                CirculationEvent.record(cursor, 'book_updated', f'Book "{title}" was updated', book_id)
+            return result
+        
+        result = Database.run_in_transaction(work, default=False)
+        if result:
+            Cache.invalidate('catalogue')
+            CirculationEvent.mark_stale()
+        return result
     
     @staticmethod
     def delete_book(book_id):
+        connection = Database.get_connection()
+        if not connection:
+            return False
+        
+        cursor = None
         try:
-            connection = Database.get_connection()
-            if connection:
-                cursor = connection.cursor()
-                
-                check_query = "SELECT status FROM books WHERE book_id = %s"
-                cursor.execute(check_query, (book_id,))
-                book = cursor.fetchone()
-                
-                if not book:
-                    cursor.close()
-                    connection.close()
-                    return False
-                
-                if book[0] == 'Borrowed':
-                    cursor.close()
-                    connection.close()
-                    return "borrowed"
-                
-                delete_query = "DELETE FROM books WHERE book_id = %s"
-                cursor.execute(delete_query, (book_id,))
-                connection.commit()
-                result = cursor.rowcount > 0
-                cursor.close()
-                connection.close()
-                return result
+            cursor = connection.cursor()
+            connection.start_transaction()
+            
+            check_query = "SELECT status, title FROM books WHERE book_id = %s FOR UPDATE"
+            cursor.execute(check_query, (book_id,))
+            book = cursor.fetchone()
+            
+            if not book:
+                connection.rollback()
+                return False
+            
+            if book[0] == 'Borrowed':
+                connection.rollback()
+                return "borrowed"
+            
+            delete_query = "DELETE FROM books WHERE book_id = %s"
+            cursor.execute(delete_query, (book_id,))
+            result = cursor.rowcount > 0
+            if result:
+                BookCounter.adjust(cursor, book[0], -1)
+                CirculationEvent.record(cursor, 'book_deleted', f'Book "{book[1]}" was removed from the catalogue', book_id)
+            connection.commit()
+            Cache.invalidate('catalogue')
+            CirculationEvent.mark_stale()
+            return result
         except Exception as e:
             print(f"Error deleting book: {e}")
+            connection.rollback()
             return False
-        return False
+        finally:
+            Database.close_connection(connection, cursor)
     
     @staticmethod
     def initialize_sample_data():
@@ -379,14 +642,14 @@ class Book:
                 ('book-008', 'Literature Analysis', 'Frank Green', 'Literature', '978-3691470258', 'Available')
             ]
             
-            for book in sample_books:
-                query = """
-                INSERT INTO books (book_id, title, author, subject, isbn, status) 
-                VALUES (%s, %s, %s, %s, %s, %s)
-                """
-                Database.execute_insert_query(query, book)
+            query = """
+            INSERT INTO books (book_id, title, author, subject, isbn, status) 
+            VALUES (%s, %s, %s, %s, %s, %s)
+            """
+            Database.execute_many(query, sample_books)
             
-            return True
+            Cache.invalidate('catalogue')
+            return BookCounter.reconcile()
             
         except Exception as e:
             print(f"Error initializing sample data: {e}")
@@ -394,69 +657,18 @@ class Book:
     
     @staticmethod
     def create_reservation(book_id, user_id):
-        connection = Database.get_connection()
-        if not connection:
+        result = Book.reserve_books([book_id], user_id)
+        if not result:
             return False
-        
-        try:
-            cursor = connection.cursor()
-            
-            check_student_reservations_query = """
-            SELECT COUNT(*) FROM book_reservations WHERE user_id = %s AND status = 'Active'
-            """
-            cursor.execute(check_student_reservations_query, (user_id,))
-            reservation_count = cursor.fetchone()[0]
-            
-            if reservation_count >= 3:
-                return "limit_exceeded"
-            
-            check_book_query = """
-            SELECT status FROM books WHERE book_id = %s
-            """
-            cursor.execute(check_book_query, (book_id,))
-            book_status = cursor.fetchone()
-            
-            if not book_status or book_status[0] != 'Available':
-                return False
-            
-            check_existing_reservation_query = """
-            SELECT COUNT(*) FROM book_reservations 
-            WHERE book_id = %s AND user_id = %s AND status = 'Active'
-            """
-            cursor.execute(check_existing_reservation_query, (book_id, user_id))
-            existing_count = cursor.fetchone()[0]
-            
-            if existing_count > 0:
-                return False
-            
-            reservation_id = str(uuid.uuid4())
-            
-            insert_query = """
-            INSERT INTO book_reservations (reservation_id, book_id, user_id, reservation_date, status) 
-            VALUES (%s, %s, %s, CURDATE(), 'Active')
-            """
-            cursor.execute(insert_query, (reservation_id, book_id, user_id))
-            
-            update_query = """
-            UPDATE books SET status = 'Reserved' WHERE book_id = %s
-            """
-            cursor.execute(update_query, (book_id,))
-            
-            connection.commit()
-            return True
-        except Exception as e:
-            connection.rollback()
-            return False
-        finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+        if result['limit_exceeded']:
+            return "limit_exceeded"
+        return bool(result['reserved'] or result['queued'])
     
     @staticmethod
     def get_student_reservation_count(user_id):
         query = """
         SELECT COUNT(*) as count FROM book_reservations 
-        WHERE user_id = %s AND status = 'Active'
+        WHERE user_id = %s AND status IN ('Active', 'Queued')
         """
         result = Database.execute_single_query(query, (user_id,))
         return result['count'] if result else 0
\ No newline at end of file
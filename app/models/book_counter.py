@@ -0,0 +1,72 @@
+from app.utils.database import Database
+
+
+class BookCounter:
+    STATUSES = ('Available', 'Borrowed', 'Reserved')
+    
+    @staticmethod
+    def adjust(cursor, counter_name, delta):
+        query = """
+        INSERT INTO book_counters (counter_name, counter_value)
+        VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE counter_value = counter_value + %s
+        """
+        cursor.execute(query, (counter_name, delta, delta))
+    
+    @staticmethod
+    def move(cursor, from_status, to_status, count=1):
+        if from_status == to_status or count == 0:
+            return
+        # Counter rows are locked in name order whichever way the copy moves,
+        # so an issue and a return on the same counters cannot deadlock.
+        for status, delta in sorted(((from_status, -count), (to_status, count))):
+            BookCounter.adjust(cursor, status, delta)
+    
+    @staticmethod
+    def get_counts():
+        query = "SELECT counter_name, counter_value FROM book_counters"
+        result = Database.execute_query(query)
+        if not result:
+            return None
+        return {row['counter_name']: int(row['counter_value']) for row in result}
+    
+    @staticmethod
+    def ensure_initialized():
+        counts = BookCounter.get_counts()
+        if counts and all(status in counts for status in BookCounter.STATUSES):
+            return True
+        return BookCounter.reconcile()
+    
+    @staticmethod
+    def reconcile():
+        connection = Database.get_connection()
+        if not connection:
+            return False
+        
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            connection.start_transaction()
+            
+            cursor.execute("""
+            SELECT status, COUNT(*) FROM books GROUP BY status FOR SHARE
+            """)
+            totals = {status: 0 for status in BookCounter.STATUSES}
+            for status, count in cursor.fetchall():
+                totals[status] = count
+            
+            query = """
+            INSERT INTO book_counters (counter_name, counter_value)
+            VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE counter_value = VALUES(counter_value)
+            """
+            cursor.executemany(query, list(totals.items()))
+            
+            connection.commit()
+            return True
+        except Exception as e:
+            print(f"Error reconciling book counters: {e}")
+            connection.rollback()
+            return False
+        finally:
+            Database.close_connection(connection, cursor)
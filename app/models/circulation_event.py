@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from app.utils.database import Database
+from config import Config
+
+
+class CirculationEvent:
+    # circulation_events is append-only. Writers add a row inside the
+    # transaction that makes the change, with the summary text already
+    # rendered, so reading the feed never joins books or users.
+    _recent = deque(maxlen=Config.ACTIVITY_FEED_SIZE)
+    _lock = threading.Lock()
+    _refresh_lock = threading.Lock()
+    _refreshed_at = None
+    _invalidated_at = 0.0
+    
+    @staticmethod
+    def record(cursor, event_type, summary, book_id=None, user_id=None):
+        cursor.execute("""
+        INSERT INTO circulation_events (event_type, book_id, user_id, summary)
+        VALUES (%s, %s, %s, %s)
+        """, (event_type, book_id, user_id, summary[:255]))
+    
+    @staticmethod
+    def record_many(cursor, events):
+        # events: (event_type, summary, book_id, user_id) tuples.
+        if not events:
+            return
+        cursor.executemany("""
+        INSERT INTO circulation_events (event_type, summary, book_id, user_id)
+        VALUES (%s, %s, %s, %s)
+        """, [(event_type, summary[:255], book_id, user_id) for event_type, summary, book_id, user_id in events])
+    
+    @staticmethod
+    def tail(limit=50, before_id=None):
+        # A backward walk of the primary key: reads limit rows whatever the
+        # size of the log. before_id pages further back.
+        query = """
+        SELECT event_id, event_type, book_id, user_id, summary, created_at
+        FROM circulation_events
+        """
+        params = []
+        if before_id is not None:
+            query += " WHERE event_id < %s"
+            params.append(before_id)
+        query += " ORDER BY event_id DESC LIMIT %s"
+        params.append(limit)
+        return Database.execute_query(query, tuple(params))
+    
+    @staticmethod
+    def mark_stale():
+        # Called after a write so this process shows its own events at once;
+        # events from other processes appear within ACTIVITY_FEED_REFRESH_SECONDS.
+        CirculationEvent._invalidated_at = time.monotonic()
+    
+    @staticmethod
+    def refresh():
+        # One thread refreshes while the others keep reading the old buffer.
+        if not CirculationEvent._refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            # Stamped before the read, so a write committed while it runs
+            # still marks the buffer stale.
+            started = time.monotonic()
+            rows = CirculationEvent.tail(CirculationEvent._recent.maxlen)
+            if rows is None:
+                return False
+            with CirculationEvent._lock:
+                CirculationEvent._recent.clear()
+                CirculationEvent._recent.extend(rows)
+                CirculationEvent._refreshed_at = started
+            return True
+        finally:
+            CirculationEvent._refresh_lock.release()
+    
+    @staticmethod
+    def get_recent(limit=10):
+        refreshed_at = CirculationEvent._refreshed_at
+        if (refreshed_at is None or refreshed_at <= CirculationEvent._invalidated_at
+                or time.monotonic() - refreshed_at >= Config.ACTIVITY_FEED_REFRESH_SECONDS):
+            CirculationEvent.refresh()
+        with CirculationEvent._lock:
+            return list(CirculationEvent._recent)[:limit]
+    
+    @staticmethod
+    def time_ago(created_at, now=None):
+        seconds = max(int(((now or datetime.now()) - created_at).total_seconds()), 0)
+        for unit, size in (('day', 86400), ('hour', 3600), ('minute', 60)):
+            if seconds >= size:
+                count = seconds // size
+                return f"{count} {unit}{'s' if count != 1 else ''} ago"
+        return 'just now'
+    
+    @staticmethod
+    def get_feed(limit=4):
+        now = datetime.now()
+        return [{'activity': event['summary'], 'time_ago': CirculationEvent.time_ago(event['created_at'], now)}
+                for event in CirculationEvent.get_recent(limit)]
@@ -0,0 +1,217 @@
+from datetime import date, timedelta
+from app.utils.database import Database
+
+
+MEASURES = ('issued', 'returned', 'returned_late', 'fines')
+
+# Table, the columns identifying a row besides its date, and the date column.
+# Each level is small enough that a report over years reads at most a few
+# thousand rows; book-level history is kept per month as well as per day.
+ROLLUP_TABLES = (
+    ('circulation_daily', (), 'day'),
+    ('circulation_daily_subject', ('subject',), 'day'),
+    ('circulation_daily_book', ('book_id', 'subject'), 'day'),
+    ('circulation_monthly_book', ('book_id', 'subject'), 'month'),
+)
+
+
+def _upsert_query(table, keys, date_column):
+    columns = [date_column, *keys, *MEASURES]
+    updates = ', '.join(f"{measure} = {measure} + VALUES({measure})" for measure in MEASURES)
+    return f"""
+    INSERT INTO {table} ({', '.join(columns)})
+    VALUES ({', '.join(['%s'] * len(columns))})
+    ON DUPLICATE KEY UPDATE {updates}
+    """
+
+
+UPSERT_QUERIES = [(_upsert_query(table, keys, date_column), keys, date_column)
+                  for table, keys, date_column in ROLLUP_TABLES]
+
+
+class CirculationRollup:
+    @staticmethod
+    def month_start(day):
+        return day.replace(day=1)
+    
+    @staticmethod
+    def next_month(day):
+        return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+    
+    @staticmethod
+    def record(cursor, day, book_id, subject, issued=0, returned=0, returned_late=0, fines=0):
+        # Called inside the issue and return transactions, after every other
+        # write, so the rollup rows are always the last locks taken.
+        subject = subject or 'Unknown'
+        values = {'book_id': book_id, 'subject': subject}
+        measures = (issued, returned, returned_late, fines)
+        for query, keys, date_column in UPSERT_QUERIES:
+            period = CirculationRollup.month_start(day) if date_column == 'month' else day
+            cursor.execute(query, (period, *[values[key] for key in keys], *measures))
+    
+    @staticmethod
+    def split_range(start, end):
+        # Whole months in [start, end] are read from the monthly table and
+        # the partial months at either end from the daily one.
+        first_month = start if start.day == 1 else CirculationRollup.next_month(start)
+        after_last_month = CirculationRollup.month_start(end + timedelta(days=1))
+        if first_month >= after_last_month:
+            return [(start, end)], None
+        
+        edges = []
+        if start < first_month:
+            edges.append((start, first_month - timedelta(days=1)))
+        if after_last_month <= end:
+            edges.append((after_last_month, end))
+        last_month = CirculationRollup.month_start(after_last_month - timedelta(days=1))
+        return edges, (first_month, last_month)
+    
+    @staticmethod
+    def get_totals(start, end, granularity='day'):
+        periods = {
+            'day': "day",
+            'month': "DATE_SUB(day, INTERVAL DAYOFMONTH(day) - 1 DAY)",
+            'year': "MAKEDATE(YEAR(day), 1)"
+        }
+        period = periods.get(granularity, periods['day'])
+        query = f"""
+        SELECT {period} as period, SUM(issued) as issued, SUM(returned) as returned,
+               SUM(returned_late) as returned_late, SUM(fines) as fines
+        FROM circulation_daily
+        WHERE day BETWEEN %s AND %s
+        GROUP BY period
+        ORDER BY period
+        """
+        result = Database.execute_query(query, (start, end))
+        return result if result else []
+    
+    @staticmethod
+    def get_by_subject(start, end):
+        query = """
+        SELECT subject, SUM(issued) as issued, SUM(returned) as returned,
+               SUM(returned_late) as returned_late, SUM(fines) as fines
+        FROM circulation_daily_subject
+        WHERE day BETWEEN %s AND %s
+        GROUP BY subject
+        ORDER BY issued DESC, subject
+        """
+        result = Database.execute_query(query, (start, end))
+        return result if result else []
+    
+    @staticmethod
+    def get_top_books(start, end, limit=20):
+        edges, months = CirculationRollup.split_range(start, end)
+        parts = []
+        params = []
+        if months:
+            parts.append("""
+            SELECT book_id, subject, issued, returned, returned_late, fines
+            FROM circulation_monthly_book WHERE month BETWEEN %s AND %s
+            """)
+            params.extend(months)
+        for edge in edges:
+            parts.append("""
+            SELECT book_id, subject, issued, returned, returned_late, fines
+            FROM circulation_daily_book WHERE day BETWEEN %s AND %s
+            """)
+            params.extend(edge)
+        
+        query = f"""
+        SELECT top.*, COALESCE(b.title, 'Unknown Book') as title,
+               COALESCE(b.author, 'Unknown Author') as author
+        FROM (
+            SELECT r.book_id, MAX(r.subject) as subject, SUM(r.issued) as issued, SUM(r.returned) as returned,
+                   SUM(r.returned_late) as returned_late, SUM(r.fines) as fines
+            FROM ({' UNION ALL '.join(parts)}) r
+            GROUP BY r.book_id
+            ORDER BY issued DESC, r.book_id
+            LIMIT %s
+        ) top
+        LEFT JOIN books b ON top.book_id = b.book_id
+        ORDER BY top.issued DESC, top.book_id
+        """
+        params.append(limit)
+        result = Database.execute_query(query, tuple(params))
+        return result if result else []
+    
+    @staticmethod
+    def get_source_start():
+        query = """
+        SELECT LEAST(COALESCE((SELECT MIN(issue_date) FROM issued_books), CURDATE()),
+                     COALESCE((SELECT MIN(IssueDate) FROM transaction), CURDATE())) as first_day
+        """
+        result = Database.execute_single_query(query)
+        return result['first_day'] if result and result['first_day'] else date.today()
+    
+    @staticmethod
+    def backfill(start=None, end=None, progress=None):
+        # Rebuilds the rollups from issued_books and transaction one month per
+        # transaction, replacing what is there, so it is safe to re-run.
+        end = end or date.today()
+        start = start or CirculationRollup.get_source_start()
+        if start > end:
+            return 0
+        
+        months = 0
+        month = CirculationRollup.month_start(start)
+        while month <= end:
+            chunk_start = max(month, start)
+            chunk_end = min(CirculationRollup.next_month(month) - timedelta(days=1), end)
+            if not Database.run_in_transaction(lambda cursor: CirculationRollup._rebuild(cursor, chunk_start, chunk_end),
+                                               default=False):
+                return None
+            months += 1
+            if progress:
+                progress(chunk_start, chunk_end)
+            month = CirculationRollup.next_month(month)
+        return months
+    
+    @staticmethod
+    def _rebuild(cursor, start, end):
+        for table, _, date_column in ROLLUP_TABLES[:3]:
+            cursor.execute(f"DELETE FROM {table} WHERE {date_column} BETWEEN %s AND %s", (start, end))
+        
+        cursor.execute("""
+        INSERT INTO circulation_daily_book (day, book_id, subject, issued, returned, returned_late, fines)
+        SELECT e.day, e.book_id, COALESCE(MAX(b.subject), 'Unknown'),
+               SUM(e.issued), SUM(e.returned), SUM(e.returned_late), SUM(e.fines)
+        FROM (
+            SELECT issue_date as day, book_id, 1 as issued, 0 as returned, 0 as returned_late, 0 as fines
+            FROM issued_books WHERE issue_date BETWEEN %s AND %s
+            UNION ALL
+            SELECT DATE(IssueDate), BookID, 1, 0, 0, 0
+            FROM transaction WHERE IssueDate >= %s AND IssueDate < %s
+            UNION ALL
+            SELECT DATE(ReturnDate), BookID, 0, 1, DATE(ReturnDate) > DATE(DueDate), Fine
+            FROM transaction WHERE ReturnDate >= %s AND ReturnDate < %s
+        ) e
+        LEFT JOIN books b ON e.book_id = b.book_id
+        GROUP BY e.day, e.book_id
+        """, (start, end, start, end + timedelta(days=1), start, end + timedelta(days=1)))
+        cursor.execute("""
+        INSERT INTO circulation_daily_subject (day, subject, issued, returned, returned_late, fines)
+        SELECT day, subject, SUM(issued), SUM(returned), SUM(returned_late), SUM(fines)
+        FROM circulation_daily_book
+        WHERE day BETWEEN %s AND %s
+        GROUP BY day, subject
+        """, (start, end))
+        cursor.execute("""
+        INSERT INTO circulation_daily (day, issued, returned, returned_late, fines)
+        SELECT day, SUM(issued), SUM(returned), SUM(returned_late), SUM(fines)
+        FROM circulation_daily_subject
+        WHERE day BETWEEN %s AND %s
+        GROUP BY day
+        """, (start, end))
+        
+        # The month row is rebuilt from all of that month's days, so a chunk
+        # that covers only part of a month still leaves it consistent.
+        month = CirculationRollup.month_start(start)
+        cursor.execute("DELETE FROM circulation_monthly_book WHERE month = %s", (month,))
+        cursor.execute("""
+        INSERT INTO circulation_monthly_book (month, book_id, subject, issued, returned, returned_late, fines)
+        SELECT %s, book_id, MAX(subject), SUM(issued), SUM(returned), SUM(returned_late), SUM(fines)
+        FROM circulation_daily_book
+        WHERE day >= %s AND day < %s
+        GROUP BY book_id
+        """, (month, month, CirculationRollup.next_month(month)))
+        return True
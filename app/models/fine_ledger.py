@@ -0,0 +1,205 @@
+from decimal import Decimal, InvalidOperation
+from app.utils.database import Database
+from app.utils.async_database import AsyncDatabase
+from app.models.book_counter import BookCounter
+
+
+CENT = Decimal('0.01')
+
+
+class FineLedger:
+    # fine_ledger is append-only and the source of truth. fine_balances,
+    # fine_daily_totals and the two counters below are derived from it and
+    # updated in the same transaction as every entry, so reads never have
+    # to aggregate the ledger; reconcile() rebuilds them if they drift.
+    OUTSTANDING_COUNTER = 'fines_outstanding_cents'
+    CHARGES_COUNTER = 'fine_charges'
+    
+    @staticmethod
+    def parse_amount(value):
+        try:
+            amount = Decimal(str(value).strip()).quantize(CENT)
+        except (InvalidOperation, ValueError):
+            return None
+        return amount if amount.is_finite() and amount > 0 else None
+    
+    @staticmethod
+    def to_cents(amount):
+        return int(Decimal(str(amount)).quantize(CENT) * 100)
+    
+    @staticmethod
+    def charge(cursor, user_id, amount, transaction_id=None, note=None):
+        # Called inside the transaction that writes the fine, e.g. return_book.
+        amount = Decimal(str(amount)).quantize(CENT)
+        cursor.execute("""
+        INSERT INTO fine_ledger (user_id, entry_type, amount, transaction_id, note)
+        VALUES (%s, 'Charge', %s, %s, %s)
+        """, (user_id, amount, transaction_id, note))
+        cursor.execute("""
+        INSERT INTO fine_balances (user_id, charged, paid, balance)
+        VALUES (%s, %s, 0, %s)
+        ON DUPLICATE KEY UPDATE charged = charged + VALUES(charged), balance = balance + VALUES(balance)
+        """, (user_id, amount, amount))
+        BookCounter.adjust(cursor, FineLedger.OUTSTANDING_COUNTER, FineLedger.to_cents(amount))
+        BookCounter.adjust(cursor, FineLedger.CHARGES_COUNTER, 1)
+        cursor.execute("""
+        INSERT INTO fine_daily_totals (day, charged, collected)
+        VALUES (CURDATE(), %s, 0)
+        ON DUPLICATE KEY UPDATE charged = charged + VALUES(charged)
+        """, (amount,))
+    
+    @staticmethod
+    def record_payment(user_id, amount, recorded_by=None, note=None):
+        amount = FineLedger.parse_amount(amount)
+        if amount is None:
+            return "invalid_amount"
+        
+        def work(cursor):
+            # The balance row is locked first, as in charge(), so a payment
+            # and a return for the same student serialise instead of deadlocking.
+            cursor.execute("SELECT balance FROM fine_balances WHERE user_id = %s FOR UPDATE", (user_id,))
+            row = cursor.fetchone()
+            balance = row[0] if row else Decimal('0.00')
+            if balance <= 0:
+                return "no_balance"
+            if amount > balance:
+                return "exceeds_balance"
+            
+            cursor.execute("""
+            INSERT INTO fine_ledger (user_id, entry_type, amount, note, created_by)
+            VALUES (%s, 'Payment', %s, %s, %s)
+            """, (user_id, amount, note, recorded_by))
+            cursor.execute("""
+            UPDATE fine_balances SET paid = paid + %s, balance = balance - %s
+            WHERE user_id = %s
+            """, (amount, amount, user_id))
+            BookCounter.adjust(cursor, FineLedger.OUTSTANDING_COUNTER, -FineLedger.to_cents(amount))
+            cursor.execute("""
+            INSERT INTO fine_daily_totals (day, charged, collected)
+            VALUES (CURDATE(), 0, %s)
+            ON DUPLICATE KEY UPDATE collected = collected + VALUES(collected)
+            """, (amount,))
+            return {'success': True, 'paid': float(amount), 'balance': float(balance - amount)}
+        
+        return Database.run_in_transaction(work, default=False)
+    
+    @staticmethod
+    def get_balance(user_id):
+        query = """
+        SELECT charged, paid, balance FROM fine_balances WHERE user_id = %s
+        """
+        result = Database.execute_single_query(query, (user_id,))
+        if not result:
+            return {'charged': 0.0, 'paid': 0.0, 'balance': 0.0}
+        return {key: float(value) for key, value in result.items()}
+    
+    @staticmethod
+    async def get_balance_async(user_id):
+        return await AsyncDatabase.run(FineLedger.get_balance, user_id)
+    
+    @staticmethod
+    def get_outstanding(limit=200):
+        # A backward range scan of idx_fine_balances_balance; only students
+        # who still owe something are read.
+        query = """
+        SELECT fb.user_id as UserID, fb.charged, fb.paid, fb.balance, fb.updated_at,
+               COALESCE(u.Name, 'Unknown Student') as student_name,
+               COALESCE(u.Email, 'Unknown Email') as student_email
+        FROM fine_balances fb
+        LEFT JOIN users u ON fb.user_id = u.UserID
+        WHERE fb.balance > 0
+        ORDER BY fb.balance DESC
+        LIMIT %s
+        """
+        result = Database.execute_query(query, (limit,))
+        return result if result else []
+    
+    @staticmethod
+    def get_summary(counts=None):
+        counts = counts if counts is not None else BookCounter.get_counts() or {}
+        today = Database.execute_single_query("""
+        SELECT collected FROM fine_daily_totals WHERE day = CURDATE()
+        """)
+        return {
+            'total_outstanding': counts.get(FineLedger.OUTSTANDING_COUNTER, 0) / 100,
+            'total_fines': counts.get(FineLedger.CHARGES_COUNTER, 0),
+            'collected_today': float(today['collected']) if today else 0.0
+        }
+    
+    @staticmethod
+    def get_entries(user_id, limit=50):
+        query = """
+        SELECT entry_id, entry_type, amount, note, created_by, created_at
+        FROM fine_ledger
+        WHERE user_id = %s
+        ORDER BY created_at DESC, entry_id DESC
+        LIMIT %s
+        """
+        result = Database.execute_query(query, (user_id, limit))
+        return result if result else []
+    
+    @staticmethod
+    async def get_entries_async(user_id, limit=50):
+        return await AsyncDatabase.run(FineLedger.get_entries, user_id, limit)
+    
+    @staticmethod
+    def settle(entries, outstanding):
+        # Payments are not tied to a charge; they settle the oldest charges
+        # first, so whatever is still outstanding belongs to the newest ones.
+        # Returns the status of each charge in entries, keyed by entry_id.
+        remaining = Decimal(str(outstanding))
+        statuses = {}
+        charges = [entry for entry in entries if entry['entry_type'] == 'Charge']
+        for entry in sorted(charges, key=lambda entry: (entry['created_at'], entry['entry_id']), reverse=True):
+            amount = Decimal(str(entry['amount']))
+            if remaining <= 0:
+                statuses[entry['entry_id']] = 'Paid'
+            elif remaining >= amount:
+                statuses[entry['entry_id']] = 'Pending'
+            else:
+                statuses[entry['entry_id']] = 'Part paid'
+            remaining -= amount
+        return statuses
+    
+    @staticmethod
+    def rebuild(cursor):
+        # Also run as a step of the migration that creates the ledger, so the
+        # balances and counters exist before the first request reads them.
+        cursor.execute("DELETE FROM fine_balances")
+        cursor.execute("""
+        INSERT INTO fine_balances (user_id, charged, paid, balance)
+        SELECT user_id,
+               SUM(CASE WHEN entry_type = 'Charge' THEN amount ELSE 0 END),
+               SUM(CASE WHEN entry_type = 'Payment' THEN amount ELSE 0 END),
+               SUM(CASE WHEN entry_type = 'Charge' THEN amount ELSE -amount END)
+        FROM fine_ledger
+        GROUP BY user_id
+        """)
+        cursor.execute("DELETE FROM fine_daily_totals")
+        cursor.execute("""
+        INSERT INTO fine_daily_totals (day, charged, collected)
+        SELECT DATE(created_at),
+               SUM(CASE WHEN entry_type = 'Charge' THEN amount ELSE 0 END),
+               SUM(CASE WHEN entry_type = 'Payment' THEN amount ELSE 0 END)
+        FROM fine_ledger
+        GROUP BY DATE(created_at)
+        """)
+        cursor.execute("""
+        SELECT COALESCE(SUM(balance), 0), (SELECT COUNT(*) FROM fine_ledger WHERE entry_type = 'Charge')
+        FROM fine_balances
+        """)
+        outstanding, charges = cursor.fetchone()
+        cursor.executemany("""
+        INSERT INTO book_counters (counter_name, counter_value)
+        VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE counter_value = VALUES(counter_value)
+        """, [(FineLedger.OUTSTANDING_COUNTER, FineLedger.to_cents(outstanding)),
+              (FineLedger.CHARGES_COUNTER, int(charges))])
+    
+    @staticmethod
+    def reconcile():
+        def work(cursor):
+            FineLedger.rebuild(cursor)
+            return True
+        
+        return Database.run_in_transaction(work, default=False)
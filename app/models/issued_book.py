@@ -1,16 +1,32 @@
 from app.utils.database import Database
+from app.utils.async_database import AsyncDatabase
+from app.models.book_counter import BookCounter
+from app.models.circulation_event import CirculationEvent
+from app.models.circulation_rollup import CirculationRollup
+from app.models.fine_ledger import FineLedger
+from app.models.overdue_tracker import OverdueTracker
+from app.models.reservation_queue import ReservationQueue
+from app.utils.batch_loader import BatchLoader
+from app.utils.cache import Cache
+from app.utils.pagination import clamp_page_size, decode_cursor, keyset_condition, order_clause, paginate_rows
 from datetime import datetime, timedelta
 
 
 class IssuedBook:
+    EXPORT_COLUMNS = ('TransactionID', 'UserID', 'student_name', 'student_email', 'BookID',
+                      'book_title', 'book_author', 'IssueDate', 'DueDate', 'ReturnDate', 'Fine')
+    # Seconds the server waits on a slow export client before dropping it.
+    EXPORT_WRITE_TIMEOUT = 600
+    
     @staticmethod
     def issue_book(user_id, book_id):
-        connection = Database.get_connection()
-        if not connection:
-            return False
-        
-        try:
-            cursor = connection.cursor()
+        def work(cursor):
+            # Lock order is student row, then book rows, as in Book.reserve_books;
+            # return_book starts at the book row, so no cycle can form.
+            cursor.execute("SELECT UserID, Name FROM users WHERE UserID = %s FOR UPDATE", (user_id,))
+            student = cursor.fetchone()
+            if student is None:
+                return False
             
             check_student_books_query = """
             SELECT COUNT(*) FROM issued_books WHERE UserID = %s
@@ -21,14 +37,26 @@ class IssuedBook:
             if borrowed_count >= 3:
                 return "limit_exceeded"
             
-            check_book_query = """
-            SELECT status FROM books WHERE book_id = %s
+            # Compare-and-swap: only the transaction that still sees the copy
+            # as Available flips it, so the same copy can never be issued twice.
+            update_query = """
+            UPDATE books SET status = 'Borrowed' WHERE book_id = %s AND status = 'Available'
             """
-            cursor.execute(check_book_query, (book_id,))
-            book_status = cursor.fetchone()
-            
-            if not book_status or book_status[0] != 'Available':
-                return False
+            cursor.execute(update_query, (book_id,))
+            previous_status = 'Available'
+            if cursor.rowcount != 1:
+                # A Reserved copy can only go to the student holding it.
+                cursor.execute("""
+                UPDATE books SET status = 'Borrowed' WHERE book_id = %s AND status = 'Reserved'
+                AND EXISTS (SELECT 1 FROM book_reservations
+                            WHERE book_id = %s AND user_id = %s AND status = 'Active')
+                """, (book_id, book_id, user_id))
+                if cursor.rowcount != 1:
+                    return False
+                ReservationQueue.fulfil_hold(cursor, book_id, user_id)
+                previous_status = 'Reserved'
+            cursor.execute("SELECT subject, title FROM books WHERE book_id = %s", (book_id,))
+            subject, title = cursor.fetchone()
             
             issue_date = datetime.now().date()
             due_date = issue_date + timedelta(days=7)
@@ -38,21 +66,16 @@ class IssuedBook:
             VALUES (%s, %s, %s, %s)
             """
             cursor.execute(insert_query, (user_id, book_id, issue_date, due_date))
-            
-            update_query = """
-            UPDATE books SET status = 'Borrowed' WHERE book_id = %s
-            """
-            cursor.execute(update_query, (book_id,))
-            
-            connection.commit()
+            BookCounter.move(cursor, previous_status, 'Borrowed')
+            CirculationRollup.record(cursor, issue_date, book_id, subject, issued=1)
+            CirculationEvent.record(cursor, 'issue', f'Book "{title}" was issued to {student[1]}', book_id, user_id)
             return True
-        except Exception as e:
-            connection.rollback()
-            return False
-        finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+        
+        result = Database.run_in_transaction(work, default=False)
+        if result == True:
+            Cache.invalidate('catalogue', f"loans:{user_id}")
+            CirculationEvent.mark_stale()
+        return result
     
     @staticmethod
     def get_all_issued_books():
@@ -72,6 +95,61 @@ class IssuedBook:
         return result if result else []
     
     @staticmethod
+    @Cache.cached('loans', scope=lambda user_id: user_id)
+    def get_user_loans(user_id):
+        # Served by idx_issued_books_user_due: the filter, the order and every
+        # loan column come from the index, and books is read by primary key.
+        query = """
+        SELECT ib.issueID, ib.book_id, ib.issue_date, ib.due_date,
+               COALESCE(b.title, 'Unknown Book') as title,
+               COALESCE(b.author, 'Unknown Author') as author,
+               DATEDIFF(ib.due_date, CURDATE()) as days_until_due,
+               ib.due_date < CURDATE() as is_overdue
+        FROM issued_books ib
+        LEFT JOIN books b ON ib.book_id = b.book_id
+        WHERE ib.UserID = %s
+        ORDER BY ib.due_date
+        """
+        return Database.execute_query(query, (user_id,))
+    
+    @staticmethod
+    def get_issued_books_page(cursor=None, direction='next', page_size=None):
+        columns = ['ib.issue_date', 'ib.issueID']
+        page_size = clamp_page_size(page_size)
+        direction = 'prev' if direction == 'prev' else 'next'
+        cursor_values = decode_cursor(cursor, 'issue_date')
+        if cursor_values is not None and len(cursor_values) != len(columns):
+            cursor_values = None
+        
+        query = """
+        SELECT ib.issueID, ib.issue_date, ib.due_date, ib.book_id, ib.UserID,
+               COALESCE(b.title, 'Unknown Book') as title,
+               COALESCE(b.author, 'Unknown Author') as author,
+               COALESCE(b.isbn, 'N/A') as isbn,
+               COALESCE(u.Name, 'Unknown Student') as student_name,
+               COALESCE(u.Email, 'Unknown Email') as student_email
+        FROM issued_books ib
+        LEFT JOIN books b ON ib.book_id = b.book_id
+        LEFT JOIN users u ON ib.UserID = u.UserID
+        """
+        params = []
+        # Newest first, so "next" walks towards older issue dates.
+        descending = direction == 'next'
+        if cursor_values is not None:
+            condition, params = keyset_condition(columns, cursor_values, descending=descending)
+            query += " WHERE " + condition
+        query += " ORDER BY " + order_clause(columns, descending=descending)
+        query += " LIMIT %s"
+        params.append(page_size + 1)
+        
+        rows = Database.execute_query(query, tuple(params)) or []
+        page = paginate_rows(rows, page_size, direction, cursor_values is not None, 'issue_date',
+                             lambda issued: [issued['issue_date'], issued['issueID']])
+        page['issued_books'] = page.pop('items')
+        return page
+    
+    @staticmethod
+    @Cache.cached('catalogue', fallback=[])
     def get_available_books():
         query = """
         SELECT book_id, title, author, isbn
@@ -79,8 +157,7 @@ class IssuedBook:
         WHERE status = 'Available'
         ORDER BY title
         """
-        result = Database.execute_query(query)
-        return result if result else []
+        return Database.execute_query(query)
     
     @staticmethod
     def get_students():
@@ -101,6 +178,22 @@ class IssuedBook:
         result = Database.execute_single_query(query, (user_id,))
         return result['count'] if result else 0
     
+    @staticmethod
+    def get_borrowed_counts(user_ids=None):
+        if user_ids is None:
+            query = """
+            SELECT UserID, COUNT(*) as count FROM issued_books GROUP BY UserID
+            """
+            result = Database.execute_query(query)
+            return {row['UserID']: row['count'] for row in result} if result else {}
+        
+        query = """
+        SELECT UserID, COUNT(*) as count FROM issued_books
+        WHERE UserID IN ({keys})
+        GROUP BY UserID
+        """
+        return BatchLoader.load_values(query, user_ids, 'UserID', 'count', default=0)
+    
     @staticmethod
     def get_transaction_history():
         query = """
@@ -119,49 +212,77 @@ class IssuedBook:
         return result if result else []
     
     @staticmethod
-    def get_users_with_fines():
-        query = """
-        SELECT t.TransactionID, t.UserID, t.BookID, t.IssueDate, t.DueDate, 
+    def iter_transaction_history(start_date=None, end_date=None, batch_size=1000):
+        conditions = []
+        params = []
+        if start_date:
+            conditions.append("t.ReturnDate >= %s")
+            params.append(start_date)
+        if end_date:
+            conditions.append("t.ReturnDate < %s")
+            params.append(end_date + timedelta(days=1))
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        query = f"""
+        SELECT t.TransactionID, t.UserID, t.BookID, t.IssueDate, t.DueDate,
                t.ReturnDate, t.Fine,
+               COALESCE(b.title, 'Unknown Book') as book_title,
+               COALESCE(b.author, 'Unknown Author') as book_author,
                COALESCE(u.Name, 'Unknown Student') as student_name,
-               COALESCE(u.Email, 'Unknown Email') as student_email,
-               COALESCE(b.Title, 'Unknown Book') as book_title,
-               COALESCE(b.Author, 'Unknown Author') as book_author
+               COALESCE(u.Email, 'Unknown Email') as student_email
         FROM transaction t
+        LEFT JOIN books b ON t.BookID = b.book_id
         LEFT JOIN users u ON t.UserID = u.UserID
-        LEFT JOIN book b ON t.BookID = b.BookID
-        WHERE t.Fine > 0
-        ORDER BY t.Fine DESC, t.ReturnDate DESC
+        {where_clause}
+        ORDER BY t.ReturnDate, t.TransactionID
         """
-        result = Database.execute_query(query)
-        return result if result else []
+        
+        connection = Database.get_connection()
+        if not connection:
+            return
+        
+        cursor = None
+        finished = False
+        try:
+            # Unbuffered: rows stay on the server side of the socket until
+            # fetchmany() asks for them, so memory is bounded by batch_size.
+            cursor = connection.cursor(dictionary=True, buffered=False)
+            cursor.execute("SET SESSION net_write_timeout = %s", (IssuedBook.EXPORT_WRITE_TIMEOUT,))
+            cursor.execute(query, tuple(params))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row
+            cursor.execute("SET SESSION net_write_timeout = DEFAULT")
+            finished = True
+        except Exception as e:
+            print(f"Error streaming transaction history: {e}")
+            raise
+        finally:
+            if finished:
+                Database.close_connection(connection, cursor)
+            else:
+                # The client went away mid-export; draining the rest of the
+                # result set to reuse the link would cost more than a reconnect.
+                connection.discard()
+    
+    @staticmethod
+    def get_users_with_fines():
+        return FineLedger.get_outstanding()
     
     @staticmethod
     def get_fines_summary():
-        query = """
-        SELECT 
-            SUM(Fine) as total_outstanding,
-            COUNT(*) as total_fines,
-            SUM(CASE WHEN DATE(ReturnDate) = CURDATE() THEN Fine ELSE 0 END) as collected_today
-        FROM transaction 
-        WHERE Fine > 0
-        """
-        result = Database.execute_single_query(query)
-        return {
-            'total_outstanding': result.get('total_outstanding', 0) or 0,
-            'total_fines': result.get('total_fines', 0) or 0,
-            'collected_today': result.get('collected_today', 0) or 0
-        } if result else {'total_outstanding': 0, 'total_fines': 0, 'collected_today': 0}
+        return FineLedger.get_summary()
     
     @staticmethod
     def get_student_fines(user_id):
-        query = """
-        SELECT SUM(Fine) as total_fines
-        FROM transaction 
-        WHERE UserID = %s AND Fine > 0
-        """
-        result = Database.execute_single_query(query, (user_id,))
-        return result.get('total_fines', 0) if result and result.get('total_fines') else 0
+        return FineLedger.get_balance(user_id)['balance']
+    
+    @staticmethod
+    async def get_student_fines_async(user_id):
+        return await AsyncDatabase.run(IssuedBook.get_student_fines, user_id)
     
     @staticmethod
     def get_student_fine_history(user_id):
@@ -178,18 +299,27 @@ class IssuedBook:
         result = Database.execute_query(query, (user_id,))
         return result if result else []
     
+    @staticmethod
+    async def get_student_fine_history_async(user_id):
+        return await AsyncDatabase.run(IssuedBook.get_student_fine_history, user_id)
+    
     @staticmethod
     def return_book(user_id, book_id, return_date_str):
-        connection = Database.get_connection()
-        if not connection:
+        try:
+            return_date = datetime.strptime(return_date_str, '%Y-%m-%d').date()
+        except ValueError:
             return False
         
-        try:
-            cursor = connection.cursor()
+        def work(cursor):
+            cursor.execute("SELECT status, title, subject FROM books WHERE book_id = %s FOR UPDATE", (book_id,))
+            previous_status = cursor.fetchone()
             
+            # Locking the loan row makes a concurrent second return of the same
+            # copy wait, then find nothing, instead of writing a second fine.
             check_issued_query = """
-            SELECT issueID, issue_date, due_date FROM issued_books 
+            SELECT issueID, issue_date, due_date, status FROM issued_books 
             WHERE UserID = %s AND book_id = %s
+            FOR UPDATE
             """
             cursor.execute(check_issued_query, (user_id, book_id))
             issued_record = cursor.fetchone()
@@ -197,44 +327,46 @@ class IssuedBook:
             if not issued_record:
                 return False
             
-            issue_id, issue_date, due_date = issued_record
-            return_date = datetime.strptime(return_date_str, '%Y-%m-%d').date()
+            issue_id, issue_date, due_date, loan_status = issued_record
             
             fine_amount = 0.00
             if return_date > due_date:
                 days_late = (return_date - due_date).days
-                fine_amount = days_late * 10.00
-            
-            get_valid_book_uuid_query = """
-            SELECT BookID FROM book LIMIT 1
-            """
-            cursor.execute(get_valid_book_uuid_query)
-            book_uuid_result = cursor.fetchone()
-            book_uuid = book_uuid_result[0] if book_uuid_result else str(book_id)
+                fine_amount = days_late * OverdueTracker.FINE_PER_DAY
             
             insert_transaction_query = """
             INSERT INTO transaction (UserID, BookID, IssueDate, DueDate, ReturnDate, Fine)
             VALUES (%s, %s, %s, %s, %s, %s)
             """
-            cursor.execute(insert_transaction_query, (user_id, book_uuid, issue_date, due_date, return_date, fine_amount))
+            cursor.execute(insert_transaction_query, (user_id, book_id, issue_date, due_date, return_date, fine_amount))
+            if fine_amount > 0:
+                title = previous_status[1] if previous_status else 'Unknown Book'
+                FineLedger.charge(cursor, user_id, fine_amount, cursor.lastrowid, f"Late return - {title}")
             
             delete_issued_query = """
             DELETE FROM issued_books 
-            WHERE UserID = %s AND book_id = %s
+            WHERE issueID = %s
             """
-            cursor.execute(delete_issued_query, (user_id, book_id))
+            cursor.execute(delete_issued_query, (issue_id,))
+            if loan_status == 'Overdue':
+                OverdueTracker.release(cursor, due_date)
             
-            update_book_query = """
-            UPDATE books SET status = 'Available' WHERE book_id = %s
-            """
-            cursor.execute(update_book_query, (book_id,))
-            
-            connection.commit()
+            # The copy goes to the head of the book's reservation queue, if
+            # there is one, instead of back on the shelf.
+            holder = ReservationQueue.assign_next(cursor, book_id, previous_status[0] if previous_status else None)
+            CirculationRollup.record(cursor, return_date, book_id, previous_status[2] if previous_status else None,
+                                     returned=1, returned_late=int(return_date > due_date), fines=fine_amount)
+            summary = f'Book "{previous_status[1] if previous_status else "Unknown Book"}" was returned'
+            if fine_amount > 0:
+                summary += f" {(return_date - due_date).days} days late"
+            CirculationEvent.record(cursor, 'return', summary, book_id, user_id)
+            if holder:
+                title = previous_status[1] if previous_status else 'Unknown Book'
+                CirculationEvent.record(cursor, 'hold', f'Book "{title}" is on hold for a reservation', book_id, holder)
             return {'success': True, 'fine': fine_amount}
-        except Exception as e:
-            connection.rollback()
-            return False
-        finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
\ No newline at end of file
+        
+        result = Database.run_in_transaction(work, default=False)
+        if result:
+            Cache.invalidate('catalogue', f"loans:{user_id}")
+            CirculationEvent.mark_stale()
+        return result
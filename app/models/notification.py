@@ -0,0 +1,188 @@
+import json
+from datetime import date, timedelta
+from app.utils.database import Database
+from app.utils.async_database import AsyncDatabase
+from app.models.overdue_tracker import OverdueTracker
+
+
+MESSAGES = {
+    'due_soon': ('Library book due soon', 'Book "{title}" is due on {due_date}. Please return or renew it in time.'),
+    'overdue': ('Library book overdue', 'Book "{title}" was due on {due_date}. A fine of {fine_per_day:g} Taka per day is accruing.'),
+    'reservation_ready': ('Reserved book ready', 'Your reservation for "{title}" is ready to collect.')
+}
+
+# One INSERT ... SELECT per kind. The dedupe key makes re-running a scan
+# harmless: a loan or reservation is only ever notified once per kind.
+SCAN_QUERIES = {
+    'due_soon': """
+    INSERT IGNORE INTO notifications (dedupe_key, user_id, kind, recipient, payload)
+    SELECT CONCAT('due_soon:', ib.issueID), ib.UserID, 'due_soon', u.Email,
+           JSON_OBJECT('title', COALESCE(b.title, 'Unknown Book'), 'due_date', ib.due_date)
+    FROM issued_books ib
+    JOIN users u ON u.UserID = ib.UserID
+    LEFT JOIN books b ON b.book_id = ib.book_id
+    WHERE ib.status = 'Issued' AND ib.due_date BETWEEN %s AND %s
+    """,
+    'overdue': """
+    INSERT IGNORE INTO notifications (dedupe_key, user_id, kind, recipient, payload)
+    SELECT CONCAT('overdue:', ib.issueID), ib.UserID, 'overdue', u.Email,
+           JSON_OBJECT('title', COALESCE(b.title, 'Unknown Book'), 'due_date', ib.due_date)
+    FROM issued_books ib
+    JOIN users u ON u.UserID = ib.UserID
+    LEFT JOIN books b ON b.book_id = ib.book_id
+    WHERE ib.status = 'Overdue' AND ib.due_date >= %s AND ib.due_date < %s
+    """,
+    'reservation_ready': """
+    INSERT IGNORE INTO notifications (dedupe_key, user_id, kind, recipient, payload)
+    SELECT CONCAT('reservation_ready:', br.reservation_id), br.user_id, 'reservation_ready', u.Email,
+           JSON_OBJECT('title', COALESCE(b.title, 'Unknown Book'))
+    FROM book_reservations br
+    JOIN users u ON u.UserID = br.user_id
+    LEFT JOIN books b ON b.book_id = br.book_id
+    WHERE br.status = 'Active' AND br.hold_expires_at > %s
+    """
+}
+
+
+class Notification:
+    @staticmethod
+    def render(kind, payload):
+        if isinstance(payload, (str, bytes, bytearray)):
+            payload = json.loads(payload)
+        subject, body = MESSAGES.get(kind, ('Library notification', '{title}'))
+        try:
+            return subject, body.format(fine_per_day=OverdueTracker.FINE_PER_DAY, **payload)
+        except (KeyError, IndexError):
+            return subject, body
+    
+    @staticmethod
+    def scan(today=None, due_within_days=2, overdue_within_days=7):
+        today = today or date.today()
+        # Only loans that fell due in the last few days are looked at, so the
+        # scan does not walk the whole overdue backlog every run. Older loans
+        # were already notified by an earlier scan as long as scans run more
+        # often than the window.
+        params = {
+            'due_soon': (today, today + timedelta(days=due_within_days)),
+            'overdue': (today - timedelta(days=overdue_within_days), today),
+            'reservation_ready': (today,)
+        }
+        
+        def work(cursor):
+            queued = {}
+            for kind, query in SCAN_QUERIES.items():
+                cursor.execute(query, params[kind])
+                queued[kind] = cursor.rowcount
+            return queued
+        
+        return Database.run_in_transaction(work)
+    
+    @staticmethod
+    def release_stale_claims(lease_seconds):
+        # A worker that died mid-batch leaves rows in Sending; put them back.
+        # Delivery is at-least-once: such a row may be sent a second time.
+        return Database.execute_insert_query("""
+        UPDATE notifications SET status = 'Pending', claimed_at = NULL
+        WHERE status = 'Sending' AND claimed_at < NOW() - INTERVAL %s SECOND
+        """, (lease_seconds,)) is not None
+    
+    @staticmethod
+    def claim_batch(limit):
+        def work(cursor):
+            cursor.execute("""
+            SELECT notification_id, user_id, kind, recipient, payload, attempts
+            FROM notifications
+            WHERE status = 'Pending' AND next_attempt_at <= NOW()
+            ORDER BY next_attempt_at
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+            """, (limit,))
+            rows = [dict(zip(cursor.column_names, row)) for row in cursor.fetchall()]
+            if not rows:
+                return []
+            
+            placeholders = ', '.join(['%s'] * len(rows))
+            cursor.execute(f"""
+            UPDATE notifications SET status = 'Sending', claimed_at = NOW()
+            WHERE notification_id IN ({placeholders})
+            """, [row['notification_id'] for row in rows])
+            return rows
+        
+        return Database.run_in_transaction(work, default=[])
+    
+    @staticmethod
+    def mark_sent(notification_ids):
+        if not notification_ids:
+            return True
+        placeholders = ', '.join(['%s'] * len(notification_ids))
+        return Database.execute_insert_query(f"""
+        UPDATE notifications
+        SET status = 'Sent', attempts = attempts + 1, sent_at = NOW(), claimed_at = NULL, last_error = NULL
+        WHERE notification_id IN ({placeholders})
+        """, list(notification_ids)) is not None
+    
+    @staticmethod
+    def mark_failed(failures, max_attempts, retry_base_seconds):
+        # failures: (notification row, error message) pairs. The delay doubles
+        # with every attempt; the last allowed attempt marks the row Failed.
+        if not failures:
+            return 0
+        rows = []
+        for notification, error in failures:
+            attempts = notification['attempts'] + 1
+            status = 'Failed' if attempts >= max_attempts else 'Pending'
+            delay = retry_base_seconds * 2 ** (attempts - 1)
+            rows.append((status, attempts, delay, str(error)[:255], notification['notification_id']))
+        return Database.execute_many("""
+        UPDATE notifications
+        SET status = %s, attempts = %s, next_attempt_at = NOW() + INTERVAL %s SECOND,
+            claimed_at = NULL, last_error = %s
+        WHERE notification_id = %s
+        """, rows)
+    
+    @staticmethod
+    def get_for_user(user_id, limit=5):
+        query = """
+        SELECT kind, payload, created_at
+        FROM notifications
+        WHERE user_id = %s
+        ORDER BY created_at DESC
+        LIMIT %s
+        """
+        result = Database.execute_query(query, (user_id, limit)) or []
+        notifications = []
+        for row in result:
+            _, message = Notification.render(row['kind'], row['payload'])
+            notifications.append({'message': message, 'time': row['created_at'].strftime('%Y-%m-%d %H:%M')})
+        return notifications
+    
+    @staticmethod
+    async def get_for_user_async(user_id, limit=5):
+        return await AsyncDatabase.run(Notification.get_for_user, user_id, limit)
+    
+    @staticmethod
+    def get_recent(limit=50):
+        query = """
+        SELECT n.notification_id, n.kind, n.recipient, n.payload, n.status, n.attempts,
+               n.last_error, n.created_at, n.sent_at
+        FROM notifications n
+        ORDER BY n.notification_id DESC
+        LIMIT %s
+        """
+        result = Database.execute_query(query, (limit,)) or []
+        for row in result:
+            row['subject'], row['message'] = Notification.render(row['kind'], row['payload'])
+        return result
+    
+    @staticmethod
+    def get_outbox_stats():
+        query = """
+        SELECT (SELECT COUNT(*) FROM notifications WHERE status IN ('Pending', 'Sending')) as pending,
+               (SELECT COUNT(*) FROM notifications WHERE status = 'Failed') as failed,
+               (SELECT COUNT(*) FROM notifications WHERE kind = 'overdue' AND created_at >= CURDATE()) as overdue_today,
+               (SELECT COUNT(*) FROM notifications WHERE status = 'Sent' AND sent_at >= CURDATE()) as sent_today
+        """
+        row = Database.execute_single_query(query)
+        if not row:
+            return {'pending': 0, 'failed': 0, 'overdue_today': 0, 'sent_today': 0}
+        return {key: int(value or 0) for key, value in row.items()}
@@ -0,0 +1,104 @@
+from datetime import date
+from app.utils.database import Database
+from app.models.book_counter import BookCounter
+
+
+EPOCH = date(1970, 1, 1)
+
+
+class OverdueTracker:
+    FINE_PER_DAY = 10.00
+    # Two running totals over loans marked Overdue: how many there are and the
+    # sum of their due dates (days since EPOCH). Together they give the fines
+    # accrued as of any day without touching the loans:
+    #   FINE_PER_DAY * (loans * today - due_days)
+    LOANS_COUNTER = 'overdue_loans'
+    DUE_DAYS_COUNTER = 'overdue_due_days'
+    
+    @staticmethod
+    def day_number(day):
+        return (day - EPOCH).days
+    
+    @staticmethod
+    def sweep(today=None, batch_size=500):
+        # Only loans still marked Issued with a past due date are visited, a
+        # range on idx_issued_books_status_due, so each run touches just the
+        # loans that crossed their due date since the previous one.
+        today = today or date.today()
+        marked = 0
+        
+        def work(cursor):
+            cursor.execute("""
+            SELECT issueID, due_date FROM issued_books
+            WHERE status = 'Issued' AND due_date < %s
+            ORDER BY due_date
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+            """, (today, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                return 0
+            
+            placeholders = ', '.join(['%s'] * len(rows))
+            cursor.execute(f"""
+            UPDATE issued_books SET status = 'Overdue'
+            WHERE status = 'Issued' AND issueID IN ({placeholders})
+            """, [issue_id for issue_id, _ in rows])
+            if cursor.rowcount != len(rows):
+                raise RuntimeError("Overdue sweep lost a locked loan")
+            
+            BookCounter.adjust(cursor, OverdueTracker.LOANS_COUNTER, len(rows))
+            BookCounter.adjust(cursor, OverdueTracker.DUE_DAYS_COUNTER,
+                               sum(OverdueTracker.day_number(due_date) for _, due_date in rows))
+            return len(rows)
+        
+        while True:
+            count = Database.run_in_transaction(work)
+            if count is None:
+                return marked or None
+            marked += count
+            if count < batch_size:
+                return marked
+    
+    @staticmethod
+    def release(cursor, due_date):
+        # Called inside the transaction that closes an Overdue loan.
+        BookCounter.adjust(cursor, OverdueTracker.LOANS_COUNTER, -1)
+        BookCounter.adjust(cursor, OverdueTracker.DUE_DAYS_COUNTER, -OverdueTracker.day_number(due_date))
+    
+    @staticmethod
+    def get_summary(today=None, counts=None):
+        today = today or date.today()
+        counts = counts if counts is not None else BookCounter.get_counts() or {}
+        loans = counts.get(OverdueTracker.LOANS_COUNTER)
+        if loans is None:
+            return None
+        
+        due_days = counts.get(OverdueTracker.DUE_DAYS_COUNTER, 0)
+        accrued = OverdueTracker.FINE_PER_DAY * (loans * OverdueTracker.day_number(today) - due_days)
+        return {'overdue_loans': loans, 'accrued_fines': round(max(accrued, 0), 2)}
+    
+    @staticmethod
+    def ensure_initialized():
+        if OverdueTracker.get_summary() is not None:
+            return True
+        return OverdueTracker.reconcile()
+    
+    @staticmethod
+    def reconcile():
+        def work(cursor):
+            cursor.execute("""
+            SELECT COUNT(*), COALESCE(SUM(DATEDIFF(due_date, '1970-01-01')), 0)
+            FROM issued_books
+            WHERE status = 'Overdue'
+            FOR SHARE
+            """)
+            loans, due_days = cursor.fetchone()
+            cursor.executemany("""
+            INSERT INTO book_counters (counter_name, counter_value)
+            VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE counter_value = VALUES(counter_value)
+            """, [(OverdueTracker.LOANS_COUNTER, int(loans)), (OverdueTracker.DUE_DAYS_COUNTER, int(due_days))])
+            return True
+        
+        return Database.run_in_transaction(work, default=False)
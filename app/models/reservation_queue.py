@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+from app.utils.database import Database
+from app.models.book_counter import BookCounter
+from config import Config
+
+
+class ReservationQueue:
+    # Each book has a FIFO queue of Queued reservations ordered by created_at,
+    # read from idx_reservations_queue. At most one reservation per copy is
+    # Active: the hold on a copy set aside for that student until
+    # hold_expires_at. Every method here expects the book row to be locked
+    # first, the same order issue_book and return_book use.
+    
+    @staticmethod
+    def hold_expiry(now=None):
+        return (now or datetime.now()) + timedelta(days=Config.RESERVATION_HOLD_DAYS)
+    
+    @staticmethod
+    def assign_next(cursor, book_id, current_status, now=None):
+        # Hands a copy that just came free to the head of its queue, or puts
+        # it back on the shelf. Returns the reserver's user id, if any.
+        cursor.execute("""
+        SELECT reservation_id, user_id FROM book_reservations
+        WHERE book_id = %s AND status = 'Queued'
+        ORDER BY created_at, reservation_id
+        LIMIT 1
+        FOR UPDATE
+        """, (book_id,))
+        head = cursor.fetchone()
+        
+        new_status = 'Reserved' if head else 'Available'
+        if head:
+            cursor.execute("""
+            UPDATE book_reservations SET status = 'Active', hold_expires_at = %s
+            WHERE reservation_id = %s
+            """, (ReservationQueue.hold_expiry(now), head[0]))
+        cursor.execute("UPDATE books SET status = %s WHERE book_id = %s", (new_status, book_id))
+        if current_status:
+            BookCounter.move(cursor, current_status, new_status)
+        return head[1] if head else None
+    
+    @staticmethod
+    def fulfil_hold(cursor, book_id, user_id):
+        # Issuing a held copy to its holder closes the hold.
+        cursor.execute("""
+        UPDATE book_reservations SET status = 'Fulfilled'
+        WHERE book_id = %s AND user_id = %s AND status = 'Active'
+        """, (book_id, user_id))
+        return cursor.rowcount == 1
+    
+    @staticmethod
+    def expire_holds(now=None, batch_size=500):
+        now = now or datetime.now()
+        expired = 0
+        
+        def work(cursor):
+            # Candidates come from idx_reservations_hold without locking; the
+            # books are locked next, skipping any a return or issue holds, and
+            # each hold is re-checked under that lock before it is released.
+            cursor.execute("""
+            SELECT reservation_id, book_id FROM book_reservations
+            WHERE status = 'Active' AND hold_expires_at < %s
+            ORDER BY hold_expires_at
+            LIMIT %s
+            """, (now, batch_size))
+            candidates = cursor.fetchall()
+            if not candidates:
+                return 0, 0
+            
+            book_ids = sorted({book_id for _, book_id in candidates})
+            placeholders = ', '.join(['%s'] * len(book_ids))
+            cursor.execute(f"""
+            SELECT book_id, status FROM books
+            WHERE book_id IN ({placeholders})
+            ORDER BY book_id
+            FOR UPDATE SKIP LOCKED
+            """, book_ids)
+            statuses = dict(cursor.fetchall())
+            
+            released = 0
+            freed = set()
+            for reservation_id, book_id in candidates:
+                if book_id not in statuses:
+                    continue
+                cursor.execute("""
+                UPDATE book_reservations SET status = 'Expired'
+                WHERE reservation_id = %s AND status = 'Active' AND hold_expires_at < %s
+                """, (reservation_id, now))
+                if cursor.rowcount == 1:
+                    released += 1
+                    freed.add(book_id)
+            
+            for book_id in sorted(freed):
+                if statuses[book_id] != 'Reserved':
+                    continue
+                cursor.execute("""
+                SELECT 1 FROM book_reservations WHERE book_id = %s AND status = 'Active' LIMIT 1
+                """, (book_id,))
+                if cursor.fetchone() is None:
+                    ReservationQueue.assign_next(cursor, book_id, 'Reserved', now)
+            return len(candidates), released
+        
+        while True:
+            result = Database.run_in_transaction(work)
+            if result is None:
+                return expired or None
+            scanned, released = result
+            expired += released
+            # A short batch means nothing else is due; a batch where every
+            # book was locked elsewhere is left for the next run.
+            if scanned < batch_size or released == 0:
+                return expired
@@ -1,5 +1,6 @@
 from app.utils.database import Database
-import hashlib
+from app.utils.async_database import AsyncDatabase
+from app.utils.password_hasher import PasswordHasher
 import uuid
 
 
@@ -13,22 +14,31 @@ class User:
     
     @staticmethod
     def hash_password(password):
-        return hashlib.sha256(password.encode()).hexdigest()
+        return PasswordHasher.hash(password)
     
     @staticmethod
     def authenticate(email, password):
-        hashed_password = User.hash_password(password)
-        query = "SELECT * FROM users WHERE Email = %s AND Password = %s"
-        user_data = Database.execute_single_query(query, (email, hashed_password))
+        query = "SELECT * FROM users WHERE Email = %s"
+        user_data = Database.execute_single_query(query, (email,))
         
-        if user_data:
-            return User(
-                user_id=user_data['UserID'],
-                name=user_data['Name'],
-                email=user_data['Email'],
-                role=user_data['Role']
-            )
-        return None
+        if not PasswordHasher.check(password, user_data['Password'] if user_data else None):
+            return None
+        
+        if PasswordHasher.needs_rehash(user_data['Password']):
+            User.upgrade_password_hash(user_data['UserID'], password, user_data['Password'])
+        
+        return User(
+            user_id=user_data['UserID'],
+            name=user_data['Name'],
+            email=user_data['Email'],
+            role=user_data['Role']
+        )
+    
+    @staticmethod
+    def upgrade_password_hash(user_id, password, old_hash):
+        # Conditional on the old hash so a concurrent password change wins.
+        query = "UPDATE users SET Password = %s WHERE UserID = %s AND Password = %s"
+        Database.execute_insert_query(query, (User.hash_password(password), user_id, old_hash))
     
     @staticmethod
     def get_by_email(email):
@@ -58,6 +68,10 @@ class User:
             )
         return None
     
+    @staticmethod
+    async def get_by_id_async(user_id):
+        return await AsyncDatabase.run(User.get_by_id, user_id)
+    
     @staticmethod
     def create_user(name, email, password, role):
         if User.get_by_email(email):
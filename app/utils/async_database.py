@@ -0,0 +1,45 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+from app.utils.database import Database
+
+
+class AsyncDatabase:
+    # mysql-connector's own asyncio driver cannot share the pool, the query
+    # profiler or run_in_transaction, so coroutines hand the blocking calls to
+    # a thread pool sized to the connection pool instead. Awaiting several of
+    # them with asyncio.gather runs their queries side by side.
+    _executor = None
+    _executor_lock = threading.Lock()
+    
+    @staticmethod
+    def get_executor():
+        if AsyncDatabase._executor is None:
+            with AsyncDatabase._executor_lock:
+                if AsyncDatabase._executor is None:
+                    AsyncDatabase._executor = ThreadPoolExecutor(max_workers=Config.DB_POOL_SIZE + Config.DB_POOL_MAX_OVERFLOW,
+                                                                 thread_name_prefix='async-db')
+        return AsyncDatabase._executor
+    
+    @staticmethod
+    async def run(func, *args, **kwargs):
+        # Copying the context keeps the queries attributed to the current request's profile.
+        context = contextvars.copy_context()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(AsyncDatabase.get_executor(), functools.partial(context.run, func, *args, **kwargs))
+    
+    @staticmethod
+    async def execute_query(query, params=None):
+        return await AsyncDatabase.run(Database.execute_query, query, params)
+    
+    @staticmethod
+    async def execute_single_query(query, params=None):
+        return await AsyncDatabase.run(Database.execute_single_query, query, params)
+    
+    @staticmethod
+    async def execute_insert_query(query, params=None):
+        return await AsyncDatabase.run(Database.execute_insert_query, query, params)
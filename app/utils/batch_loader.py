@@ -0,0 +1,41 @@
+from app.utils.database import Database
+
+
+class BatchLoader:
+    CHUNK_SIZE = 1000
+    
+    @staticmethod
+    def load_rows(query, keys, key_column, chunk_size=None):
+        return {row[key_column]: row for row in BatchLoader._fetch(query, keys, chunk_size)}
+    
+    @staticmethod
+    def load_groups(query, keys, key_column, chunk_size=None):
+        groups = {key: [] for key in BatchLoader._unique(keys)}
+        for row in BatchLoader._fetch(query, keys, chunk_size):
+            groups.setdefault(row[key_column], []).append(row)
+        return groups
+    
+    @staticmethod
+    def load_values(query, keys, key_column, value_column, default=None, chunk_size=None):
+        values = {key: default for key in BatchLoader._unique(keys)}
+        for row in BatchLoader._fetch(query, keys, chunk_size):
+            values[row[key_column]] = row[value_column]
+        return values
+    
+    @staticmethod
+    def _unique(keys):
+        return list(dict.fromkeys(key for key in keys if key is not None))
+    
+    @staticmethod
+    def _fetch(query, keys, chunk_size=None):
+        # query holds a {keys} placeholder that is expanded to one %s per key.
+        keys = BatchLoader._unique(keys)
+        chunk_size = chunk_size or BatchLoader.CHUNK_SIZE
+        rows = []
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            result = Database.execute_query(query.format(keys=placeholders), tuple(chunk))
+            if result:
+                rows.extend(result)
+        return rows
@@ -0,0 +1,236 @@
+import csv
+import json
+import os
+import re
+import uuid
+
+from mysql.connector import Error
+from app.models.book_counter import BookCounter
+from app.models.circulation_event import CirculationEvent
+from app.utils.cache import Cache
+from app.utils.database import Database
+
+
+DEADLOCK_ERRNO = 1213
+
+INSERT_BOOK_QUERY = """
+INSERT INTO books (book_id, title, author, subject, isbn, status)
+VALUES (%s, %s, %s, %s, %s, 'Available')
+"""
+
+FIELD_LIMITS = {'title': 255, 'author': 255, 'subject': 100, 'isbn': 20}
+
+MARC_TAGS = {
+    '001': 'book_id',
+    '020': 'isbn',
+    '100': 'author',
+    '245': 'title',
+    '650': 'subject'
+}
+
+
+def read_csv(stream):
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield {(key or '').strip().lower(): value for key, value in row.items()}
+
+
+def read_jsonl(stream):
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield {'_error': 'invalid JSON'}
+            continue
+        yield record if isinstance(record, dict) else {'_error': 'record is not an object'}
+
+
+def read_marc(stream):
+    # Flat MARC-like text: one "TAG value" per line, records separated by blank lines.
+    # Mnemonic lines such as "=245  10$aTitle" are accepted too.
+    record = {}
+    for line in stream:
+        line = line.strip()
+        if not line:
+            if record:
+                yield record
+                record = {}
+            continue
+        match = re.match(r'^=?(\d{3})\s+(.*)$', line)
+        if not match:
+            continue
+        tag, value = match.groups()
+        field = MARC_TAGS.get(tag)
+        if not field or field in record:
+            continue
+        subfield = re.search(r'\$a([^$]*)', value)
+        if subfield:
+            value = subfield.group(1)
+        record[field] = value.strip().rstrip(' /:;,.')
+    if record:
+        yield record
+
+
+READERS = {'csv': read_csv, 'jsonl': read_jsonl, 'marc': read_marc}
+
+
+class BookImporter:
+    def __init__(self, chunk_size=1000, progress=None, rejects=None):
+        self.chunk_size = max(1, chunk_size)
+        self.progress = progress
+        self.rejects = rejects
+        self.seen_isbns = set()
+        self.report = {'read': 0, 'inserted': 0, 'duplicates': 0, 'rejected': 0}
+    
+    @staticmethod
+    def detect_format(path):
+        extension = os.path.splitext(path)[1].lower()
+        if extension in ('.jsonl', '.ndjson', '.json'):
+            return 'jsonl'
+        if extension in ('.mrk', '.marc', '.txt'):
+            return 'marc'
+        return 'csv'
+    
+    @staticmethod
+    def normalize_isbn(isbn):
+        return re.sub(r'[^0-9X]', '', (isbn or '').upper())
+    
+    def import_file(self, path, file_format=None):
+        file_format = file_format or BookImporter.detect_format(path)
+        if file_format not in READERS:
+            raise ValueError(f"Unsupported import format: {file_format}")
+        with open(path, newline='', encoding='utf-8') as stream:
+            return self.import_records(READERS[file_format](stream))
+    
+    def import_records(self, records):
+        connection = Database.get_connection()
+        if not connection:
+            return None
+        
+        cursor = None
+        chunk = []
+        try:
+            cursor = connection.cursor()
+            for record in records:
+                self.report['read'] += 1
+                book = self.validate(record)
+                if book is not None:
+                    chunk.append(book)
+                if len(chunk) >= self.chunk_size:
+                    self.flush(connection, cursor, chunk)
+                    chunk = []
+            if chunk:
+                self.flush(connection, cursor, chunk)
+            return self.report
+        finally:
+            Database.close_connection(connection, cursor)
+            if self.report['inserted']:
+                Cache.invalidate('catalogue')
+                CirculationEvent.mark_stale()
+    
+    def validate(self, record):
+        if '_error' in record:
+            return self.reject(record, record['_error'])
+        
+        book = {field: str(record.get(field) or '').strip() for field in FIELD_LIMITS}
+        missing = [field for field, value in book.items() if not value]
+        if missing:
+            return self.reject(record, f"missing {', '.join(missing)}")
+        
+        too_long = [field for field, limit in FIELD_LIMITS.items() if len(book[field]) > limit]
+        if too_long:
+            return self.reject(record, f"too long: {', '.join(too_long)}")
+        
+        normalized_isbn = BookImporter.normalize_isbn(book['isbn'])
+        if len(normalized_isbn) not in (10, 13):
+            return self.reject(record, "invalid ISBN")
+        if normalized_isbn in self.seen_isbns:
+            self.report['duplicates'] += 1
+            return None
+        self.seen_isbns.add(normalized_isbn)
+        
+        book['book_id'] = str(record.get('book_id') or '').strip() or str(uuid.uuid4())
+        book['normalized_isbn'] = normalized_isbn
+        return book
+    
+    def reject(self, record, reason):
+        self.report['rejected'] += 1
+        if self.rejects is not None:
+            self.rejects.write(json.dumps({'record': self.report['read'], 'reason': reason, 'data': record}, default=str) + '\n')
+        return None
+    
+    def flush(self, connection, cursor, chunk):
+        lookup_values = set()
+        for book in chunk:
+            lookup_values.add(book['isbn'])
+            lookup_values.add(book['normalized_isbn'])
+        lookup_values = list(lookup_values)
+        placeholders = ', '.join(['%s'] * len(lookup_values))
+        try:
+            cursor.execute(f"SELECT isbn FROM books WHERE isbn IN ({placeholders})", tuple(lookup_values))
+            existing = {BookImporter.normalize_isbn(row[0]) for row in cursor.fetchall()}
+        except Exception as e:
+            print(f"Error checking imported ISBNs: {e}")
+            existing = None
+        
+        rows = []
+        for book in chunk:
+            if existing is None:
+                self.reject({'book_id': book['book_id'], 'title': book['title'], 'isbn': book['isbn']},
+                            "duplicate check failed")
+            elif book['normalized_isbn'] in existing:
+                self.report['duplicates'] += 1
+            else:
+                rows.append((book['book_id'], book['title'], book['author'], book['subject'], book['isbn']))
+        
+        if rows:
+            try:
+                connection.start_transaction()
+                cursor.executemany(INSERT_BOOK_QUERY, rows)
+                self.record_inserted(cursor, len(rows))
+                connection.commit()
+                self.report['inserted'] += len(rows)
+            except Exception as e:
+                connection.rollback()
+                print(f"Chunk insert failed, retrying row by row: {e}")
+                self.insert_rows_singly(connection, cursor, rows)
+        
+        if self.progress:
+            self.progress(dict(self.report))
+    
+    def insert_rows_singly(self, connection, cursor, rows):
+        # One bad row, e.g. a colliding book_id, fails the whole multi-row
+        # INSERT. Here each row is its own statement in one transaction:
+        # InnoDB undoes only the statement that failed, so the valid rows
+        # are kept and only the bad ones are rejected.
+        failed = set()
+        try:
+            connection.start_transaction()
+            for position, row in enumerate(rows):
+                try:
+                    cursor.execute(INSERT_BOOK_QUERY, row)
+                except Error as e:
+                    # A deadlock rolls back the whole transaction, not just
+                    # this statement, so it fails the rest of the chunk below.
+                    if e.errno == DEADLOCK_ERRNO:
+                        raise
+                    failed.add(position)
+                    self.reject({'book_id': row[0], 'title': row[1], 'isbn': row[4]}, f"insert failed: {e}")
+            inserted = len(rows) - len(failed)
+            if inserted:
+                self.record_inserted(cursor, inserted)
+            connection.commit()
+            self.report['inserted'] += inserted
+        except Exception as e:
+            connection.rollback()
+            for position, row in enumerate(rows):
+                if position not in failed:
+                    self.reject({'book_id': row[0], 'title': row[1], 'isbn': row[4]}, f"insert failed: {e}")
+    
+    @staticmethod
+    def record_inserted(cursor, count):
+        BookCounter.adjust(cursor, 'Available', count)
+        CirculationEvent.record(cursor, 'books_imported', f"{count} books were imported into the catalogue")
@@ -0,0 +1,247 @@
+import functools
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from config import Config
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+class LRUCache:
+    def __init__(self, max_entries=1024, default_ttl=300):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+    
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def get_counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+    
+    def incr(self, key):
+        # Counters live outside the LRU so a namespace generation is never evicted.
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+    
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def size(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class RedisCache:
+    def __init__(self, url, default_ttl=300, prefix='lms:'):
+        if redis is None:
+            raise RuntimeError("The redis package is required for CACHE_BACKEND=redis")
+        self.client = redis.Redis.from_url(url)
+        self.default_ttl = default_ttl
+        self.prefix = prefix
+    
+    def get(self, key):
+        try:
+            raw = self.client.get(self.prefix + key)
+        except redis.RedisError as e:
+            print(f"Error reading from cache: {e}")
+            return False, None
+        if raw is None:
+            return False, None
+        return True, pickle.loads(raw)
+    
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        try:
+            self.client.set(self.prefix + key, pickle.dumps(value), ex=ttl or None)
+        except redis.RedisError as e:
+            print(f"Error writing to cache: {e}")
+    
+    def get_counter(self, key):
+        try:
+            value = self.client.get(self.prefix + key)
+        except redis.RedisError as e:
+            print(f"Error reading from cache: {e}")
+            return 0
+        return int(value) if value is not None else 0
+    
+    def incr(self, key):
+        try:
+            return self.client.incr(self.prefix + key)
+        except redis.RedisError as e:
+            print(f"Error updating cache: {e}")
+            return None
+    
+    def delete(self, key):
+        try:
+            self.client.delete(self.prefix + key)
+        except redis.RedisError as e:
+            print(f"Error deleting from cache: {e}")
+    
+    def clear(self):
+        try:
+            keys = list(self.client.scan_iter(self.prefix + '*'))
+            if keys:
+                self.client.delete(*keys)
+        except redis.RedisError as e:
+            print(f"Error clearing cache: {e}")
+    
+    def size(self):
+        return None
+
+
+class NullCache:
+    def get(self, key):
+        return False, None
+    
+    def set(self, key, value, ttl=None):
+        pass
+    
+    def get_counter(self, key):
+        return 0
+    
+    def incr(self, key):
+        return 0
+    
+    def delete(self, key):
+        pass
+    
+    def clear(self):
+        pass
+    
+    def size(self):
+        return 0
+
+
+class Cache:
+    _backend = None
+    _backend_lock = threading.Lock()
+    _stats = {}
+    _stats_lock = threading.Lock()
+    
+    @staticmethod
+    def get_backend():
+        if Cache._backend is None:
+            with Cache._backend_lock:
+                if Cache._backend is None:
+                    Cache._backend = Cache.create_backend(Config.CACHE_BACKEND)
+        return Cache._backend
+    
+    @staticmethod
+    def create_backend(name):
+        if name == 'redis':
+            return RedisCache(Config.CACHE_REDIS_URL, Config.CACHE_DEFAULT_TTL)
+        if name == 'none':
+            return NullCache()
+        return LRUCache(Config.CACHE_MAX_ENTRIES, Config.CACHE_DEFAULT_TTL)
+    
+    @staticmethod
+    def set_backend(backend):
+        with Cache._backend_lock:
+            Cache._backend = backend
+    
+    @staticmethod
+    def cached(namespace, ttl=None, scope=None, fallback=None):
+        # Cached values are shared between callers and must be treated as read-only.
+        # scope maps the call arguments to a sub-namespace, e.g. one user's
+        # loans, that Cache.invalidate('loans:<user id>') drops on its own.
+        # The wrapped function returns None when the database fails; that is
+        # never cached, and callers get fallback instead.
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key_namespace = f"{namespace}:{scope(*args, **kwargs)}" if scope else namespace
+                key = Cache.make_key(key_namespace, func.__qualname__, args, kwargs)
+                found, value = Cache.get_backend().get(key)
+                Cache._record(namespace, found)
+                if found:
+                    return value
+                value = func(*args, **kwargs)
+                if value is None:
+                    return fallback
+                Cache.get_backend().set(key, value, ttl)
+                return value
+            return wrapper
+        return decorator
+    
+    @staticmethod
+    def make_key(namespace, name, args, kwargs):
+        generation = Cache.get_generation(namespace)
+        return f"{namespace}:{generation}:{name}:{args!r}:{sorted(kwargs.items())!r}"
+    
+    @staticmethod
+    def get_generation(namespace):
+        return Cache.get_backend().get_counter(f"generation:{namespace}")
+    
+    @staticmethod
+    def invalidate(*namespaces):
+        # Bumping the generation orphans every key of the namespace; the LRU
+        # or the TTL evicts them later.
+        backend = Cache.get_backend()
+        for namespace in namespaces:
+            if backend.incr(f"generation:{namespace}") is None:
+                backend.clear()
+    
+    @staticmethod
+    def _record(namespace, hit):
+        with Cache._stats_lock:
+            counters = Cache._stats.setdefault(namespace, [0, 0])
+            counters[0 if hit else 1] += 1
+    
+    @staticmethod
+    def stats():
+        with Cache._stats_lock:
+            snapshot = {namespace: list(counters) for namespace, counters in Cache._stats.items()}
+        
+        namespaces = {}
+        for namespace, (hits, misses) in snapshot.items():
+            lookups = hits + misses
+            namespaces[namespace] = {
+                'hits': hits,
+                'misses': misses,
+                'hit_ratio': round(hits / lookups, 4) if lookups else 0.0
+            }
+        
+        backend = Cache.get_backend()
+        return {
+            'backend': type(backend).__name__,
+            'entries': backend.size(),
+            'namespaces': namespaces
+        }
+    
+    @staticmethod
+    def reset_stats():
+        with Cache._stats_lock:
+            Cache._stats.clear()
@@ -0,0 +1,182 @@
+import os
+import threading
+import time
+from collections import deque
+
+import mysql.connector
+from mysql.connector.errors import PoolError
+
+
+class PoolTimeoutError(PoolError):
+    pass
+
+
+class PooledConnection:
+    def __init__(self, pool, connection, created_at):
+        self._pool = pool
+        self._connection = connection
+        self._created_at = created_at
+        self._released = False
+    
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+    
+    def cursor(self, *args, **kwargs):
+        cursor = self._connection.cursor(*args, **kwargs)
+        if self._pool.cursor_wrapper is not None:
+            cursor = self._pool.cursor_wrapper(cursor)
+        return cursor
+    
+    def is_connected(self):
+        if self._released:
+            return False
+        return self._connection.is_connected()
+    
+    def close(self):
+        if not self._released:
+            self._released = True
+            self._pool.release(self._connection, self._created_at)
+    
+    def discard(self):
+        # Used when the link is in a state not worth resetting, such as an
+        # abandoned unbuffered result set that would otherwise be drained.
+        if not self._released:
+            self._released = True
+            self._pool.release(self._connection, self._created_at, discard=True)
+    
+    def __del__(self):
+        # Call sites that skip close() (for example after a dropped link) must
+        # not leak a checkout slot, so an unreleased proxy gives it back here.
+        if not getattr(self, '_released', True):
+            self._released = True
+            self._pool.release(self._connection, self._created_at, discard=True)
+
+
+class ConnectionPool:
+    def __init__(self, connect_args, pool_size=10, max_overflow=5, timeout=10.0,
+                 recycle=1800, pre_ping=True, connector=None, cursor_wrapper=None):
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        self.connect_args = dict(connect_args)
+        self.pool_size = pool_size
+        self.max_overflow = max(0, max_overflow)
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+        self.connector = connector or mysql.connector.connect
+        self.cursor_wrapper = cursor_wrapper
+        self.pid = os.getpid()
+        self._idle = deque()
+        self._checked_out = 0
+        self._closed = False
+        self._condition = threading.Condition()
+    
+    @property
+    def max_connections(self):
+        return self.pool_size + self.max_overflow
+    
+    def acquire(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise PoolError("Connection pool is closed")
+                if self._idle:
+                    connection, created_at = self._idle.pop()
+                    self._checked_out += 1
+                    break
+                if self._checked_out < self.max_connections:
+                    connection, created_at = None, None
+                    self._checked_out += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"Timed out after {timeout}s waiting for a connection "
+                        f"({self._checked_out}/{self.max_connections} checked out)"
+                    )
+                self._condition.wait(remaining)
+        
+        try:
+            if connection is not None and not self._is_usable(connection, created_at):
+                self._close_quietly(connection)
+                connection = None
+            if connection is None:
+                connection = self.connector(**self.connect_args)
+                created_at = time.monotonic()
+        except Exception:
+            with self._condition:
+                self._checked_out -= 1
+                self._condition.notify()
+            raise
+        
+        return PooledConnection(self, connection, created_at)
+    
+    def release(self, connection, created_at, discard=False):
+        if not discard:
+            discard = not self._reset(connection)
+        
+        with self._condition:
+            self._checked_out -= 1
+            if (discard or self._closed or self._is_expired(created_at)
+                    or len(self._idle) >= self.pool_size):
+                to_close = connection
+            else:
+                self._idle.append((connection, created_at))
+                to_close = None
+            self._condition.notify()
+        
+        if to_close is not None:
+            self._close_quietly(to_close)
+    
+    def status(self):
+        with self._condition:
+            return {
+                'pool_size': self.pool_size,
+                'max_overflow': self.max_overflow,
+                'checked_out': self._checked_out,
+                'idle': len(self._idle),
+                'overflow': max(0, self._checked_out + len(self._idle) - self.pool_size)
+            }
+    
+    def dispose(self):
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._condition.notify_all()
+        
+        for connection, _ in idle:
+            self._close_quietly(connection)
+    
+    def _is_expired(self, created_at):
+        return bool(self.recycle) and time.monotonic() - created_at >= self.recycle
+    
+    def _is_usable(self, connection, created_at):
+        if self._is_expired(created_at):
+            return False
+        if self.pre_ping:
+            try:
+                return connection.is_connected()
+            except Exception:
+                return False
+        return True
+    
+    def _reset(self, connection):
+        try:
+            if connection.unread_result:
+                connection.consume_results()
+            if connection.in_transaction:
+                connection.rollback()
+            return True
+        except Exception:
+            return False
+    
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
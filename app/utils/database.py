@@ -1,14 +1,203 @@
-import mysql.connector
+import contextvars
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+
+from flask import request
 from mysql.connector import Error
 from config import Config
+from app.utils import connection_pool
+from app.utils.connection_pool import ConnectionPool
+
+
+# Deadlock victim and lock wait timeout: the whole transaction can be replayed.
+RETRYABLE_ERRNOS = (1213, 1205)
+
+MAX_QUERIES_PER_PROFILE = 200
+MAX_PROFILED_STATEMENTS = 500
+
+slow_query_logger = logging.getLogger('lms.slow_query')
+
+# Frames from these files are skipped when attributing a query to its caller.
+INTERNAL_FILES = (__file__, connection_pool.__file__)
+
+
+class ProfilingCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+    
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+    
+    def __iter__(self):
+        return iter(self._cursor)
+    
+    def execute(self, operation, params=None, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            QueryProfiler.record(operation, (time.perf_counter() - started) * 1000, self._cursor.rowcount)
+    
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            QueryProfiler.record(operation, (time.perf_counter() - started) * 1000, self._cursor.rowcount)
+
+
+class QueryProfiler:
+    _current = contextvars.ContextVar('query_profile', default=None)
+    _recent = deque(maxlen=Config.QUERY_PROFILER_HISTORY)
+    _statements = {}
+    _lock = threading.Lock()
+    listeners = []
+    
+    @staticmethod
+    def wrap_cursor(cursor):
+        if not Config.QUERY_PROFILER_ENABLED:
+            return cursor
+        return ProfilingCursor(cursor)
+    
+    @staticmethod
+    def init_app(app):
+        app.before_request(QueryProfiler.start_request)
+        
+        @app.after_request
+        def add_timing_header(response):
+            summary = QueryProfiler.finish_request(request.endpoint, request.path, response.status_code)
+            if summary is not None:
+                response.headers.add('Server-Timing', f'db;dur={summary["db_ms"]:.2f};desc="{summary["queries"]} queries"')
+            return response
+    
+    @staticmethod
+    def start_request():
+        if Config.QUERY_PROFILER_ENABLED:
+            QueryProfiler._current.set({'queries': [], 'count': 0, 'db_ms': 0.0})
+    
+    @staticmethod
+    def finish_request(endpoint, path, status):
+        profile = QueryProfiler._current.get()
+        if profile is None:
+            return None
+        QueryProfiler._current.set(None)
+        
+        summary = {
+            'endpoint': endpoint,
+            'path': path,
+            'status': status,
+            'queries': profile['count'],
+            'db_ms': round(profile['db_ms'], 2),
+            'slowest': sorted(profile['queries'], key=lambda query: query['ms'], reverse=True)[:5],
+            'finished_at': time.time()
+        }
+        with QueryProfiler._lock:
+            QueryProfiler._recent.append(summary)
+        return summary
+    
+    @staticmethod
+    def current():
+        return QueryProfiler._current.get()
+    
+    @staticmethod
+    def record(statement, elapsed_ms, rowcount):
+        statement = QueryProfiler.normalize(statement)
+        call_site = QueryProfiler.call_site()
+        
+        profile = QueryProfiler._current.get()
+        with QueryProfiler._lock:
+            # Async views share one profile between executor threads.
+            if profile is not None:
+                profile['count'] += 1
+                profile['db_ms'] += elapsed_ms
+                if len(profile['queries']) < MAX_QUERIES_PER_PROFILE:
+                    profile['queries'].append({'sql': statement, 'ms': round(elapsed_ms, 2), 'rows': rowcount, 'site': call_site})
+            
+            stats = QueryProfiler._statements.get(statement)
+            if stats is None and len(QueryProfiler._statements) < MAX_PROFILED_STATEMENTS:
+                stats = QueryProfiler._statements[statement] = {'sql': statement, 'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'site': call_site}
+            if stats is not None:
+                stats['calls'] += 1
+                stats['total_ms'] += elapsed_ms
+                stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+        
+        for listener in QueryProfiler.listeners:
+            listener(elapsed_ms)
+        
+        if elapsed_ms >= Config.SLOW_QUERY_THRESHOLD_MS:
+            slow_query_logger.warning("Slow query (%.1f ms, %s rows) at %s: %s", elapsed_ms, rowcount, call_site, statement)
+    
+    @staticmethod
+    def normalize(statement):
+        if isinstance(statement, bytes):
+            statement = statement.decode(errors='replace')
+        statement = ' '.join(statement.split())
+        # IN lists built from a variable number of placeholders share one entry.
+        return re.sub(r'%s(\s*,\s*%s)+', '%s, ...', statement)
+    
+    @staticmethod
+    def call_site():
+        frame = sys._getframe(2)
+        while frame is not None and frame.f_code.co_filename in INTERNAL_FILES:
+            frame = frame.f_back
+        if frame is None:
+            return 'unknown'
+        filename = os.path.relpath(frame.f_code.co_filename)
+        return f"{filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+    
+    @staticmethod
+    def recent_requests():
+        with QueryProfiler._lock:
+            return list(reversed(QueryProfiler._recent))
+    
+    @staticmethod
+    def top_statements(limit=20):
+        with QueryProfiler._lock:
+            statements = [dict(stats) for stats in QueryProfiler._statements.values()]
+        for stats in statements:
+            stats['avg_ms'] = stats['total_ms'] / stats['calls'] if stats['calls'] else 0.0
+        return sorted(statements, key=lambda stats: stats['total_ms'], reverse=True)[:limit]
+    
+    @staticmethod
+    def reset():
+        with QueryProfiler._lock:
+            QueryProfiler._recent.clear()
+            QueryProfiler._statements.clear()
 
 
 class Database:
+    _pool = None
+    _pool_lock = threading.Lock()
+    
+    @staticmethod
+    def get_pool():
+        pool = Database._pool
+        if pool is None or pool.pid != os.getpid():
+            with Database._pool_lock:
+                pool = Database._pool
+                if pool is None or pool.pid != os.getpid():
+                    pool = ConnectionPool(Config.get_db_config(), cursor_wrapper=QueryProfiler.wrap_cursor,
+                                          **Config.get_pool_config())
+                    Database._pool = pool
+        return pool
+    
+    @staticmethod
+    def dispose_pool():
+        with Database._pool_lock:
+            pool, Database._pool = Database._pool, None
+        if pool is not None:
+            pool.dispose()
+    
     @staticmethod
     def get_connection():
         try:
-            connection = mysql.connector.connect(**Config.get_db_config())
-            return connection
+            return Database.get_pool().acquire()
         except Error as e:
             print(f"Error connecting to MySQL: {e}")
             return None
@@ -17,6 +206,7 @@ class Database:
     def execute_query(query, params=None):
         connection = Database.get_connection()
         if connection:
+            cursor = None
             try:
                 cursor = connection.cursor(dictionary=True)
                 cursor.execute(query, params)
@@ -26,15 +216,14 @@ class Database:
                 print(f"Error executing query: {e}")
                 return None
             finally:
-                if connection.is_connected():
-                    cursor.close()
-                    connection.close()
+                Database.close_connection(connection, cursor)
         return None
     
     @staticmethod
     def execute_single_query(query, params=None):
         connection = Database.get_connection()
         if connection:
+            cursor = None
             try:
                 cursor = connection.cursor(dictionary=True)
                 cursor.execute(query, params)
@@ -44,15 +233,14 @@ class Database:
                 print(f"Error executing query: {e}")
                 return None
             finally:
-                if connection.is_connected():
-                    cursor.close()
-                    connection.close()
+                Database.close_connection(connection, cursor)
         return None
     
     @staticmethod
     def execute_insert_query(query, params=None):
         connection = Database.get_connection()
         if connection:
+            cursor = None
             try:
                 cursor = connection.cursor()
                 cursor.execute(query, params)
@@ -63,7 +251,70 @@ class Database:
                 connection.rollback()
                 return None
             finally:
-                if connection.is_connected():
-                    cursor.close()
-                    connection.close()
+                Database.close_connection(connection, cursor)
         return None
+    
+    @staticmethod
+    def execute_many(query, rows):
+        connection = Database.get_connection()
+        if connection:
+            cursor = None
+            try:
+                cursor = connection.cursor()
+                cursor.executemany(query, rows)
+                connection.commit()
+                return cursor.rowcount
+            except Error as e:
+                print(f"Error executing batch query: {e}")
+                connection.rollback()
+                return None
+            finally:
+                Database.close_connection(connection, cursor)
+        return None
+    
+    @staticmethod
+    def run_in_transaction(work, default=None, retries=None):
+        retries = Config.DB_TRANSACTION_RETRIES if retries is None else retries
+        for attempt in range(retries + 1):
+            connection = Database.get_connection()
+            if not connection:
+                return default
+            
+            cursor = None
+            try:
+                cursor = connection.cursor()
+                connection.start_transaction()
+                result = work(cursor)
+                connection.commit()
+                return result
+            except Error as e:
+                Database._rollback_quietly(connection)
+                if e.errno in RETRYABLE_ERRNOS and attempt < retries:
+                    time.sleep(random.uniform(0, 0.05 * 2 ** attempt))
+                    continue
+                print(f"Error executing transaction: {e}")
+                return default
+            except Exception as e:
+                Database._rollback_quietly(connection)
+                print(f"Error executing transaction: {e}")
+                return default
+            finally:
+                Database.close_connection(connection, cursor)
+        return default
+    
+    @staticmethod
+    def _rollback_quietly(connection):
+        try:
+            connection.rollback()
+        except Error:
+            pass
+    
+    @staticmethod
+    def close_connection(connection, cursor=None):
+        try:
+            if cursor is not None:
+                cursor.close()
+        except Error:
+            pass
+        finally:
+            connection.close()
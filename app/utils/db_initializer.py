@@ -1,4 +1,7 @@
 from app.models.book import Book
+from app.models.book_counter import BookCounter
+from app.models.overdue_tracker import OverdueTracker
+from app.utils.migrations import MigrationRunner
 from app.models.user import User
 
 
@@ -10,12 +13,19 @@ class DatabaseInitializer:
             
             DatabaseInitializer.create_tables()
             
+            if MigrationRunner.run():
+                print("✓ Schema migrations applied")
+            
             Book.initialize_sample_data()
             print("✓ Sample books initialized")
             
             User.initialize_sample_data()
             print("✓ Sample users initialized")
             
+            BookCounter.ensure_initialized()
+            OverdueTracker.ensure_initialized()
+            print("✓ Book counters initialized")
+            
             print("✓ Database initialization complete")
             return True
             
@@ -81,10 +91,18 @@ class DatabaseInitializer:
             )
             """
             
+            counters_table = """
+            CREATE TABLE IF NOT EXISTS book_counters (
+                counter_name VARCHAR(32) PRIMARY KEY,
+                counter_value BIGINT NOT NULL DEFAULT 0
+            )
+            """
+            
             Database.execute_insert_query(books_table)
             Database.execute_insert_query(users_table)
             Database.execute_insert_query(issued_books_table)
             Database.execute_insert_query(reservations_table)
+            Database.execute_insert_query(counters_table)
             
             print("✓ Database tables created")
             return True
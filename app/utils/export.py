@@ -0,0 +1,55 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+
+
+ROWS_PER_CHUNK = 500
+
+
+def csv_stream(rows, columns, rows_per_chunk=ROWS_PER_CHUNK):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    
+    pending = 0
+    for row in rows:
+        writer.writerow([_csv_value(row.get(column)) for column in columns])
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield _drain(buffer)
+            pending = 0
+    yield _drain(buffer)
+
+
+def ndjson_stream(rows, columns, rows_per_chunk=ROWS_PER_CHUNK):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({column: row.get(column) for column in columns}, default=_json_value))
+        if len(lines) >= rows_per_chunk:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def _drain(buffer):
+    value = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _json_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    # Decimal fines stay exact as strings instead of going through float.
+    return str(value)
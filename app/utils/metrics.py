@@ -0,0 +1,203 @@
+import threading
+import time
+
+from flask import g, request
+from config import Config
+from app.utils.cache import Cache
+from app.utils.database import Database, QueryProfiler
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class ShardedCounters:
+    # Each thread writes only to its own dict, so the hot path takes no lock;
+    # a scrape sums the shards. dict.copy() is atomic under the GIL.
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._retired = {}
+        self._shards_lock = threading.Lock()
+    
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+    
+    def inc(self, key, amount=1):
+        shard = self._shard()
+        shard[key] = shard.get(key, 0) + amount
+    
+    def observe(self, key, value, buckets=LATENCY_BUCKETS):
+        shard = self._shard()
+        for bound in buckets:
+            if value <= bound:
+                bucket_key = key + (('le', bound),)
+                shard[bucket_key] = shard.get(bucket_key, 0) + 1
+                break
+        count_key = key + (('le', '+Inf'),)
+        shard[count_key] = shard.get(count_key, 0) + 1
+        sum_key = key + (('sum', None),)
+        shard[sum_key] = shard.get(sum_key, 0.0) + value
+    
+    def snapshot(self):
+        with self._shards_lock:
+            # Thread-per-request servers leave a shard behind per thread; fold
+            # finished threads into one dict so the list does not grow forever.
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    ShardedCounters._merge(self._retired, shard)
+            self._shards = live
+            totals = dict(self._retired)
+        
+        for _, shard in live:
+            ShardedCounters._merge(totals, shard.copy())
+        return totals
+    
+    def reset(self):
+        with self._shards_lock:
+            self._retired.clear()
+            for _, shard in self._shards:
+                shard.clear()
+    
+    @staticmethod
+    def _merge(totals, shard):
+        for key, value in shard.items():
+            totals[key] = totals.get(key, 0) + value
+
+
+class Metrics:
+    counters = ShardedCounters()
+    _business = None
+    _business_expires = 0.0
+    _business_lock = threading.Lock()
+    
+    @staticmethod
+    def init_app(app):
+        if Metrics.observe_query not in QueryProfiler.listeners:
+            QueryProfiler.listeners.append(Metrics.observe_query)
+        
+        @app.before_request
+        def start_timer():
+            g.metrics_started = time.perf_counter()
+        
+        @app.after_request
+        def record_request(response):
+            started = g.pop('metrics_started', None)
+            if started is not None:
+                Metrics.observe_request(request.endpoint or 'unknown', request.method,
+                                        response.status_code, time.perf_counter() - started)
+            return response
+    
+    @staticmethod
+    def observe_request(endpoint, method, status, seconds):
+        Metrics.counters.inc(('lms_http_requests_total', ('endpoint', endpoint), ('method', method), ('status', str(status))))
+        Metrics.counters.observe(('lms_http_request_duration_seconds', ('endpoint', endpoint)), seconds)
+    
+    @staticmethod
+    def observe_query(milliseconds):
+        Metrics.counters.inc(('lms_db_queries_total',))
+        Metrics.counters.inc(('lms_db_query_seconds_total',), milliseconds / 1000)
+    
+    @staticmethod
+    def business_gauges():
+        # Refreshed at most once per METRICS_BUSINESS_TTL; a scrape that finds
+        # another one refreshing serves the previous values instead of waiting.
+        if time.monotonic() < Metrics._business_expires or not Metrics._business_lock.acquire(blocking=False):
+            return Metrics._business
+        try:
+            row = Database.execute_single_query("""
+            SELECT (SELECT COUNT(*) FROM issued_books) as issued,
+                   (SELECT COALESCE(MAX(counter_value), 0) FROM book_counters WHERE counter_name = 'overdue_loans') as overdue,
+                   (SELECT COUNT(*) FROM book_reservations WHERE status = 'Active') as reservations
+            """)
+            Metrics._business = {key: int(value) for key, value in row.items()} if row else None
+            Metrics._business_expires = time.monotonic() + Config.METRICS_BUSINESS_TTL
+            return Metrics._business
+        finally:
+            Metrics._business_lock.release()
+    
+    @staticmethod
+    def render():
+        lines = []
+        totals = Metrics.counters.snapshot()
+        
+        Metrics._render_family(lines, 'lms_http_requests_total', 'counter', 'HTTP requests by endpoint, method and status.', totals)
+        Metrics._render_histogram(lines, 'lms_http_request_duration_seconds', 'HTTP request latency by endpoint.', totals)
+        Metrics._render_family(lines, 'lms_db_queries_total', 'counter', 'Database statements executed.', totals)
+        Metrics._render_family(lines, 'lms_db_query_seconds_total', 'counter', 'Time spent executing database statements.', totals)
+        
+        pool = Database.get_pool().status()
+        lines.append('# HELP lms_db_pool_connections Database pool connections by state.')
+        lines.append('# TYPE lms_db_pool_connections gauge')
+        for state in ('checked_out', 'idle', 'overflow'):
+            lines.append(f'lms_db_pool_connections{{state="{state}"}} {pool[state]}')
+        lines.append('# HELP lms_db_pool_max_connections Upper bound on pooled connections.')
+        lines.append('# TYPE lms_db_pool_max_connections gauge')
+        lines.append(f"lms_db_pool_max_connections {pool['pool_size'] + pool['max_overflow']}")
+        
+        cache_stats = Cache.stats()['namespaces']
+        lines.append('# HELP lms_cache_lookups_total Cache lookups by namespace and result.')
+        lines.append('# TYPE lms_cache_lookups_total counter')
+        for namespace, stats in sorted(cache_stats.items()):
+            lines.append(f'lms_cache_lookups_total{{namespace="{namespace}",result="hit"}} {stats["hits"]}')
+            lines.append(f'lms_cache_lookups_total{{namespace="{namespace}",result="miss"}} {stats["misses"]}')
+        lines.append('# HELP lms_cache_hit_ratio Cache hit ratio by namespace.')
+        lines.append('# TYPE lms_cache_hit_ratio gauge')
+        for namespace, stats in sorted(cache_stats.items()):
+            lines.append(f'lms_cache_hit_ratio{{namespace="{namespace}"}} {stats["hit_ratio"]}')
+        
+        business = Metrics.business_gauges()
+        if business:
+            for name, help_text in (('issued', 'Books currently on loan.'),
+                                    ('overdue', 'Loans marked overdue by the last sweep.'),
+                                    ('reservations', 'Active reservations.')):
+                lines.append(f'# HELP lms_books_{name} {help_text}')
+                lines.append(f'# TYPE lms_books_{name} gauge')
+                lines.append(f'lms_books_{name} {business[name]}')
+        
+        return '\n'.join(lines) + '\n'
+    
+    @staticmethod
+    def _render_family(lines, name, kind, help_text, totals):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for key, value in sorted(totals.items(), key=lambda item: repr(item[0])):
+            if key[0] == name:
+                lines.append(f'{name}{Metrics._labels(key[1:])} {Metrics._number(value)}')
+    
+    @staticmethod
+    def _render_histogram(lines, name, help_text, totals):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        series = {}
+        for key, value in totals.items():
+            if key[0] == name:
+                series.setdefault(key[1:-1], {})[key[-1]] = value
+        
+        for labels, values in sorted(series.items(), key=lambda item: repr(item[0])):
+            # Shards store per-bucket counts; exposition wants cumulative ones.
+            cumulative = 0
+            for bound in LATENCY_BUCKETS:
+                cumulative += values.get(('le', bound), 0)
+                lines.append(f'{name}_bucket{Metrics._labels(labels + (("le", bound),))} {cumulative}')
+            count = values.get(('le', '+Inf'), 0)
+            lines.append(f'{name}_bucket{Metrics._labels(labels + (("le", "+Inf"),))} {count}')
+            lines.append(f'{name}_sum{Metrics._labels(labels)} {Metrics._number(values.get(("sum", None), 0.0))}')
+            lines.append(f'{name}_count{Metrics._labels(labels)} {count}')
+    
+    @staticmethod
+    def _labels(pairs):
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+    
+    @staticmethod
+    def _number(value):
+        return f'{value:.6f}' if isinstance(value, float) else str(value)
@@ -0,0 +1,346 @@
+from app.utils.database import Database
+from app.models.fine_ledger import FineLedger
+
+
+def add_index(table, name, columns, unique=False, fulltext=False):
+    def step(cursor):
+        cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        """, (table, name))
+        if cursor.fetchone()[0] > 0:
+            return
+        
+        cursor.execute("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s
+        """, (table,))
+        existing_columns = {row[0].lower() for row in cursor.fetchall()}
+        if not existing_columns:
+            print(f"  skipping index {name}: table {table} does not exist")
+            return
+        # Tables created by DatabaseInitializer and the legacy schema name
+        # some columns differently; a missing one must not hold back every
+        # later migration.
+        missing = [column for column in columns if column.lower() not in existing_columns]
+        if missing:
+            print(f"  skipping index {name}: {table} has no column(s) {', '.join(missing)}")
+            return
+        
+        kind = 'UNIQUE INDEX' if unique else 'FULLTEXT INDEX' if fulltext else 'INDEX'
+        column_list = ', '.join(f"`{column}`" for column in columns)
+        cursor.execute(f"CREATE {kind} `{name}` ON `{table}` ({column_list})")
+    return step
+
+
+def add_column(table, name, definition):
+    def step(cursor):
+        cursor.execute("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s
+        """, (table,))
+        existing_columns = {row[0].lower() for row in cursor.fetchall()}
+        if not existing_columns:
+            print(f"  skipping column {name}: table {table} does not exist")
+            return
+        if name.lower() in existing_columns:
+            return
+        cursor.execute(f"ALTER TABLE `{table}` ADD COLUMN `{name}` {definition}")
+    return step
+
+
+def modify_column(table, name, definition):
+    def step(cursor):
+        cursor.execute("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+        """, (table, name))
+        if cursor.fetchone() is None:
+            print(f"  skipping column {name}: {table}.{name} does not exist")
+            return
+        cursor.execute(f"ALTER TABLE `{table}` MODIFY COLUMN `{name}` {definition}")
+    return step
+
+
+def create_table(definition):
+    def step(cursor):
+        cursor.execute(definition)
+    return step
+
+
+def backfill(source_table, statement):
+    def step(cursor):
+        cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.tables
+        WHERE table_schema = DATABASE() AND table_name = %s
+        """, (source_table,))
+        if cursor.fetchone()[0] == 0:
+            print(f"  skipping backfill: table {source_table} does not exist")
+            return
+        cursor.execute(statement)
+    return step
+
+
+MIGRATIONS = [
+    (1, 'Indexes for hot catalogue and circulation filters', [
+        add_index('books', 'idx_books_status', ['status']),
+        add_index('books', 'idx_books_subject_title', ['subject', 'title']),
+        add_index('books', 'idx_books_title', ['title']),
+        add_index('book_reservations', 'idx_reservations_user_status', ['user_id', 'status']),
+        add_index('issued_books', 'idx_issued_books_user', ['UserID']),
+        add_index('transaction', 'idx_transaction_fine', ['Fine']),
+        add_index('users', 'idx_users_role', ['Role']),
+    ]),
+    (2, 'Indexes for keyset pagination of books and loans', [
+        add_index('books', 'idx_books_author_title', ['author', 'title']),
+        add_index('issued_books', 'idx_issued_books_issue_date', ['issue_date']),
+    ]),
+    (3, 'Full-text catalogue search indexes', [
+        add_index('books', 'ft_books_title', ['title'], fulltext=True),
+        add_index('books', 'ft_books_catalogue', ['title', 'author', 'subject', 'isbn'], fulltext=True),
+        add_index('books', 'idx_books_isbn', ['isbn']),
+    ]),
+    (4, 'Index for date-range exports of transaction history', [
+        add_index('transaction', 'idx_transaction_return_date', ['ReturnDate']),
+    ]),
+    (5, 'Loan status and index for the overdue sweep', [
+        add_column('issued_books', 'status', "ENUM('Issued', 'Returned', 'Overdue') NOT NULL DEFAULT 'Issued'"),
+        add_index('issued_books', 'idx_issued_books_status_due', ['status', 'due_date']),
+    ]),
+    (6, 'Notification outbox', [
+        create_table("""
+        CREATE TABLE IF NOT EXISTS notifications (
+            notification_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            dedupe_key VARCHAR(191) NOT NULL,
+            user_id VARCHAR(50) NOT NULL,
+            kind VARCHAR(32) NOT NULL,
+            recipient VARCHAR(255) NOT NULL,
+            payload JSON NOT NULL,
+            status ENUM('Pending', 'Sending', 'Sent', 'Failed') NOT NULL DEFAULT 'Pending',
+            attempts INT NOT NULL DEFAULT 0,
+            next_attempt_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            claimed_at DATETIME NULL,
+            sent_at DATETIME NULL,
+            last_error VARCHAR(255) NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE KEY uq_notifications_dedupe (dedupe_key),
+            KEY idx_notifications_queue (status, next_attempt_at),
+            KEY idx_notifications_user (user_id, created_at),
+            KEY idx_notifications_kind_created (kind, created_at),
+            KEY idx_notifications_sent (sent_at)
+        )
+        """),
+        add_index('book_reservations', 'idx_reservations_status_date', ['status', 'reservation_date']),
+    ]),
+    (7, 'Covering index for a student\'s current loans', [
+        add_index('issued_books', 'idx_issued_books_user_due', ['UserID', 'due_date', 'book_id', 'issue_date']),
+    ]),
+    (8, 'Fine ledger and per-student balances', [
+        create_table("""
+        CREATE TABLE IF NOT EXISTS fine_ledger (
+            entry_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            user_id VARCHAR(50) NOT NULL,
+            entry_type ENUM('Charge', 'Payment') NOT NULL,
+            amount DECIMAL(10, 2) NOT NULL,
+            transaction_id INT NULL,
+            note VARCHAR(255) NULL,
+            created_by VARCHAR(50) NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE KEY uq_fine_ledger_transaction (transaction_id),
+            KEY idx_fine_ledger_user_created (user_id, created_at)
+        )
+        """),
+        create_table("""
+        CREATE TABLE IF NOT EXISTS fine_balances (
+            user_id VARCHAR(50) PRIMARY KEY,
+            charged DECIMAL(12, 2) NOT NULL DEFAULT 0,
+            paid DECIMAL(12, 2) NOT NULL DEFAULT 0,
+            balance DECIMAL(12, 2) NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            KEY idx_fine_balances_balance (balance)
+        )
+        """),
+        create_table("""
+        CREATE TABLE IF NOT EXISTS fine_daily_totals (
+            day DATE PRIMARY KEY,
+            charged DECIMAL(12, 2) NOT NULL DEFAULT 0,
+            collected DECIMAL(12, 2) NOT NULL DEFAULT 0
+        )
+        """),
+        # Fines charged before the ledger existed; the balances, daily totals
+        # and counters are then rebuilt from the ledger.
+        backfill('transaction', """
+        INSERT IGNORE INTO fine_ledger (user_id, entry_type, amount, transaction_id, note, created_at)
+        SELECT t.UserID, 'Charge', t.Fine, t.TransactionID,
+               CONCAT('Late return - ', COALESCE(b.title, 'Unknown Book')),
+               COALESCE(t.ReturnDate, CURRENT_TIMESTAMP)
+        FROM transaction t
+        LEFT JOIN books b ON t.BookID = b.book_id
+        WHERE t.Fine > 0
+        """),
+        FineLedger.rebuild,
+    ]),
+    (9, 'Daily circulation rollups', [
+        create_table("""
+        CREATE TABLE IF NOT EXISTS circulation_daily (
+            day DATE PRIMARY KEY,
+            issued INT NOT NULL DEFAULT 0,
+            returned INT NOT NULL DEFAULT 0,
+            returned_late INT NOT NULL DEFAULT 0,
+            fines DECIMAL(12, 2) NOT NULL DEFAULT 0
+        )
+        """),
+        create_table("""
+        CREATE TABLE IF NOT EXISTS circulation_daily_subject (
+            day DATE NOT NULL,
+            subject VARCHAR(100) NOT NULL,
+            issued INT NOT NULL DEFAULT 0,
+            returned INT NOT NULL DEFAULT 0,
+            returned_late INT NOT NULL DEFAULT 0,
+            fines DECIMAL(12, 2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, subject)
+        )
+        """),
+        create_table("""
+        CREATE TABLE IF NOT EXISTS circulation_daily_book (
+            day DATE NOT NULL,
+            book_id VARCHAR(50) NOT NULL,
+            subject VARCHAR(100) NOT NULL,
+            issued INT NOT NULL DEFAULT 0,
+            returned INT NOT NULL DEFAULT 0,
+            returned_late INT NOT NULL DEFAULT 0,
+            fines DECIMAL(12, 2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, book_id)
+        )
+        """),
+        create_table("""
+        CREATE TABLE IF NOT EXISTS circulation_monthly_book (
+            month DATE NOT NULL,
+            book_id VARCHAR(50) NOT NULL,
+            subject VARCHAR(100) NOT NULL,
+            issued INT NOT NULL DEFAULT 0,
+            returned INT NOT NULL DEFAULT 0,
+            returned_late INT NOT NULL DEFAULT 0,
+            fines DECIMAL(12, 2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (month, book_id)
+        )
+        """),
+        add_index('transaction', 'idx_transaction_issue_date', ['IssueDate']),
+    ]),
+    (10, 'Circulation event log', [
+        create_table("""
+        CREATE TABLE IF NOT EXISTS circulation_events (
+            event_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            event_type VARCHAR(32) NOT NULL,
+            book_id VARCHAR(50) NULL,
+            user_id VARCHAR(50) NULL,
+            summary VARCHAR(255) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            KEY idx_circulation_events_book (book_id, event_id),
+            KEY idx_circulation_events_user (user_id, event_id)
+        )
+        """),
+    ]),
+    (11, 'Reservation queues and hold expiry', [
+        modify_column('book_reservations', 'status',
+                      "ENUM('Queued', 'Active', 'Fulfilled', 'Cancelled', 'Expired') NOT NULL DEFAULT 'Active'"),
+        # Microseconds, so reservations made in the same second keep their order.
+        modify_column('book_reservations', 'created_at', "TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6)"),
+        add_column('book_reservations', 'hold_expires_at', "DATETIME NULL"),
+        backfill('book_reservations', """
+        UPDATE book_reservations
+        SET hold_expires_at = TIMESTAMP(reservation_date) + INTERVAL 3 DAY
+        WHERE status = 'Active' AND hold_expires_at IS NULL
+        """),
+        add_index('book_reservations', 'idx_reservations_queue', ['book_id', 'status', 'created_at']),
+        add_index('book_reservations', 'idx_reservations_hold', ['status', 'hold_expires_at']),
+    ]),
+]
+
+
+class MigrationRunner:
+    LOCK_NAME = 'lms_schema_migrations'
+    
+    @staticmethod
+    def ensure_schema_table(cursor):
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+    
+    @staticmethod
+    def get_applied_versions(cursor):
+        cursor.execute("SELECT version FROM schema_migrations")
+        return {row[0] for row in cursor.fetchall()}
+    
+    @staticmethod
+    def get_status():
+        connection = Database.get_connection()
+        if not connection:
+            return None
+        
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            MigrationRunner.ensure_schema_table(cursor)
+            applied = MigrationRunner.get_applied_versions(cursor)
+            return [
+                {'version': version, 'description': description, 'applied': version in applied}
+                for version, description, _ in MIGRATIONS
+            ]
+        except Exception as e:
+            print(f"Error reading migration status: {e}")
+            return None
+        finally:
+            Database.close_connection(connection, cursor)
+    
+    @staticmethod
+    def run(lock_timeout=60):
+        connection = Database.get_connection()
+        if not connection:
+            return False
+        
+        cursor = None
+        locked = False
+        try:
+            cursor = connection.cursor()
+            
+            # Several workers may start at once; only one applies migrations.
+            cursor.execute("SELECT GET_LOCK(%s, %s)", (MigrationRunner.LOCK_NAME, lock_timeout))
+            locked = cursor.fetchone()[0] == 1
+            if not locked:
+                print("✗ Timed out waiting for the schema migration lock")
+                return False
+            
+            MigrationRunner.ensure_schema_table(cursor)
+            applied = MigrationRunner.get_applied_versions(cursor)
+            
+            for version, description, steps in sorted(MIGRATIONS, key=lambda migration: migration[0]):
+                if version in applied:
+                    continue
+                
+                print(f"Applying migration {version}: {description}")
+                for step in steps:
+                    step(cursor)
+                
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                    (version, description)
+                )
+                connection.commit()
+            
+            return True
+        except Exception as e:
+            print(f"✗ Error applying migrations: {e}")
+            return False
+        finally:
+            if locked:
+                try:
+                    cursor.execute("SELECT RELEASE_LOCK(%s)", (MigrationRunner.LOCK_NAME,))
+                    cursor.fetchone()
+                except Exception:
+                    pass
+            Database.close_connection(connection, cursor)
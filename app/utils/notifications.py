@@ -0,0 +1,113 @@
+import json
+import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email.message import EmailMessage
+
+from config import Config
+from app.models.notification import Notification
+from app.models.overdue_tracker import OverdueTracker
+
+
+class FileSender:
+    # Appends one JSON line per message; stands in for a mail relay in
+    # development and makes deliveries easy to inspect.
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+    
+    def send(self, recipient, subject, body):
+        line = json.dumps({'to': recipient, 'subject': subject, 'body': body,
+                           'sent_at': datetime.now().isoformat(timespec='seconds')})
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as output:
+                output.write(line + '\n')
+
+
+class SmtpSender:
+    def __init__(self, host, port, from_address):
+        self.host = host
+        self.port = port
+        self.from_address = from_address
+        self._local = threading.local()
+    
+    def _client(self):
+        # One connection per worker thread, reused across messages.
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = smtplib.SMTP(self.host, self.port, timeout=30)
+        return client
+    
+    def send(self, recipient, subject, body):
+        message = EmailMessage()
+        message['From'] = self.from_address
+        message['To'] = recipient
+        message['Subject'] = subject
+        message.set_content(body)
+        try:
+            self._client().send_message(message)
+        except (smtplib.SMTPServerDisconnected, OSError):
+            # Drop the connection so the retry, on this run or the next, reconnects.
+            self._local.client = None
+            raise
+
+
+def create_sender(name=None):
+    name = name or Config.NOTIFICATION_SENDER
+    if name == 'smtp':
+        return SmtpSender(Config.NOTIFICATION_SMTP_HOST, Config.NOTIFICATION_SMTP_PORT, Config.NOTIFICATION_FROM)
+    if name == 'file':
+        return FileSender(Config.NOTIFICATION_FILE_PATH)
+    raise ValueError(f"Unknown notification sender: {name}")
+
+
+class NotificationDispatcher:
+    def __init__(self, sender=None, workers=None, batch_size=None):
+        self.sender = sender or create_sender()
+        self.workers = workers or Config.NOTIFICATION_WORKERS
+        self.batch_size = batch_size or Config.NOTIFICATION_BATCH_SIZE
+    
+    def deliver(self, notification):
+        subject, body = Notification.render(notification['kind'], notification['payload'])
+        try:
+            self.sender.send(notification['recipient'], subject, body)
+            return None
+        except Exception as e:
+            return e
+    
+    def run(self):
+        # Claims due rows in batches and sends each batch on the worker pool
+        # until nothing due is left. Failures are rescheduled with backoff.
+        Notification.release_stale_claims(Config.NOTIFICATION_LEASE_SECONDS)
+        totals = {'sent': 0, 'failed': 0}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='notification-sender') as pool:
+            while True:
+                batch = Notification.claim_batch(self.batch_size)
+                if not batch:
+                    return totals
+                
+                errors = list(pool.map(self.deliver, batch))
+                sent = [notification['notification_id'] for notification, error in zip(batch, errors) if error is None]
+                failures = [(notification, error) for notification, error in zip(batch, errors) if error is not None]
+                
+                Notification.mark_sent(sent)
+                Notification.mark_failed(failures, Config.NOTIFICATION_MAX_ATTEMPTS, Config.NOTIFICATION_RETRY_SECONDS)
+                totals['sent'] += len(sent)
+                totals['failed'] += len(failures)
+                if len(batch) < self.batch_size:
+                    return totals
+
+
+class NotificationJob:
+    @staticmethod
+    def run(scan=True, deliver=True, sender=None):
+        summary = {}
+        if scan:
+            # Overdue alerts are driven by the sweep's loan status.
+            summary['marked_overdue'] = OverdueTracker.sweep(batch_size=Config.OVERDUE_SWEEP_BATCH_SIZE)
+            summary['queued'] = Notification.scan(due_within_days=Config.NOTIFICATION_DUE_WITHIN_DAYS,
+                                                  overdue_within_days=Config.NOTIFICATION_OVERDUE_WITHIN_DAYS)
+        if deliver:
+            summary['delivered'] = NotificationDispatcher(sender).run()
+        return summary
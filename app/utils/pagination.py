@@ -0,0 +1,94 @@
+import base64
+import json
+from datetime import date, datetime
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def clamp_page_size(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    try:
+        page_size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(page_size, maximum))
+
+
+def encode_cursor(sort_key, values):
+    payload = {'s': sort_key, 'k': [_encode_value(value) for value in values]}
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token, sort_key):
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(payload, dict) or payload.get('s') != sort_key or not isinstance(payload.get('k'), list):
+        return None
+    try:
+        return [_decode_value(value) for value in payload['k']]
+    except (ValueError, TypeError):
+        return None
+
+
+def keyset_condition(columns, values, descending=False):
+    # (a, b, c) > (x, y, z) spelled out so MySQL can use a range scan on the index.
+    operator = '<' if descending else '>'
+    clauses = []
+    params = []
+    for position, column in enumerate(columns):
+        parts = [f"{previous} = %s" for previous in columns[:position]]
+        parts.append(f"{column} {operator} %s")
+        clauses.append('(' + ' AND '.join(parts) + ')')
+        params.extend(values[:position])
+        params.append(values[position])
+    return '(' + ' OR '.join(clauses) + ')', params
+
+
+def order_clause(columns, descending=False):
+    direction = 'DESC' if descending else 'ASC'
+    return ', '.join(f"{column} {direction}" for column in columns)
+
+
+def paginate_rows(rows, page_size, direction, has_cursor, sort_key, key_func):
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == 'prev':
+        rows.reverse()
+    
+    if direction == 'prev':
+        has_next = has_cursor
+        has_prev = has_more
+    else:
+        has_next = has_more
+        has_prev = has_cursor
+    
+    return {
+        'items': rows,
+        'next_cursor': encode_cursor(sort_key, key_func(rows[-1])) if rows and has_next else None,
+        'prev_cursor': encode_cursor(sort_key, key_func(rows[0])) if rows and has_prev else None,
+        'page_size': page_size
+    }
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, date):
+        return {'d': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if 'dt' in value:
+            return datetime.fromisoformat(value['dt'])
+        if 'd' in value:
+            return date.fromisoformat(value['d'])
+    return value
@@ -0,0 +1,94 @@
+import base64
+import hashlib
+import hmac
+import os
+import re
+import threading
+
+from config import Config
+
+
+LEGACY_SHA256 = re.compile(r'^[0-9a-f]{64}$')
+
+
+def _b64encode(raw):
+    return base64.b64encode(raw).decode().rstrip('=')
+
+
+def _b64decode(text):
+    return base64.b64decode(text + '=' * (-len(text) % 4))
+
+
+class PasswordHasher:
+    # hashlib's PBKDF2 and scrypt release the GIL, so every request thread
+    # could run one at once. At most PASSWORD_HASH_WORKERS derivations run
+    # together; a login burst queues here instead of taking every core from
+    # the worker's other requests.
+    _slots = threading.BoundedSemaphore(Config.PASSWORD_HASH_WORKERS)
+    _dummy_hash = None
+    
+    @staticmethod
+    def hash(password, algorithm=None):
+        algorithm = algorithm or Config.PASSWORD_HASH_ALGORITHM
+        salt = os.urandom(16)
+        if algorithm == 'scrypt':
+            n, r, p = Config.PASSWORD_SCRYPT_N, Config.PASSWORD_SCRYPT_R, Config.PASSWORD_SCRYPT_P
+            derived = PasswordHasher._scrypt(password, salt, n, r, p)
+            return f"scrypt${n}${r}${p}${_b64encode(salt)}${_b64encode(derived)}"
+        if algorithm == 'pbkdf2_sha256':
+            iterations = Config.PASSWORD_PBKDF2_ITERATIONS
+            derived = PasswordHasher._pbkdf2(password, salt, iterations)
+            return f"pbkdf2_sha256${iterations}${_b64encode(salt)}${_b64encode(derived)}"
+        raise ValueError(f"Unsupported password hash algorithm: {algorithm}")
+    
+    @staticmethod
+    def verify(password, encoded):
+        if not encoded:
+            return False
+        if LEGACY_SHA256.match(encoded):
+            return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), encoded)
+        
+        parts = encoded.split('$')
+        try:
+            if parts[0] == 'pbkdf2_sha256' and len(parts) == 4:
+                derived = PasswordHasher._pbkdf2(password, _b64decode(parts[2]), int(parts[1]))
+                return hmac.compare_digest(derived, _b64decode(parts[3]))
+            if parts[0] == 'scrypt' and len(parts) == 6:
+                derived = PasswordHasher._scrypt(password, _b64decode(parts[4]), int(parts[1]), int(parts[2]), int(parts[3]))
+                return hmac.compare_digest(derived, _b64decode(parts[5]))
+        except ValueError:
+            return False
+        return False
+    
+    @staticmethod
+    def needs_rehash(encoded):
+        parts = (encoded or '').split('$')
+        if parts[0] != Config.PASSWORD_HASH_ALGORITHM:
+            return True
+        if parts[0] == 'pbkdf2_sha256':
+            return parts[1] != str(Config.PASSWORD_PBKDF2_ITERATIONS)
+        return parts[1:4] != [str(Config.PASSWORD_SCRYPT_N), str(Config.PASSWORD_SCRYPT_R), str(Config.PASSWORD_SCRYPT_P)]
+    
+    @staticmethod
+    def check(password, encoded):
+        if encoded is None:
+            # Unknown account: burn the same KDF time so response timing does
+            # not reveal which emails exist.
+            if PasswordHasher._dummy_hash is None:
+                PasswordHasher._dummy_hash = PasswordHasher.hash('dummy-password')
+            PasswordHasher.verify(password, PasswordHasher._dummy_hash)
+            return False
+        
+        # Every check pays the full KDF cost; remembering recent successes
+        # would keep a fast-to-test record of passwords in memory.
+        return PasswordHasher.verify(password, encoded)
+    
+    @staticmethod
+    def _pbkdf2(password, salt, iterations):
+        with PasswordHasher._slots:
+            return hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+    
+    @staticmethod
+    def _scrypt(password, salt, n, r, p):
+        with PasswordHasher._slots:
+            return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=128 * n * r * p + 1024 * 1024)
@@ -0,0 +1,31 @@
+import contextvars
+
+from app.utils.async_database import AsyncDatabase
+
+
+class QueryBatch:
+    # Runs independent model calls side by side, each on its own pooled
+    # connection, so a page waits for its slowest query instead of the sum.
+    # The calls share AsyncDatabase's executor, so every thread that holds a
+    # database connection counts against one limit sized to the pool.
+    def __init__(self):
+        self.calls = []
+    
+    def add(self, name, func, *args, **kwargs):
+        self.calls.append((name, func, args, kwargs))
+    
+    def run(self):
+        if not self.calls:
+            return {}
+        
+        # The last call runs on the request thread, which would otherwise sit idle.
+        *offloaded, (last_name, last_func, last_args, last_kwargs) = self.calls
+        futures = []
+        for name, func, args, kwargs in offloaded:
+            context = contextvars.copy_context()
+            futures.append((name, AsyncDatabase.get_executor().submit(context.run, func, *args, **kwargs)))
+        
+        results = {last_name: last_func(*last_args, **last_kwargs)}
+        for name, future in futures:
+            results[name] = future.result()
+        return results
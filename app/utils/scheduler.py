@@ -0,0 +1,40 @@
+import threading
+
+
+class Scheduler:
+    # Minimal in-process job runner for deployments without cron. Jobs must
+    # be safe to run from several processes at once; the overdue sweep and
+    # the notification job skip rows another worker has locked.
+    _jobs = []
+    _threads = []
+    _stop = threading.Event()
+    
+    @staticmethod
+    def every(name, interval, func):
+        Scheduler._jobs.append((name, interval, func))
+    
+    @staticmethod
+    def start():
+        Scheduler._stop.clear()
+        for name, interval, func in Scheduler._jobs:
+            thread = threading.Thread(target=Scheduler._loop, args=(name, interval, func),
+                                      name=f"scheduler-{name}", daemon=True)
+            thread.start()
+            Scheduler._threads.append(thread)
+    
+    @staticmethod
+    def stop(timeout=None):
+        Scheduler._stop.set()
+        for thread in Scheduler._threads:
+            thread.join(timeout)
+        Scheduler._threads = []
+        Scheduler._jobs = []
+    
+    @staticmethod
+    def _loop(name, interval, func):
+        while not Scheduler._stop.is_set():
+            try:
+                func()
+            except Exception as e:
+                print(f"Error running scheduled job {name}: {e}")
+            Scheduler._stop.wait(interval)
@@ -0,0 +1,281 @@
+import random
+import secrets
+import sqlite3
+import threading
+import time
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+from config import Config
+from app.utils.cache import LRUCache
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+# Derived from the User object on every request rather than stored, so a
+# changed name or role is never served from a stale session record.
+USER_FIELDS = ('user_name', 'user_email', 'user_role')
+
+
+class MemorySessionBackend:
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+    
+    def load(self, sid):
+        with self._lock:
+            entry = self._sessions.get(sid)
+            if entry is None:
+                return None
+            data, user_id, expires_at = entry
+            if expires_at <= time.time():
+                del self._sessions[sid]
+                return None
+            return data, expires_at
+    
+    def save(self, sid, data, user_id, ttl):
+        with self._lock:
+            self._sessions[sid] = (data, user_id, time.time() + ttl)
+    
+    def touch(self, sid, ttl):
+        with self._lock:
+            entry = self._sessions.get(sid)
+            if entry is not None:
+                self._sessions[sid] = (entry[0], entry[1], time.time() + ttl)
+    
+    def delete(self, sid):
+        with self._lock:
+            self._sessions.pop(sid, None)
+    
+    def delete_user(self, user_id):
+        with self._lock:
+            sids = [sid for sid, entry in self._sessions.items() if entry[1] == user_id]
+            for sid in sids:
+                del self._sessions[sid]
+        return sids
+
+
+class SQLiteSessionBackend:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._connection().execute("""
+        CREATE TABLE IF NOT EXISTS sessions (
+            sid TEXT PRIMARY KEY,
+            user_id TEXT,
+            data TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        )
+        """)
+        self._connection().execute("CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions (user_id)")
+    
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # Autocommit; WAL lets several worker processes read while one writes.
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+    
+    def load(self, sid):
+        row = self._connection().execute(
+            "SELECT data, expires_at FROM sessions WHERE sid = ? AND expires_at > ?", (sid, time.time())
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+    
+    def save(self, sid, data, user_id, ttl):
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO sessions (sid, user_id, data, expires_at) VALUES (?, ?, ?, ?)",
+            (sid, user_id, data, time.time() + ttl)
+        )
+        if random.random() < 0.01:
+            connection.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),))
+    
+    def touch(self, sid, ttl):
+        self._connection().execute("UPDATE sessions SET expires_at = ? WHERE sid = ?", (time.time() + ttl, sid))
+    
+    def delete(self, sid):
+        self._connection().execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+    
+    def delete_user(self, user_id):
+        connection = self._connection()
+        sids = [row[0] for row in connection.execute("SELECT sid FROM sessions WHERE user_id = ?", (user_id,))]
+        connection.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
+        return sids
+
+
+class RedisSessionBackend:
+    def __init__(self, url, prefix='lms:session:'):
+        if redis is None:
+            raise RuntimeError("The redis package is required for SESSION_BACKEND=redis")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+    
+    def load(self, sid):
+        pipeline = self.client.pipeline()
+        pipeline.hget(self.prefix + sid, 'data')
+        pipeline.ttl(self.prefix + sid)
+        data, ttl = pipeline.execute()
+        if data is None:
+            return None
+        return data.decode(), time.time() + max(ttl, 0)
+    
+    def save(self, sid, data, user_id, ttl):
+        pipeline = self.client.pipeline()
+        pipeline.hset(self.prefix + sid, mapping={'data': data, 'user_id': user_id or ''})
+        pipeline.expire(self.prefix + sid, int(ttl))
+        if user_id:
+            pipeline.sadd(f"{self.prefix}user:{user_id}", sid)
+        pipeline.execute()
+    
+    def touch(self, sid, ttl):
+        self.client.expire(self.prefix + sid, int(ttl))
+    
+    def delete(self, sid):
+        self.client.delete(self.prefix + sid)
+    
+    def delete_user(self, user_id):
+        key = f"{self.prefix}user:{user_id}"
+        sids = [sid.decode() for sid in self.client.smembers(key)]
+        if sids:
+            self.client.delete(*[self.prefix + sid for sid in sids])
+        self.client.delete(key)
+        return sids
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, expires_at=None):
+        def on_update(session):
+            session.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.expires_at = expires_at
+        self.original_user_id = self.get('user_id')
+        self.modified = False
+
+
+class SessionStore:
+    _backend = None
+    _backend_lock = threading.Lock()
+    # The TTL bounds how long another process can serve a user changed elsewhere.
+    _users = LRUCache(max_entries=Config.SESSION_USER_CACHE_SIZE, default_ttl=Config.SESSION_USER_CACHE_TTL)
+    serializer = TaggedJSONSerializer()
+    
+    @staticmethod
+    def get_backend():
+        if SessionStore._backend is None:
+            with SessionStore._backend_lock:
+                if SessionStore._backend is None:
+                    SessionStore._backend = SessionStore.create_backend(Config.SESSION_BACKEND)
+        return SessionStore._backend
+    
+    @staticmethod
+    def create_backend(name):
+        if name == 'redis':
+            return RedisSessionBackend(Config.SESSION_REDIS_URL)
+        if name == 'memory':
+            return MemorySessionBackend()
+        return SQLiteSessionBackend(Config.SESSION_SQLITE_PATH)
+    
+    @staticmethod
+    def set_backend(backend):
+        with SessionStore._backend_lock:
+            SessionStore._backend = backend
+        SessionStore._users.clear()
+    
+    @staticmethod
+    def get_user(sid, user_id):
+        from app.models.user import User
+        
+        found, user = SessionStore._users.get(sid)
+        if found and user.user_id == user_id:
+            return user
+        user = User.get_by_id(user_id)
+        if user is not None:
+            SessionStore._users.set(sid, user)
+        return user
+    
+    @staticmethod
+    def remember_user(sid, session):
+        from app.models.user import User
+        
+        SessionStore._users.set(sid, User(user_id=session['user_id'], name=session.get('user_name'),
+                                          email=session.get('user_email'), role=session.get('user_role')))
+    
+    @staticmethod
+    def revoke_user(user_id):
+        # Logs the user out everywhere: every process sees the backend rows
+        # disappear on its next request, whatever its local LRU still holds.
+        try:
+            sids = SessionStore.get_backend().delete_user(user_id)
+        except Exception as e:
+            print(f"Error revoking sessions: {e}")
+            return 0
+        for sid in sids:
+            SessionStore._users.delete(sid)
+        return len(sids)
+
+
+class ServerSessionInterface(SessionInterface):
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if not sid:
+            return ServerSideSession()
+        
+        try:
+            record = SessionStore.get_backend().load(sid)
+        except Exception as e:
+            print(f"Error loading session: {e}")
+            record = None
+        if record is None:
+            return ServerSideSession()
+        
+        raw, expires_at = record
+        data = SessionStore.serializer.loads(raw)
+        if data.get('user_id'):
+            user = SessionStore.get_user(sid, data['user_id'])
+            if user is None:
+                return ServerSideSession()
+            data.update(user_name=user.name, user_email=user.email, user_role=user.role)
+        return ServerSideSession(data, sid, expires_at)
+    
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        backend = SessionStore.get_backend()
+        ttl = Config.SESSION_IDLE_TIMEOUT
+        
+        if not session:
+            if session.sid:
+                backend.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        
+        # A new sid whenever the logged-in user changes stops session fixation.
+        if session.sid and session.get('user_id') != session.original_user_id:
+            backend.delete(session.sid)
+            session.sid = None
+        
+        if session.sid and not session.modified:
+            # Sliding expiry, written at most once per half lifetime.
+            if session.expires_at - time.time() < ttl / 2:
+                backend.touch(session.sid, ttl)
+            return
+        
+        sid = session.sid or secrets.token_urlsafe(32)
+        data = {key: value for key, value in session.items() if key not in USER_FIELDS}
+        backend.save(sid, SessionStore.serializer.dumps(data), session.get('user_id'), ttl)
+        if session.get('user_id'):
+            SessionStore.remember_user(sid, session)
+        
+        if sid != session.sid:
+            response.set_cookie(name, sid, expires=self.get_expiration_time(app, session),
+                                httponly=self.get_cookie_httponly(app), domain=domain, path=path,
+                                secure=self.get_cookie_secure(app), samesite=self.get_cookie_samesite(app))
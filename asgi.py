@@ -0,0 +1,25 @@
+import importlib.util
+import os
+
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+
+
+def load_flask_app():
+    # app.py is shadowed by the app/ package, so load it by path.
+    spec = importlib.util.spec_from_file_location('lms_app', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app
+
+
+class LibraryASGI(WsgiToAsgi):
+    async def __call__(self, scope, receive, send):
+        # Without a context of its own every request would queue for asgiref's
+        # single shared sync thread.
+        async with ThreadSensitiveContext():
+            await super().__call__(scope, receive, send)
+
+
+flask_app = load_flask_app()
+app = LibraryASGI(flask_app)
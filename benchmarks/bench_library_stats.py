@@ -0,0 +1,62 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import statistics
+import time
+from app.models.book import Book
+
+
+def legacy_library_stats():
+    total_books = Book.get_total_books()
+    available_books = Book.get_available_books()
+    issued_books = Book.get_issued_books()
+    overdue_books = Book.get_overdue_books()
+    reservations = Book.get_reservations()
+    
+    availability_percentage = int((available_books / total_books * 100)) if total_books > 0 else 0
+    
+    return {
+        'total_books': total_books,
+        'available_books': available_books,
+        'issued_books': issued_books,
+        'overdue_books': overdue_books,
+        'reservations': reservations,
+        'availability_percentage': availability_percentage
+    }
+
+
+def measure(name, func, iterations):
+    func()
+    
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{name:<24} mean {statistics.mean(timings):8.2f} ms   "
+          f"p50 {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms")
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-counter and consolidated library stats latency")
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+    
+    if legacy_library_stats() != Book.get_library_stats():
+        print("Warning: legacy and consolidated stats differ")
+    
+    before = measure('five queries (before)', legacy_library_stats, args.iterations)
+    after = measure('batched (after)', Book.get_library_stats, args.iterations)
+    
+    if after > 0:
+        print(f"Speedup at p50: {before / after:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
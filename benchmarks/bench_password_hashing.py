@@ -0,0 +1,51 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from app.utils.password_hasher import PasswordHasher
+
+
+def logins_per_second(encoded, threads, duration):
+    deadline = time.perf_counter() + duration
+    
+    def worker():
+        count = 0
+        while time.perf_counter() < deadline:
+            PasswordHasher.verify('correct horse battery staple', encoded)
+            count += 1
+        return count
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        total = sum(future.result() for future in [executor.submit(worker) for _ in range(threads)])
+    return total / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure password verifications per second at the configured KDF cost")
+    parser.add_argument('--algorithm', choices=['pbkdf2_sha256', 'scrypt'], default=Config.PASSWORD_HASH_ALGORITHM)
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--threads', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    
+    encoded = PasswordHasher.hash('correct horse battery staple', algorithm=args.algorithm)
+    print(f"Hash format: {encoded.rsplit('$', 2)[0]}$...")
+    
+    started = time.perf_counter()
+    PasswordHasher.verify('correct horse battery staple', encoded)
+    print(f"Single verification: {(time.perf_counter() - started) * 1000:.1f} ms")
+    
+    single = logins_per_second(encoded, 1, args.duration)
+    print(f"1 thread:  {single:8.1f} logins/s (per core)")
+    if args.threads > 1:
+        # hashlib releases the GIL inside the KDF, so this should scale with cores.
+        parallel = logins_per_second(encoded, args.threads, args.duration)
+        print(f"{args.threads} threads: {parallel:8.1f} logins/s ({parallel / single:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import importlib.util
+import json
+import math
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.cookiejar import CookieJar
+from datetime import date
+from benchmarks import seed
+
+
+DEFAULT_MIX = {
+    'student-dashboard': 3,
+    'librarian-dashboard': 1,
+    'admin-dashboard': 1,
+    'student-book-status': 1,
+    'circulation': 3,
+    'book-reservation': 1
+}
+THRESHOLDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'thresholds.json')
+
+
+def load_flask_app():
+    # app.py is shadowed by the app/ package, so load it by path.
+    spec = importlib.util.spec_from_file_location('lms_app', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app
+
+
+class InProcessClient:
+    def __init__(self, flask_app, user_id, name, email, role):
+        self.client = flask_app.test_client()
+        with self.client.session_transaction() as session:
+            session['user_id'] = user_id
+            session['user_name'] = name
+            session['user_email'] = email
+            session['user_role'] = role
+    
+    def request(self, method, path, data=None):
+        response = self.client.open(path, method=method, data=data)
+        response.close()
+        return response.status_code
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class HttpClient:
+    def __init__(self, base_url, email, password):
+        self.base_url = base_url.rstrip('/')
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()), NoRedirect())
+        status = self.request('POST', '/login', {'email': email, 'password': password})
+        if status != 302:
+            raise RuntimeError(f"Login as {email} failed with HTTP {status}")
+    
+    def request(self, method, path, data=None):
+        body = urllib.parse.urlencode(data, doseq=True).encode() if data is not None else None
+        req = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with self.opener.open(req, timeout=30) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+
+class Worker(threading.Thread):
+    def __init__(self, number, args, make_client, results, deadline):
+        super().__init__(daemon=True)
+        self.number = number
+        self.args = args
+        self.results = results
+        self.deadline = deadline
+        self.rng = random.Random(args.seed + number)
+        self.mix = list(args.mix.items())
+        
+        # Each worker circulates its own books and students, so runs are
+        # repeatable and the dataset is left as it was found.
+        first_free_student = math.ceil(args.loans / 3)
+        self.student_number = first_free_student + number
+        self.books = [seed.book_id(args.loans + number + args.workers * offset) for offset in range(args.books_per_worker)]
+        self.on_loan = []
+        
+        student_email = seed.student_email(self.student_number)
+        self.clients = {
+            'Student': make_client(seed.student_id(self.student_number), f"Benchmark Student {self.student_number}", student_email, 'Student'),
+            'Librarian': make_client(seed.LIBRARIAN_ID, 'Benchmark Librarian', seed.LIBRARIAN_EMAIL, 'Librarian'),
+            'Admin': make_client(seed.ADMIN_ID, 'Benchmark Admin', seed.ADMIN_EMAIL, 'Admin')
+        }
+    
+    def pick(self):
+        total = sum(weight for _, weight in self.mix)
+        point = self.rng.uniform(0, total)
+        for name, weight in self.mix:
+            point -= weight
+            if point <= 0:
+                return name
+        return self.mix[-1][0]
+    
+    def next_request(self, scenario):
+        if scenario == 'student-dashboard':
+            return scenario, 'Student', 'GET', '/student/dashboard', None
+        if scenario == 'librarian-dashboard':
+            return scenario, 'Librarian', 'GET', '/librarian/dashboard', None
+        if scenario == 'admin-dashboard':
+            return scenario, 'Admin', 'GET', '/admin/dashboard', None
+        if scenario == 'student-book-status':
+            return scenario, 'Student', 'GET', '/student/book-status', None
+        if scenario == 'book-reservation':
+            # Reservations come from past the circulating copies so they never block an issue.
+            first_spare = self.args.loans + self.args.workers * self.args.books_per_worker
+            book = seed.book_id(self.rng.randrange(first_spare, self.args.books))
+            return scenario, 'Student', 'POST', '/student/book-reservation', {'selected_books': [book]}
+        
+        # Circulation alternates issue and return of the worker's own copies.
+        student = seed.student_id(self.student_number)
+        if self.on_loan and (len(self.on_loan) >= 2 or self.rng.random() < 0.5):
+            book = self.on_loan.pop(0)
+            return 'book-return', 'Librarian', 'POST', '/librarian/book-return', {
+                'user_id': student, 'book_id': book, 'return_date': date.today().isoformat()
+            }
+        book = self.books.pop(0)
+        self.books.append(book)
+        self.on_loan.append(book)
+        return 'book-issue', 'Librarian', 'POST', '/librarian/book-issue', {'user_id': student, 'book_id': book}
+    
+    def run(self):
+        samples = []
+        student = seed.student_id(self.student_number)
+        seed.release_reservations(student)
+        while time.monotonic() < self.deadline:
+            name, role, method, path, data = self.next_request(self.pick())
+            if name == 'book-reservation':
+                # Unmeasured: without it the student hits the limit of three
+                # after a few iterations and only the refusal gets timed.
+                seed.release_reservations(student)
+            started = time.perf_counter()
+            try:
+                status = self.clients[role].request(method, path, data)
+            except Exception:
+                status = None
+            samples.append((name, (time.perf_counter() - started) * 1000, status))
+        
+        # Return whatever is still on loan and drop the reservations so the
+        # next run starts clean.
+        for book in self.on_loan:
+            self.clients['Librarian'].request('POST', '/librarian/book-return', {
+                'user_id': student, 'book_id': book, 'return_date': date.today().isoformat()
+            })
+        seed.release_reservations(student)
+        self.results.extend(samples)
+
+
+def percentile(sorted_values, percent):
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples, elapsed):
+    by_scenario = {}
+    for name, milliseconds, status in samples:
+        by_scenario.setdefault(name, []).append((milliseconds, status))
+    
+    report = {'elapsed_s': round(elapsed, 2), 'requests': len(samples),
+              'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else 0.0, 'scenarios': {}}
+    for name, entries in sorted(by_scenario.items()):
+        timings = sorted(milliseconds for milliseconds, _ in entries)
+        errors = sum(1 for _, status in entries if status is None or status >= 500)
+        report['scenarios'][name] = {
+            'requests': len(entries),
+            'errors': errors,
+            'error_rate': round(errors / len(entries), 4),
+            'throughput_rps': round(len(entries) / elapsed, 2) if elapsed else 0.0,
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'p99_ms': round(percentile(timings, 99), 2),
+            'max_ms': round(timings[-1], 2)
+        }
+    return report
+
+
+def check_thresholds(report, thresholds):
+    failures = []
+    if report['throughput_rps'] < thresholds.get('min_throughput_rps', 0):
+        failures.append(f"throughput {report['throughput_rps']} rps < {thresholds['min_throughput_rps']} rps")
+    
+    defaults = thresholds.get('default', {})
+    for name, stats in report['scenarios'].items():
+        limits = dict(defaults, **thresholds.get('scenarios', {}).get(name, {}))
+        for metric in ('p50_ms', 'p95_ms', 'p99_ms', 'error_rate'):
+            if metric in limits and stats[metric] > limits[metric]:
+                failures.append(f"{name}: {metric} {stats[metric]} > {limits[metric]}")
+    return failures
+
+
+def print_report(report):
+    print(f"\n{report['requests']} requests in {report['elapsed_s']} s ({report['throughput_rps']} req/s)\n")
+    print(f"{'scenario':<22}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, stats in report['scenarios'].items():
+        print(f"{name:<22}{stats['requests']:>9}{stats['errors']:>8}{stats['throughput_rps']:>9}"
+              f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['max_ms']:>10}")
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive the main LMS routes with concurrent clients")
+    parser.add_argument('--workers', type=int, default=8, help="concurrent clients")
+    parser.add_argument('--duration', type=float, default=30, help="seconds to run")
+    parser.add_argument('--base-url', help="benchmark a running server instead of the in-process app")
+    parser.add_argument('--mix', type=parse_mix, default=dict(DEFAULT_MIX),
+                        help="weighted scenarios, e.g. circulation=3,student-dashboard=1")
+    parser.add_argument('--books', type=int, default=10000, help="must match the seeded volume")
+    parser.add_argument('--loans', type=int, default=1500, help="must match the seeded volume")
+    parser.add_argument('--books-per-worker', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--thresholds', default=THRESHOLDS_FILE, help="JSON regression limits ('' to skip)")
+    parser.add_argument('--json', help="also write the report to this file")
+    args = parser.parse_args(argv)
+    
+    if args.base_url:
+        def make_client(user_id, name, email, role):
+            return HttpClient(args.base_url, email, seed.PASSWORD)
+    else:
+        flask_app = load_flask_app()
+        
+        def make_client(user_id, name, email, role):
+            return InProcessClient(flask_app, user_id, name, email, role)
+    
+    results = []
+    started = time.monotonic()
+    deadline = started + args.duration
+    workers = [Worker(number, args, make_client, results, deadline) for number in range(args.workers)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    
+    # Workers hand back their outstanding loans after the deadline; that clean-up is not measured.
+    report = summarize(results, min(time.monotonic() - started, args.duration))
+    print_report(report)
+    
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump(report, output, indent=2)
+    
+    if args.thresholds:
+        with open(args.thresholds) as source:
+            failures = check_thresholds(report, json.load(source))
+        if failures:
+            print("\n✗ Regression thresholds exceeded:")
+            for failure in failures:
+                print(f"  {failure}")
+            return 1
+        print("\n✓ Within regression thresholds")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
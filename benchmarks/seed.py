@@ -0,0 +1,196 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+from datetime import date, timedelta
+from app.models.book_counter import BookCounter
+from app.models.circulation_event import CirculationEvent
+from app.models.circulation_rollup import CirculationRollup
+from app.models.fine_ledger import FineLedger
+from app.models.overdue_tracker import OverdueTracker
+from app.models.reservation_queue import ReservationQueue
+from app.models.user import User
+from app.utils.cache import Cache
+from app.utils.database import Database
+from app.utils.db_initializer import DatabaseInitializer
+
+
+# Every seeded row carries this prefix so a run can be wiped without touching real data.
+PREFIX = 'bench-'
+PASSWORD = 'bench123'
+CHUNK_SIZE = 1000
+SUBJECTS = ['Computer Science', 'Mathematics', 'Physics', 'Chemistry', 'Biology',
+            'History', 'Literature', 'Economics', 'Philosophy', 'Engineering']
+WORDS = ['Advanced', 'Applied', 'Modern', 'Introduction', 'Principles', 'Systems', 'Theory',
+         'Methods', 'Foundations', 'Analysis', 'Design', 'Practical', 'Concepts', 'Structures']
+
+
+def book_id(number):
+    return f"{PREFIX}book-{number:07d}"
+
+
+def student_id(number):
+    return f"{PREFIX}student-{number:06d}"
+
+
+def student_email(number):
+    return f"{PREFIX}student-{number:06d}@lms.test"
+
+
+LIBRARIAN_ID = f"{PREFIX}librarian"
+LIBRARIAN_EMAIL = f"{PREFIX}librarian@lms.test"
+ADMIN_ID = f"{PREFIX}admin"
+ADMIN_EMAIL = f"{PREFIX}admin@lms.test"
+
+
+def insert_chunked(query, rows):
+    inserted = 0
+    for start in range(0, len(rows), CHUNK_SIZE):
+        inserted += Database.execute_many(query, rows[start:start + CHUNK_SIZE]) or 0
+    return inserted
+
+
+def reset():
+    for query in (
+        f"DELETE FROM transaction WHERE UserID LIKE '{PREFIX}%'",
+        f"DELETE FROM book_reservations WHERE user_id LIKE '{PREFIX}%'",
+        f"DELETE FROM issued_books WHERE UserID LIKE '{PREFIX}%'",
+        f"DELETE FROM fine_ledger WHERE user_id LIKE '{PREFIX}%'",
+        f"DELETE FROM notifications WHERE user_id LIKE '{PREFIX}%'",
+        f"DELETE FROM circulation_events WHERE user_id LIKE '{PREFIX}%' OR book_id LIKE '{PREFIX}%'",
+        f"DELETE FROM circulation_daily_book WHERE book_id LIKE '{PREFIX}%'",
+        f"DELETE FROM circulation_monthly_book WHERE book_id LIKE '{PREFIX}%'",
+        f"DELETE FROM books WHERE book_id LIKE '{PREFIX}%'",
+        f"DELETE FROM users WHERE UserID LIKE '{PREFIX}%'",
+    ):
+        Database.execute_insert_query(query)
+    
+    # Balances, daily fine totals and the day and subject rollups mix seeded
+    # and real rows, so they are rebuilt from what is left.
+    FineLedger.reconcile()
+    first_day = Database.execute_single_query("SELECT MIN(day) as first_day FROM circulation_daily")
+    if first_day and first_day['first_day']:
+        CirculationRollup.backfill(start=first_day['first_day'])
+    BookCounter.reconcile()
+    OverdueTracker.reconcile()
+    Cache.invalidate('catalogue')
+    CirculationEvent.mark_stale()
+
+
+def release_reservations(user_id):
+    # Cancels a student's reservations and hands any held copy to the next
+    # in its queue, so each load test reservation starts from the same state.
+    def work(cursor):
+        cursor.execute("""
+        SELECT DISTINCT book_id FROM book_reservations
+        WHERE user_id = %s AND status IN ('Active', 'Queued')
+        """, (user_id,))
+        book_ids = sorted(row[0] for row in cursor.fetchall())
+        if not book_ids:
+            return 0
+        
+        placeholders = ', '.join(['%s'] * len(book_ids))
+        cursor.execute(f"""
+        SELECT book_id, status FROM books WHERE book_id IN ({placeholders}) ORDER BY book_id FOR UPDATE
+        """, book_ids)
+        statuses = dict(cursor.fetchall())
+        cursor.execute("""
+        SELECT book_id, status FROM book_reservations
+        WHERE user_id = %s AND status IN ('Active', 'Queued')
+        FOR UPDATE
+        """, (user_id,))
+        reservations = cursor.fetchall()
+        cursor.execute("""
+        UPDATE book_reservations SET status = 'Cancelled'
+        WHERE user_id = %s AND status IN ('Active', 'Queued')
+        """, (user_id,))
+        for book_id, status in reservations:
+            if status == 'Active' and statuses.get(book_id) == 'Reserved':
+                ReservationQueue.assign_next(cursor, book_id, 'Reserved')
+        return len(reservations)
+    
+    released = Database.run_in_transaction(work)
+    if released:
+        Cache.invalidate('catalogue')
+    return released
+
+
+def seed(books, students, transactions, loans, rng_seed=42):
+    rng = random.Random(rng_seed)
+    today = date.today()
+    password = User.hash_password(PASSWORD)
+    
+    users = [(ADMIN_ID, 'Benchmark Admin', ADMIN_EMAIL, password, 'Admin'),
+             (LIBRARIAN_ID, 'Benchmark Librarian', LIBRARIAN_EMAIL, password, 'Librarian')]
+    users += [(student_id(number), f"Benchmark Student {number}", student_email(number), password, 'Student')
+              for number in range(students)]
+    insert_chunked("""
+    INSERT INTO users (UserID, Name, Email, Password, Role) VALUES (%s, %s, %s, %s, %s)
+    """, users)
+    
+    loans = min(loans, books, students * 3)
+    catalogue = []
+    for number in range(books):
+        title = ' '.join(rng.sample(WORDS, 3)) + f" {number}"
+        status = 'Borrowed' if number < loans else 'Available'
+        catalogue.append((book_id(number), title, f"Author {rng.randrange(books // 10 + 1)}",
+                          rng.choice(SUBJECTS), f"978{number:010d}", status))
+    insert_chunked("""
+    INSERT INTO books (book_id, title, author, subject, isbn, status) VALUES (%s, %s, %s, %s, %s, %s)
+    """, catalogue)
+    
+    # The first `loans` books are on loan, at most three per student as the app enforces.
+    issued = []
+    for number in range(loans):
+        issue_date = today - timedelta(days=rng.randrange(1, 14))
+        issued.append((student_id(number // 3), book_id(number), issue_date, issue_date + timedelta(days=7)))
+    insert_chunked("""
+    INSERT INTO issued_books (UserID, book_id, issue_date, due_date) VALUES (%s, %s, %s, %s)
+    """, issued)
+    
+    history = []
+    for _ in range(transactions):
+        issue_date = today - timedelta(days=rng.randrange(8, 3 * 365))
+        due_date = issue_date + timedelta(days=7)
+        return_date = due_date + timedelta(days=rng.randrange(-6, 10))
+        fine = max(0, (return_date - due_date).days) * 10.00
+        history.append((student_id(rng.randrange(students)), book_id(rng.randrange(books)),
+                        issue_date, due_date, return_date, fine))
+    insert_chunked("""
+    INSERT INTO transaction (UserID, BookID, IssueDate, DueDate, ReturnDate, Fine) VALUES (%s, %s, %s, %s, %s, %s)
+    """, history)
+    
+    BookCounter.reconcile()
+    Cache.invalidate('catalogue')
+    return {'books': books, 'students': students, 'loans': loans, 'transactions': transactions}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the configured MySQL database with benchmark data")
+    parser.add_argument('--books', type=int, default=10000)
+    parser.add_argument('--students', type=int, default=2000)
+    parser.add_argument('--transactions', type=int, default=50000)
+    parser.add_argument('--loans', type=int, default=1500)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--reset', action='store_true', help="only remove previously seeded benchmark rows")
+    args = parser.parse_args()
+    
+    if not DatabaseInitializer.initialize_all():
+        print("✗ Could not initialize the database")
+        return 1
+    
+    reset()
+    if args.reset:
+        print("✓ Benchmark data removed")
+        return 0
+    
+    summary = seed(args.books, args.students, args.transactions, args.loans, args.seed)
+    print(f"✓ Seeded {summary['books']} books, {summary['students']} students, "
+          f"{summary['loans']} active loans and {summary['transactions']} transactions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 
 class Config:
@@ -10,6 +11,64 @@ class Config:
     DB_NAME = os.environ.get('DB_NAME') or 'lms'
     DB_PORT = int(os.environ.get('DB_PORT', 3306))
     
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_POOL_MAX_OVERFLOW = int(os.environ.get('DB_POOL_MAX_OVERFLOW', 5))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    DB_TRANSACTION_RETRIES = int(os.environ.get('DB_TRANSACTION_RETRIES', 3))
+    
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND') or 'memory'
+    CACHE_DEFAULT_TTL = int(os.environ.get('CACHE_DEFAULT_TTL', 300))
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 1024))
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL') or 'redis://localhost:6379/0'
+    
+    QUERY_PROFILER_ENABLED = os.environ.get('QUERY_PROFILER_ENABLED', 'true').lower() == 'true'
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 200))
+    QUERY_PROFILER_HISTORY = int(os.environ.get('QUERY_PROFILER_HISTORY', 50))
+    
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
+    METRICS_BUSINESS_TTL = int(os.environ.get('METRICS_BUSINESS_TTL', 30))
+    
+    PASSWORD_HASH_ALGORITHM = os.environ.get('PASSWORD_HASH_ALGORITHM') or 'pbkdf2_sha256'
+    PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 600000))
+    PASSWORD_SCRYPT_N = int(os.environ.get('PASSWORD_SCRYPT_N', 2 ** 15))
+    PASSWORD_SCRYPT_R = int(os.environ.get('PASSWORD_SCRYPT_R', 8))
+    PASSWORD_SCRYPT_P = int(os.environ.get('PASSWORD_SCRYPT_P', 1))
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 2))
+    
+    SESSION_BACKEND = os.environ.get('SESSION_BACKEND') or 'sqlite'
+    SESSION_SQLITE_PATH = os.environ.get('SESSION_SQLITE_PATH') or os.path.join(tempfile.gettempdir(), 'lms_sessions.sqlite3')
+    SESSION_REDIS_URL = os.environ.get('SESSION_REDIS_URL') or 'redis://localhost:6379/1'
+    SESSION_IDLE_TIMEOUT = int(os.environ.get('SESSION_IDLE_TIMEOUT', 8 * 3600))
+    SESSION_USER_CACHE_SIZE = int(os.environ.get('SESSION_USER_CACHE_SIZE', 4096))
+    SESSION_USER_CACHE_TTL = int(os.environ.get('SESSION_USER_CACHE_TTL', 60))
+    
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', 'false').lower() == 'true'
+    OVERDUE_SWEEP_INTERVAL = int(os.environ.get('OVERDUE_SWEEP_INTERVAL', 3600))
+    OVERDUE_SWEEP_BATCH_SIZE = int(os.environ.get('OVERDUE_SWEEP_BATCH_SIZE', 500))
+    
+    NOTIFICATION_INTERVAL = int(os.environ.get('NOTIFICATION_INTERVAL', 900))
+    NOTIFICATION_DUE_WITHIN_DAYS = int(os.environ.get('NOTIFICATION_DUE_WITHIN_DAYS', 2))
+    NOTIFICATION_OVERDUE_WITHIN_DAYS = int(os.environ.get('NOTIFICATION_OVERDUE_WITHIN_DAYS', 7))
+    NOTIFICATION_SENDER = os.environ.get('NOTIFICATION_SENDER') or 'file'
+    NOTIFICATION_FILE_PATH = os.environ.get('NOTIFICATION_FILE_PATH') or os.path.join(tempfile.gettempdir(), 'lms_notifications.jsonl')
+    NOTIFICATION_SMTP_HOST = os.environ.get('NOTIFICATION_SMTP_HOST') or 'localhost'
+    NOTIFICATION_SMTP_PORT = int(os.environ.get('NOTIFICATION_SMTP_PORT', 1025))
+    NOTIFICATION_FROM = os.environ.get('NOTIFICATION_FROM') or 'library@lms.local'
+    NOTIFICATION_WORKERS = int(os.environ.get('NOTIFICATION_WORKERS', 8))
+    NOTIFICATION_BATCH_SIZE = int(os.environ.get('NOTIFICATION_BATCH_SIZE', 500))
+    NOTIFICATION_MAX_ATTEMPTS = int(os.environ.get('NOTIFICATION_MAX_ATTEMPTS', 5))
+    NOTIFICATION_RETRY_SECONDS = int(os.environ.get('NOTIFICATION_RETRY_SECONDS', 60))
+    NOTIFICATION_LEASE_SECONDS = int(os.environ.get('NOTIFICATION_LEASE_SECONDS', 300))
+    
+    ACTIVITY_FEED_SIZE = int(os.environ.get('ACTIVITY_FEED_SIZE', 50))
+    ACTIVITY_FEED_REFRESH_SECONDS = int(os.environ.get('ACTIVITY_FEED_REFRESH_SECONDS', 5))
+    
+    RESERVATION_HOLD_DAYS = int(os.environ.get('RESERVATION_HOLD_DAYS', 3))
+    RESERVATION_SWEEP_INTERVAL = int(os.environ.get('RESERVATION_SWEEP_INTERVAL', 900))
+    RESERVATION_SWEEP_BATCH_SIZE = int(os.environ.get('RESERVATION_SWEEP_BATCH_SIZE', 500))
+    
     @staticmethod
     def get_db_config():
         return {
@@ -20,3 +79,13 @@ class Config:
             'port': Config.DB_PORT,
             'autocommit': True
         }
+    
+    @staticmethod
+    def get_pool_config():
+        return {
+            'pool_size': Config.DB_POOL_SIZE,
+            'max_overflow': Config.DB_POOL_MAX_OVERFLOW,
+            'timeout': Config.DB_POOL_TIMEOUT,
+            'recycle': Config.DB_POOL_RECYCLE,
+            'pre_ping': Config.DB_POOL_PRE_PING
+        }
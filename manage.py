@@ -0,0 +1,148 @@
+import argparse
+import sys
+from datetime import date
+from app.models.book_counter import BookCounter
+from app.models.circulation_rollup import CirculationRollup
+from app.models.fine_ledger import FineLedger
+from app.models.overdue_tracker import OverdueTracker
+from app.models.reservation_queue import ReservationQueue
+from app.utils.book_importer import BookImporter, READERS
+from app.utils.migrations import MigrationRunner
+from app.utils.notifications import NotificationJob
+
+
+def reconcile_counters(args):
+    if BookCounter.reconcile() and OverdueTracker.reconcile() and FineLedger.reconcile():
+        print("✓ Book counters rebuilt from books, overdue counters from loans and fine balances from the ledger")
+        return 0
+    print("✗ Book counter reconciliation failed")
+    return 1
+
+
+def migrate(args):
+    if args.status:
+        status = MigrationRunner.get_status()
+        if status is None:
+            return 1
+        for migration in status:
+            marker = '✓' if migration['applied'] else ' '
+            print(f"[{marker}] {migration['version']:>4}  {migration['description']}")
+        return 0
+    
+    if MigrationRunner.run():
+        print("✓ Schema is up to date")
+        return 0
+    return 1
+
+
+def import_books(args):
+    def report_progress(report):
+        print(f"  read {report['read']}, inserted {report['inserted']}, "
+              f"duplicates {report['duplicates']}, rejected {report['rejected']}")
+    
+    rejects = open(args.rejects, 'w', encoding='utf-8') if args.rejects else None
+    try:
+        importer = BookImporter(chunk_size=args.chunk_size, progress=report_progress, rejects=rejects)
+        report = importer.import_file(args.path, args.format)
+    finally:
+        if rejects:
+            rejects.close()
+    
+    if report is None:
+        print("✗ Book import failed")
+        return 1
+    print(f"✓ Imported {report['inserted']} of {report['read']} records "
+          f"({report['duplicates']} duplicates, {report['rejected']} rejected)")
+    return 0
+
+
+def sweep_overdue(args):
+    marked = OverdueTracker.sweep(batch_size=args.batch_size)
+    if marked is None:
+        print("✗ Overdue sweep failed")
+        return 1
+    summary = OverdueTracker.get_summary() or {'overdue_loans': 0, 'accrued_fines': 0}
+    print(f"✓ Marked {marked} loans overdue; {summary['overdue_loans']} overdue in total, "
+          f"{summary['accrued_fines']:.2f} Taka in accrued fines")
+    return 0
+
+
+def expire_holds(args):
+    expired = ReservationQueue.expire_holds(batch_size=args.batch_size)
+    if expired is None:
+        print("✗ Reservation hold sweep failed")
+        return 1
+    print(f"✓ Released {expired} expired reservation holds")
+    return 0
+
+
+def notify(args):
+    summary = NotificationJob.run(scan=not args.deliver_only, deliver=not args.scan_only)
+    if 'queued' in summary:
+        if summary['queued'] is None:
+            print("✗ Notification scan failed")
+            return 1
+        queued = ', '.join(f"{count} {kind}" for kind, count in summary['queued'].items())
+        print(f"✓ Queued {queued}")
+    if 'delivered' in summary:
+        delivered = summary['delivered']
+        print(f"✓ Delivered {delivered['sent']} notifications; {delivered['failed']} failed and will be retried until out of attempts")
+    return 0
+
+
+def backfill_rollups(args):
+    def report_progress(start, end):
+        print(f"  rebuilt {start} to {end}")
+    
+    months = CirculationRollup.backfill(start=args.start, end=args.end, progress=report_progress)
+    if months is None:
+        print("✗ Circulation rollup backfill failed")
+        return 1
+    print(f"✓ Rebuilt circulation rollups for {months} months")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Library Management System maintenance commands")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    reconcile_parser = subparsers.add_parser('reconcile-counters', help="Rebuild book status, overdue loan and fine balance counters")
+    reconcile_parser.set_defaults(handler=reconcile_counters)
+    
+    migrate_parser = subparsers.add_parser('migrate', help="Apply pending schema migrations")
+    migrate_parser.add_argument('--status', action='store_true', help="List migrations and whether they are applied")
+    migrate_parser.set_defaults(handler=migrate)
+    
+    import_parser = subparsers.add_parser('import-books', help="Bulk import books from a CSV, JSON Lines or MARC-like file")
+    import_parser.add_argument('path')
+    import_parser.add_argument('--format', choices=sorted(READERS), help="File format (detected from the extension by default)")
+    import_parser.add_argument('--chunk-size', type=int, default=1000, help="Rows inserted and committed per batch")
+    import_parser.add_argument('--rejects', help="Write rejected records to this JSON Lines file")
+    import_parser.set_defaults(handler=import_books)
+    
+    sweep_parser = subparsers.add_parser('sweep-overdue', help="Mark loans past their due date as overdue")
+    sweep_parser.add_argument('--batch-size', type=int, default=500, help="Loans marked and committed per batch")
+    sweep_parser.set_defaults(handler=sweep_overdue)
+    
+    holds_parser = subparsers.add_parser('expire-holds', help="Release expired reservation holds and pass the copies down the queue")
+    holds_parser.add_argument('--batch-size', type=int, default=500, help="Holds released and committed per batch")
+    holds_parser.set_defaults(handler=expire_holds)
+    
+    notify_parser = subparsers.add_parser('notify', help="Queue due-date, overdue and reservation notifications and deliver them")
+    notify_mode = notify_parser.add_mutually_exclusive_group()
+    notify_mode.add_argument('--scan-only', action='store_true', help="Only queue new notifications")
+    notify_mode.add_argument('--deliver-only', action='store_true', help="Only deliver queued notifications")
+    notify_parser.set_defaults(handler=notify)
+    
+    backfill_parser = subparsers.add_parser('backfill-rollups', help="Rebuild the daily circulation rollups from loans and transactions "
+                                                                        "(loans returned by older releases count under the Unknown subject)")
+    backfill_parser.add_argument('--start', type=date.fromisoformat, help="First day to rebuild, YYYY-MM-DD (default: earliest loan)")
+    backfill_parser.add_argument('--end', type=date.fromisoformat, help="Last day to rebuild, YYYY-MM-DD (default: today)")
+    backfill_parser.set_defaults(handler=backfill_rollups)
+    
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import re
+from contextlib import contextmanager
+from app.utils.database import Database
+
+
+class UnexpectedStatement(BaseException):
+    # Not an Exception, so the catch-all handlers in Database cannot turn it
+    # into a quiet default return value.
+    pass
+
+
+class FakeConnection:
+    # A connection that is its own cursor, for driving model code without a
+    # MySQL server. Subclasses list (regex, method name) pairs in HANDLERS;
+    # each statement is matched with its whitespace collapsed, and the first
+    # match handles it with the query parameters. A None method just records
+    # the statement. A statement nothing matches fails the test, so a query
+    # that is rewritten shows up here instead of silently doing nothing.
+    HANDLERS = ()
+    
+    def __init__(self):
+        self.statements = []
+        self.counters = {}
+        self.rows = []
+        self.rowcount = 0
+        self.commits = 0
+        self.rollbacks = 0
+    
+    def cursor(self, dictionary=False, buffered=None):
+        return self
+    
+    def start_transaction(self):
+        pass
+    
+    def execute(self, query, params=None):
+        query = ' '.join(query.split())
+        self.statements.append((query, params))
+        self.rows = []
+        self.rowcount = 0
+        for pattern, handler in self.HANDLERS + (('^INSERT INTO book_counters', 'adjust_counter'),):
+            if re.search(pattern, query):
+                if handler:
+                    getattr(self, handler)(params)
+                return
+        raise UnexpectedStatement(query)
+    
+    def executemany(self, query, seq_params):
+        for params in seq_params:
+            self.execute(query, params)
+    
+    def adjust_counter(self, params):
+        # BookCounter.adjust: (counter_name, delta, delta).
+        name, delta, _ = params
+        self.counters[name] = self.counters.get(name, 0) + delta
+    
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+    
+    def fetchall(self):
+        return self.rows
+    
+    def commit(self):
+        self.commits += 1
+    
+    def rollback(self):
+        self.rollbacks += 1
+    
+    def close(self):
+        pass
+
+
+@contextmanager
+def use_connection(connection):
+    # Every Database.get_connection() inside the block returns connection.
+    original = Database.get_connection
+    Database.get_connection = staticmethod(lambda: connection)
+    try:
+        yield connection
+    finally:
+        Database.get_connection = original
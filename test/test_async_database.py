@@ -0,0 +1,88 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import contextvars
+import threading
+from flask import Flask
+from app.utils.async_database import AsyncDatabase
+
+
+request_id = contextvars.ContextVar('request_id', default=None)
+
+
+def lookup(value, barrier):
+    # Returns only once the other lookup is running too; run one after the
+    # other, the first would time out waiting.
+    barrier.wait()
+    return value, request_id.get()
+
+
+def test_async_database_gather():
+    print("Testing Async Database Fan-Out...")
+    
+    barrier = threading.Barrier(2, timeout=5)
+    
+    async def dashboard():
+        request_id.set('req-1')
+        return await asyncio.gather(AsyncDatabase.run(lookup, 'reservations', barrier),
+                                    AsyncDatabase.run(lookup, 'fines', barrier))
+    
+    results = asyncio.run(dashboard())
+    print(f"Results: {results}")
+    assert results == [('reservations', 'req-1'), ('fines', 'req-1')]
+    
+    print("Async database fan-out test completed!")
+
+
+def asgi_get(application, path):
+    scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+             'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+             'root_path': '', 'headers': [(b'host', b'localhost')], 'server': ('localhost', 80),
+             'client': ('127.0.0.1', 1234)}
+    messages = []
+    
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+    
+    async def send(message):
+        messages.append(message)
+    
+    async def call():
+        await application(scope, receive, send)
+        return messages[0]['status']
+    return call()
+
+
+def test_asgi_concurrency():
+    print("\nTesting ASGI Adapter...")
+    
+    from asgi import LibraryASGI
+    
+    # A throwaway app, so no route is added to the real one. Each request
+    # waits for the other; if the adapter ran them on one thread the barrier
+    # would time out and both would answer 500.
+    barrier = threading.Barrier(2, timeout=5)
+    flask_app = Flask(__name__)
+    
+    @flask_app.route('/wait')
+    def wait():
+        barrier.wait()
+        return 'ok'
+    
+    application = LibraryASGI(flask_app)
+    
+    async def two_requests():
+        return await asyncio.gather(asgi_get(application, '/wait'), asgi_get(application, '/wait'))
+    
+    statuses = asyncio.run(two_requests())
+    print(f"Statuses: {statuses}")
+    assert statuses == [200, 200]
+    
+    print("ASGI adapter test completed!")
+
+
+if __name__ == "__main__":
+    test_async_database_gather()
+    test_asgi_concurrency()
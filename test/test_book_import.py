@@ -0,0 +1,121 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+from mysql.connector.errors import IntegrityError, OperationalError
+from app.utils.book_importer import BookImporter, read_csv, read_jsonl, read_marc
+from fake_db import FakeConnection, use_connection
+
+
+def test_import_readers():
+    print("Testing Book Import Readers...")
+    
+    csv_records = list(read_csv(io.StringIO("Title,Author,Subject,ISBN\nPython Programming,John Smith,Computer Science,978-1234567890\n")))
+    jsonl_records = list(read_jsonl(io.StringIO('{"title": "Mathematics", "author": "Alice Brown", "subject": "Mathematics", "isbn": "9785566778899"}\n\nnot json\n')))
+    marc_records = list(read_marc(io.StringIO("=245  10$aPhysics Fundamentals /\n=100  1\\$aCharlie Wilson\n650 Physics\n020 978-9988776655\n\n245 Chemistry Basics\n")))
+    
+    print(f"CSV: {csv_records}")
+    print(f"JSON Lines: {jsonl_records}")
+    print(f"MARC: {marc_records}")
+    assert csv_records[0]['title'] == 'Python Programming'
+    assert jsonl_records[1] == {'_error': 'invalid JSON'}
+    assert marc_records[0] == {'title': 'Physics Fundamentals', 'author': 'Charlie Wilson', 'subject': 'Physics', 'isbn': '978-9988776655'}
+    
+    print("Import readers test completed!")
+
+
+def test_import_validation():
+    print("\nTesting Book Import Validation...")
+    
+    rejects = io.StringIO()
+    importer = BookImporter(rejects=rejects)
+    valid = importer.validate({'title': 'Web Development', 'author': 'Jane Doe', 'subject': 'Computer Science', 'isbn': '978-0987654321'})
+    duplicate = importer.validate({'title': 'Web Development 2nd', 'author': 'Jane Doe', 'subject': 'Computer Science', 'isbn': '9780987654321'})
+    invalid = importer.validate({'title': 'No ISBN', 'author': 'Someone', 'subject': 'Arts', 'isbn': '12'})
+    
+    print(f"Report: {importer.report}")
+    print(f"Rejects: {rejects.getvalue().strip()}")
+    assert valid['normalized_isbn'] == '9780987654321'
+    assert duplicate is None and invalid is None
+    assert importer.report['duplicates'] == 1 and importer.report['rejected'] == 1
+    
+    print("Import validation test completed!")
+
+
+class FakeCatalogueConnection(FakeConnection):
+    # A books table keyed by book_id. Inserts are pending until commit, and a
+    # failed statement undoes only itself, as in InnoDB.
+    HANDLERS = (
+        (r"^SELECT isbn FROM books WHERE isbn IN \(", 'find_isbns'),
+        (r"^INSERT INTO books \(book_id, title, author, subject, isbn, status\)", 'insert_book'),
+        (r"^INSERT INTO circulation_events ", None),
+    )
+    
+    def __init__(self, books, lookup_fails=False):
+        super().__init__()
+        self.books = books
+        self.pending = {}
+        self.lookup_fails = lookup_fails
+    
+    def find_isbns(self, params):
+        if self.lookup_fails:
+            raise OperationalError(msg="Lost connection to MySQL server during query", errno=2013)
+        self.rows = [(isbn,) for isbn in self.books.values() if isbn in params]
+    
+    def insert_book(self, params):
+        if params[0] in self.books or params[0] in self.pending:
+            raise IntegrityError(msg=f"Duplicate entry '{params[0]}' for key 'PRIMARY'", errno=1062)
+        self.pending[params[0]] = params[4]
+    
+    def executemany(self, query, seq_params):
+        # A multi-row INSERT is one statement: all rows or none.
+        snapshot = dict(self.pending)
+        try:
+            super().executemany(query, seq_params)
+        except IntegrityError:
+            self.pending = snapshot
+            raise
+    
+    def commit(self):
+        super().commit()
+        self.books.update(self.pending)
+        self.pending = {}
+    
+    def rollback(self):
+        super().rollback()
+        self.pending = {}
+
+
+def test_import_chunk_fallback():
+    print("\nTesting Book Import Chunk Fallback...")
+    
+    records = [{'book_id': f"B{number}", 'title': f"Book {number}", 'author': 'Author', 'subject': 'Physics',
+                'isbn': f"978000000000{number}"} for number in range(1, 6)]
+    connection = FakeCatalogueConnection({'B3': '9780000000099'})
+    rejects = io.StringIO()
+    with use_connection(connection):
+        report = BookImporter(chunk_size=10, rejects=rejects).import_records(records)
+    
+    # The colliding B3 fails the chunk insert; the other four go in one by one.
+    print(f"Report: {report}")
+    assert report == {'read': 5, 'inserted': 4, 'duplicates': 0, 'rejected': 1}
+    assert sorted(connection.books) == ['B1', 'B2', 'B3', 'B4', 'B5']
+    assert connection.books['B3'] == '9780000000099'
+    assert 'B3' in rejects.getvalue() and 'Duplicate entry' in rejects.getvalue()
+    assert connection.counters == {'Available': 4}
+    
+    connection = FakeCatalogueConnection({}, lookup_fails=True)
+    with use_connection(connection):
+        report = BookImporter(chunk_size=2).import_records(records)
+    print(f"Report with failed lookup: {report}")
+    assert report == {'read': 5, 'inserted': 0, 'duplicates': 0, 'rejected': 5}
+    assert connection.books == {}
+    
+    print("Import chunk fallback test completed!")
+
+
+if __name__ == "__main__":
+    test_import_readers()
+    test_import_validation()
+    test_import_chunk_fallback()
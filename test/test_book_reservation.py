@@ -0,0 +1,94 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.book import Book
+from fake_db import FakeConnection, use_connection
+
+
+class FakeReservingConnection(FakeConnection):
+    # One student, books by status and the student's loans and reservations.
+    HANDLERS = (
+        (r"^SELECT UserID, Name FROM users WHERE UserID = %s FOR UPDATE", 'lock_student'),
+        (r"^SELECT book_id FROM book_reservations WHERE user_id = %s AND status IN \('Active', 'Queued'\)", 'active_reservations'),
+        (r"^SELECT book_id, status, title FROM books WHERE book_id IN \(.*\) ORDER BY book_id FOR UPDATE$", 'lock_books'),
+        (r"^SELECT book_id FROM issued_books WHERE UserID = %s", 'loans'),
+        (r"^INSERT INTO book_reservations ", 'add_reservation'),
+        (r"^UPDATE books SET status = 'Reserved' WHERE book_id IN \(.*\) AND status = 'Available'$", 'hold_books'),
+        (r"^INSERT INTO circulation_events ", None),
+    )
+    
+    def __init__(self, books, reservations=(), on_loan=()):
+        super().__init__()
+        self.books = books
+        self.reservations = {book_id: 'Active' for book_id in reservations}
+        self.on_loan = list(on_loan)
+    
+    def lock_student(self, params):
+        self.rows = [(params[0], 'Student One')] if params[0] == 's1' else []
+    
+    def active_reservations(self, params):
+        self.rows = [(book_id,) for book_id in self.reservations]
+    
+    def lock_books(self, params):
+        self.rows = [(book_id, self.books[book_id], book_id.upper()) for book_id in sorted(params) if book_id in self.books]
+    
+    def loans(self, params):
+        self.rows = [(book_id,) for book_id in self.on_loan]
+    
+    def add_reservation(self, params):
+        # Holds carry an expiry; queue entries do not.
+        self.reservations[params[1]] = 'Active' if len(params) == 4 else 'Queued'
+    
+    def hold_books(self, params):
+        for book_id in params:
+            if self.books.get(book_id) == 'Available':
+                self.books[book_id] = 'Reserved'
+                self.rowcount += 1
+
+
+def test_batched_reservations():
+    print("Testing Batched Book Reservations...")
+    
+    assert Book.reserve_books([], 'nobody') == {'reserved': [], 'queued': [], 'unavailable': [], 'already_reserved': [], 'limit_exceeded': False}
+    
+    books = {'b1': 'Available', 'b2': 'Borrowed', 'b3': 'Borrowed', 'b4': 'Available'}
+    connection = FakeReservingConnection(books, on_loan=['b3'])
+    with use_connection(connection):
+        result = Book.reserve_books(['b1', 'b2', 'b1', 'b3', 'missing'], 's1')
+        print(f"Reservation result: {result}")
+        assert result == {'reserved': ['b1'], 'queued': ['b2'], 'unavailable': ['b3', 'missing'],
+                          'already_reserved': [], 'limit_exceeded': False}
+        assert books['b1'] == 'Reserved' and books['b2'] == 'Borrowed'
+        assert connection.reservations == {'b1': 'Active', 'b2': 'Queued'}
+        assert connection.counters == {'Available': -1, 'Reserved': 1}
+        
+        assert Book.reserve_books(['b1', 'b2'], 's1')['already_reserved'] == ['b1', 'b2']
+        assert Book.reserve_books(['b1'], 'nobody') is None
+    
+    print("Batched reservation test completed!")
+
+
+def test_reservation_limit():
+    print("\nTesting Reservation Limit...")
+    
+    # Two held already; one good id and one bad id fit the limit of three.
+    books = {'b1': 'Reserved', 'b2': 'Reserved', 'b3': 'Available', 'b4': 'Available'}
+    connection = FakeReservingConnection(books, reservations=['b1', 'b2'])
+    with use_connection(connection):
+        result = Book.reserve_books(['b3', 'missing'], 's1')
+        print(f"Reservation result: {result}")
+        assert result['reserved'] == ['b3'] and result['unavailable'] == ['missing']
+        assert not result['limit_exceeded']
+        
+        # A fourth reservable copy is over the limit and nothing is reserved.
+        result = Book.reserve_books(['b4'], 's1')
+        assert result['limit_exceeded'] and result['reserved'] == []
+        assert books['b4'] == 'Available'
+    
+    print("Reservation limit test completed!")
+
+
+if __name__ == "__main__":
+    test_batched_reservations()
+    test_reservation_limit()
@@ -3,6 +3,8 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.models.issued_book import IssuedBook
+from app.utils.batch_loader import BatchLoader
+from fake_db import FakeConnection, use_connection
 
 
 def test_borrowing_limit():
@@ -31,5 +33,59 @@ def test_borrowing_limit():
         print(f"Error in borrowing limit test: {e}")
 
 
+class FakeLoanCountsConnection(FakeConnection):
+    # Answers the grouped loan count query from a dict of loans per student.
+    HANDLERS = ((r"^SELECT UserID, COUNT\(\*\) as count FROM issued_books WHERE UserID IN \(", 'loan_counts'),)
+    
+    def __init__(self, loans):
+        super().__init__()
+        self.loans = loans
+    
+    def loan_counts(self, params):
+        self.rows = [{'UserID': user_id, 'count': self.loans[user_id]} for user_id in params if user_id in self.loans]
+
+
+def test_batched_borrowed_counts():
+    print("\nTesting Batched Borrowed Counts...")
+    
+    students = IssuedBook.get_students()
+    user_ids = [student['UserID'] for student in students]
+    batched_counts = IssuedBook.get_borrowed_counts(user_ids)
+    print(f"Students checked: {len(user_ids)}")
+    
+    for user_id in user_ids:
+        assert batched_counts[user_id] == IssuedBook.get_student_borrowed_count(user_id), user_id
+    
+    print("Batched borrowed counts test completed!")
+
+
+def test_batch_loader_values():
+    print("\nTesting Batch Loader...")
+    
+    connection = FakeLoanCountsConnection({'s1': 2, 's3': 1, 's5': 3})
+    query = """
+    SELECT UserID, COUNT(*) as count FROM issued_books
+    WHERE UserID IN ({keys})
+    GROUP BY UserID
+    """
+    with use_connection(connection):
+        counts = BatchLoader.load_values(query, ['s1', 's2', 's3', None, 's1', 's4', 's5'], 'UserID', 'count',
+                                         default=0, chunk_size=2)
+    
+    print(f"Counts: {counts}")
+    # Students without loans get the default; None and repeats are dropped
+    # before chunking, so five keys take three queries of at most two.
+    assert counts == {'s1': 2, 's2': 0, 's3': 1, 's4': 0, 's5': 3}
+    assert [params for _, params in connection.statements] == [('s1', 's2'), ('s3', 's4'), ('s5',)]
+    
+    with use_connection(connection):
+        assert BatchLoader.load_values(query, [], 'UserID', 'count', default=0) == {}
+    assert len(connection.statements) == 3
+    
+    print("Batch loader test completed!")
+
+
 if __name__ == "__main__":
     test_borrowing_limit()
+    test_batched_borrowed_counts()
+    test_batch_loader_values()
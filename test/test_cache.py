@@ -0,0 +1,140 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+from app.models.book import Book
+from app.utils.cache import Cache, LRUCache
+from fake_db import FakeConnection, use_connection
+
+
+class FakeSubjectsConnection(FakeConnection):
+    HANDLERS = (
+        (r"^SELECT DISTINCT subject FROM books ORDER BY subject$", 'subjects'),
+    )
+    
+    def subjects(self, params):
+        self.rows = [{'subject': 'Computer Science'}, {'subject': 'Physics'}]
+
+
+def test_lru_cache():
+    print("Testing LRU Cache...")
+    
+    cache = LRUCache(max_entries=2, default_ttl=0.05)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    print(f"Entries after eviction: {cache.size()}")
+    assert cache.get('a') == (True, 1)
+    assert cache.get('b') == (False, None)
+    
+    time.sleep(0.06)
+    assert cache.get('a') == (False, None)
+    
+    print("LRU cache test completed!")
+
+
+def test_cached_reads_and_invalidation():
+    print("\nTesting Cached Reads and Invalidation...")
+    
+    Cache.set_backend(LRUCache(max_entries=16, default_ttl=60))
+    Cache.reset_stats()
+    calls = []
+    
+    @Cache.cached('test')
+    def load(value):
+        calls.append(value)
+        return [value]
+    
+    load(1)
+    load(1)
+    Cache.invalidate('test')
+    load(1)
+    
+    stats = Cache.stats()
+    print(f"Cache stats: {stats}")
+    assert calls == [1, 1]
+    assert stats['namespaces']['test'] == {'hits': 1, 'misses': 2, 'hit_ratio': 0.3333}
+    
+    Cache.set_backend(None)
+    print("Cached reads test completed!")
+
+
+def test_scoped_invalidation():
+    print("\nTesting Scoped Cache Invalidation...")
+    
+    Cache.set_backend(LRUCache(max_entries=16, default_ttl=60))
+    Cache.reset_stats()
+    calls = []
+    
+    @Cache.cached('loans', scope=lambda user_id: user_id)
+    def load(user_id):
+        calls.append(user_id)
+        return [user_id]
+    
+    load('u1')
+    load('u2')
+    Cache.invalidate('loans:u1')
+    load('u1')
+    load('u2')
+    
+    stats = Cache.stats()
+    print(f"Cache stats: {stats['namespaces']}")
+    assert calls == ['u1', 'u2', 'u1']
+    assert stats['namespaces']['loans'] == {'hits': 1, 'misses': 3, 'hit_ratio': 0.25}
+    
+    Cache.set_backend(None)
+    print("Scoped cache invalidation test completed!")
+
+
+def test_failures_not_cached():
+    print("\nTesting Uncached Failures...")
+    
+    Cache.set_backend(LRUCache(max_entries=16, default_ttl=60))
+    results = [None, ['Computer Science']]
+    
+    @Cache.cached('test', fallback=[])
+    def load():
+        return results.pop(0)
+    
+    # A failed read is served as the fallback and retried on the next call.
+    assert load() == []
+    assert load() == ['Computer Science']
+    assert load() == ['Computer Science']
+    
+    Cache.set_backend(None)
+    print("Uncached failures test completed!")
+
+
+def test_catalogue_cache():
+    print("\nTesting Catalogue Cache...")
+    
+    Cache.set_backend(LRUCache(max_entries=16, default_ttl=60))
+    Cache.reset_stats()
+    connection = FakeSubjectsConnection()
+    try:
+        with use_connection(connection):
+            assert Book.get_all_subjects() == ['Computer Science', 'Physics']
+            assert Book.get_all_subjects() == ['Computer Science', 'Physics']
+            stats = Cache.stats()['namespaces']['catalogue']
+            print(f"Catalogue cache stats: {stats}")
+            # The second call is served from the cache without a query.
+            assert stats == {'hits': 1, 'misses': 1, 'hit_ratio': 0.5}
+            assert len(connection.statements) == 1
+            
+            Cache.invalidate('catalogue')
+            Book.get_all_subjects()
+            assert len(connection.statements) == 2
+    finally:
+        Cache.set_backend(None)
+    
+    print("Catalogue cache test completed!")
+
+
+if __name__ == "__main__":
+    test_lru_cache()
+    test_cached_reads_and_invalidation()
+    test_scoped_invalidation()
+    test_failures_not_cached()
+    test_catalogue_cache()
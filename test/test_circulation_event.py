@@ -0,0 +1,104 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime, timedelta
+from mysql.connector import DatabaseError
+from app.models.book import Book
+from app.models.circulation_event import CirculationEvent
+from config import Config
+from fake_db import FakeConnection, use_connection
+
+
+class FakeEditConnection(FakeConnection):
+    # One book row; writing the event fails when failing is set.
+    HANDLERS = (
+        (r"^UPDATE books SET title = %s", 'update_book'),
+        (r"^INSERT INTO circulation_events", 'record_event'),
+    )
+    
+    def __init__(self, failing=False):
+        super().__init__()
+        self.failing = failing
+    
+    def update_book(self, params):
+        self.rowcount = 1 if params[-1] == 'b1' else 0
+    
+    def record_event(self, params):
+        if self.failing:
+            raise DatabaseError(msg="Lock wait timeout exceeded", errno=1205)
+
+
+def test_time_ago():
+    print("Testing Activity Times...")
+    
+    now = datetime(2025, 9, 17, 12, 0, 0)
+    assert CirculationEvent.time_ago(now - timedelta(seconds=20), now) == 'just now'
+    assert CirculationEvent.time_ago(now - timedelta(minutes=1), now) == '1 minute ago'
+    assert CirculationEvent.time_ago(now - timedelta(hours=5, minutes=59), now) == '5 hours ago'
+    assert CirculationEvent.time_ago(now - timedelta(days=2), now) == '2 days ago'
+    
+    print("Activity times test completed!")
+
+
+def test_recent_feed():
+    print("\nTesting Recent Activity Feed...")
+    
+    log = [{'event_id': number, 'summary': f"Event {number}", 'created_at': datetime.now()} for number in range(1, 201)]
+    reads = []
+    
+    def tail(limit=50, before_id=None):
+        reads.append(limit)
+        return list(reversed(log))[:limit]
+    
+    original_tail, original_refresh = CirculationEvent.tail, Config.ACTIVITY_FEED_REFRESH_SECONDS
+    CirculationEvent.tail = staticmethod(tail)
+    Config.ACTIVITY_FEED_REFRESH_SECONDS = 60
+    CirculationEvent._refreshed_at = None
+    try:
+        feed = CirculationEvent.get_recent(3)
+        print(f"Feed: {[event['summary'] for event in feed]}")
+        assert [event['event_id'] for event in feed] == [200, 199, 198]
+        # Only the buffer size is read, however long the log is.
+        assert reads == [Config.ACTIVITY_FEED_SIZE]
+        
+        CirculationEvent.get_recent(3)
+        assert len(reads) == 1
+        
+        log.append({'event_id': 201, 'summary': 'Event 201', 'created_at': datetime.now()})
+        CirculationEvent.mark_stale()
+        assert CirculationEvent.get_recent(1)[0]['event_id'] == 201
+        assert len(reads) == 2
+        assert CirculationEvent.get_feed(1)[0] == {'activity': 'Event 201', 'time_ago': 'just now'}
+    finally:
+        CirculationEvent.tail = staticmethod(original_tail)
+        Config.ACTIVITY_FEED_REFRESH_SECONDS = original_refresh
+        CirculationEvent._refreshed_at = None
+        CirculationEvent._recent.clear()
+    
+    print("Recent activity feed test completed!")
+
+
+def test_update_book_transaction():
+    print("\nTesting Book Update Transaction...")
+    
+    connection = FakeEditConnection()
+    with use_connection(connection):
+        assert Book.update_book('b1', 'Algorithms', 'Cormen', 'CSE', '9780262033848') is True
+        assert Book.update_book('missing', 'Algorithms', 'Cormen', 'CSE', '9780262033848') is False
+    assert (connection.commits, connection.rollbacks) == (2, 0)
+    
+    # The edit and its event commit together or not at all.
+    connection = FakeEditConnection(failing=True)
+    with use_connection(connection):
+        assert Book.update_book('b1', 'Algorithms', 'Cormen', 'CSE', '9780262033848') is False
+    print(f"Commits: {connection.commits}, rollbacks: {connection.rollbacks}")
+    assert connection.commits == 0 and connection.rollbacks > 0
+    
+    print("Book update transaction test completed!")
+
+
+if __name__ == "__main__":
+    test_time_ago()
+    test_recent_feed()
+    test_update_book_transaction()
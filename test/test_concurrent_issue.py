@@ -0,0 +1,88 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+from datetime import datetime
+from mysql.connector.errors import DatabaseError
+from app.models.issued_book import IssuedBook
+from app.utils.database import Database
+from fake_db import FakeConnection, use_connection
+
+
+class DeadlockingConnection(FakeConnection):
+    # Fails the first failures statements with a deadlock, as InnoDB would.
+    HANDLERS = ((r"^UPDATE books ", None),)
+    
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+    
+    def execute(self, query, params=None):
+        if self.failures:
+            self.failures -= 1
+            raise DatabaseError(msg="Deadlock found when trying to get lock", errno=1213)
+        super().execute(query, params)
+
+
+def test_transaction_retry():
+    print("Testing Transaction Retry on Deadlock...")
+    
+    connection = DeadlockingConnection(failures=2)
+    with use_connection(connection):
+        def work(cursor):
+            cursor.execute("UPDATE books SET status = 'Borrowed'")
+            return 'done'
+        
+        assert Database.run_in_transaction(work, retries=3) == 'done'
+        assert connection.rollbacks == 2 and connection.commits == 1
+        
+        connection.failures = 5
+        assert Database.run_in_transaction(work, default=False, retries=1) is False
+    
+    print("Transaction retry test completed!")
+
+
+def test_concurrent_issue_of_one_copy():
+    print("\nTesting Concurrent Issue of One Copy...")
+    
+    try:
+        books = IssuedBook.get_available_books()
+        students = IssuedBook.get_students()
+        if not books or len(students) < 2:
+            print("Not enough data for the stress test, skipping")
+            return
+        
+        book_id = books[0]['book_id']
+        contenders = students[:8]
+        results = []
+        barrier = threading.Barrier(len(contenders))
+        
+        def issue(student):
+            barrier.wait()
+            results.append((student['UserID'], IssuedBook.issue_book(student['UserID'], book_id)))
+        
+        threads = [threading.Thread(target=issue, args=(student,)) for student in contenders]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        winners = [user_id for user_id, result in results if result == True]
+        print(f"{len(contenders)} librarians issued book {book_id}: {len(winners)} succeeded")
+        assert len(winners) <= 1
+        
+        for user_id in winners:
+            IssuedBook.return_book(user_id, book_id, datetime.now().strftime('%Y-%m-%d'))
+        
+        print("Concurrent issue test completed!")
+        
+    except AssertionError:
+        raise
+    except Exception as e:
+        print(f"Error in concurrent issue test: {e}")
+
+
+if __name__ == "__main__":
+    test_transaction_retry()
+    test_concurrent_issue_of_one_copy()
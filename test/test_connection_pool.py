@@ -0,0 +1,114 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+from app.utils.connection_pool import ConnectionPool, PoolTimeoutError
+from app.utils.database import Database
+
+
+class LocalConnection:
+    opened = 0
+    
+    def __init__(self, **kwargs):
+        LocalConnection.opened += 1
+        self.connected = True
+        self.unread_result = False
+        self.in_transaction = False
+    
+    def is_connected(self):
+        return self.connected
+    
+    def close(self):
+        self.connected = False
+
+
+def test_pool_limits():
+    print("Testing Connection Pool Limits...")
+    
+    pool = ConnectionPool({}, pool_size=2, max_overflow=1, timeout=0.2, connector=LocalConnection)
+    connections = [pool.acquire() for _ in range(3)]
+    print(f"Pool status with 3 checked out: {pool.status()}")
+    assert pool.status()['checked_out'] == 3
+    
+    try:
+        pool.acquire()
+        timed_out = False
+    except PoolTimeoutError as e:
+        print(f"Checkout timed out as expected: {e}")
+        timed_out = True
+    assert timed_out
+    
+    for connection in connections:
+        connection.close()
+    print(f"Pool status after release: {pool.status()}")
+    assert pool.status()['idle'] == 2
+    
+    print("Connection pool limits test completed!")
+
+
+def test_pool_reuse_and_health_check():
+    print("\nTesting Connection Reuse and Health Check...")
+    
+    LocalConnection.opened = 0
+    pool = ConnectionPool({}, pool_size=1, max_overflow=0, connector=LocalConnection)
+    
+    first = pool.acquire()
+    first.close()
+    second = pool.acquire()
+    print(f"Connections opened after reuse: {LocalConnection.opened}")
+    assert LocalConnection.opened == 1
+    
+    second._connection.connected = False
+    second.close()
+    third = pool.acquire()
+    print(f"Connections opened after a dead idle connection: {LocalConnection.opened}")
+    assert LocalConnection.opened == 2
+    third.close()
+    
+    print("Connection reuse test completed!")
+
+
+def test_pool_threads():
+    print("\nTesting Connection Pool Under Threads...")
+    
+    pool = ConnectionPool({}, pool_size=4, max_overflow=2, connector=LocalConnection)
+    peak = []
+    
+    def worker():
+        for _ in range(50):
+            connection = pool.acquire()
+            peak.append(pool.status()['checked_out'])
+            connection.close()
+    
+    threads = [threading.Thread(target=worker) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    print(f"Peak checked out connections: {max(peak)}")
+    assert max(peak) <= pool.max_connections
+    assert pool.status()['checked_out'] == 0
+    
+    print("Connection pool thread test completed!")
+
+
+def test_database_pool():
+    print("\nTesting Database Connection Pool...")
+    
+    try:
+        result = Database.execute_single_query("SELECT 1 as ok")
+        print(f"Query through pool returned: {result}")
+        print(f"Pool status: {Database.get_pool().status()}")
+        print("Database pool test completed!")
+    
+    except Exception as e:
+        print(f"Error in database pool test: {e}")
+
+
+if __name__ == "__main__":
+    test_pool_limits()
+    test_pool_reuse_and_health_check()
+    test_pool_threads()
+    test_database_pool()
@@ -0,0 +1,99 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime
+from decimal import Decimal
+from app.models.fine_ledger import FineLedger
+from fake_db import FakeConnection, use_connection
+
+
+class FakeLedgerConnection(FakeConnection):
+    # Keeps fine_balances and the ledger in memory so a payment can be
+    # followed through FineLedger.
+    HANDLERS = (
+        (r"^SELECT balance FROM fine_balances WHERE user_id = %s FOR UPDATE$", 'select_balance'),
+        (r"^INSERT INTO fine_ledger ", 'append_entry'),
+        (r"^UPDATE fine_balances SET paid = paid \+ %s, balance = balance - %s WHERE user_id = %s$", 'apply_payment'),
+        (r"^INSERT INTO fine_daily_totals ", 'add_collected'),
+    )
+    
+    def __init__(self, balances):
+        super().__init__()
+        self.balances = balances
+        self.ledger = []
+        self.collected = Decimal('0')
+    
+    def select_balance(self, params):
+        balance = self.balances.get(params[0])
+        self.rows = [(balance,)] if balance is not None else []
+    
+    def append_entry(self, params):
+        self.ledger.append(params)
+    
+    def apply_payment(self, params):
+        amount, _, user_id = params
+        self.balances[user_id] -= amount
+    
+    def add_collected(self, params):
+        self.collected += params[0]
+
+
+def test_parse_amount():
+    print("Testing Payment Amount Parsing...")
+    
+    assert FineLedger.parse_amount('25') == Decimal('25.00')
+    assert FineLedger.parse_amount(' 12.346 ') == Decimal('12.35')
+    for value in ('', 'abc', '0', '-5', 'NaN', 'Infinity'):
+        assert FineLedger.parse_amount(value) is None, value
+    assert FineLedger.to_cents(Decimal('30.50')) == 3050
+    
+    print("Payment amount parsing test completed!")
+
+
+def test_record_payment():
+    print("\nTesting Fine Payments...")
+    
+    connection = FakeLedgerConnection({'s1': Decimal('50.00'), 's2': Decimal('0.00')})
+    with use_connection(connection):
+        assert FineLedger.record_payment('s1', 'ten') == "invalid_amount"
+        assert FineLedger.record_payment('s1', '60') == "exceeds_balance"
+        assert FineLedger.record_payment('s2', '10') == "no_balance"
+        assert FineLedger.record_payment('nobody', '10') == "no_balance"
+        assert connection.ledger == []
+        
+        result = FineLedger.record_payment('s1', '20', recorded_by='lib1')
+        print(f"Payment result: {result}")
+        assert result == {'success': True, 'paid': 20.0, 'balance': 30.0}
+        assert FineLedger.record_payment('s1', '30')['balance'] == 0.0
+    
+    assert connection.balances['s1'] == 0
+    assert len(connection.ledger) == 2
+    assert connection.counters == {FineLedger.OUTSTANDING_COUNTER: -5000}
+    assert connection.collected == Decimal('50.00')
+    
+    print("Fine payments test completed!")
+
+
+def test_settle():
+    print("\nTesting Charge Settlement...")
+    
+    entries = [
+        {'entry_id': 4, 'entry_type': 'Payment', 'amount': Decimal('25.00'), 'created_at': datetime(2025, 9, 4)},
+        {'entry_id': 3, 'entry_type': 'Charge', 'amount': Decimal('20.00'), 'created_at': datetime(2025, 9, 3)},
+        {'entry_id': 2, 'entry_type': 'Charge', 'amount': Decimal('10.00'), 'created_at': datetime(2025, 9, 2)},
+        {'entry_id': 1, 'entry_type': 'Charge', 'amount': Decimal('30.00'), 'created_at': datetime(2025, 9, 1)}
+    ]
+    
+    # 60 charged, 25 paid: the oldest charge is part paid, the rest are pending.
+    assert FineLedger.settle(entries, 35) == {3: 'Pending', 2: 'Pending', 1: 'Part paid'}
+    assert FineLedger.settle(entries, 20) == {3: 'Pending', 2: 'Paid', 1: 'Paid'}
+    assert FineLedger.settle(entries, 0) == {3: 'Paid', 2: 'Paid', 1: 'Paid'}
+    
+    print("Charge settlement test completed!")
+
+
+if __name__ == "__main__":
+    test_parse_amount()
+    test_record_payment()
+    test_settle()
@@ -18,12 +18,12 @@ def test_fines_management():
         print(f"Users with fines: {len(users_with_fines)}")
         
         if users_with_fines:
-            print("Sample fine record:")
+            print("Sample fine balance:")
             sample = users_with_fines[0]
             print(f"  Student: {sample.get('student_name')}")
-            print(f"  Book: {sample.get('book_title')}")
-            print(f"  Fine Amount: {sample.get('Fine')}")
-            print(f"  Return Date: {sample.get('ReturnDate')}")
+            print(f"  Charged: {sample.get('charged')}")
+            print(f"  Paid: {sample.get('paid')}")
+            print(f"  Outstanding: {sample.get('balance')}")
         
         print("Fines management test completed!")
         
@@ -0,0 +1,55 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+from app.utils.metrics import Metrics, ShardedCounters
+
+
+def test_sharded_counters():
+    print("Testing Sharded Metric Counters...")
+    
+    counters = ShardedCounters()
+    
+    def work():
+        for _ in range(1000):
+            counters.inc(('requests',))
+        counters.observe(('latency',), 0.02)
+    
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    totals = counters.snapshot()
+    print(f"Requests counted across threads: {totals[('requests',)]}")
+    assert totals[('requests',)] == 8000
+    assert totals[('latency', ('le', 0.025))] == 8
+    assert totals[('latency', ('le', '+Inf'))] == 8
+    assert counters.snapshot()[('requests',)] == 8000
+    
+    print("Sharded counters test completed!")
+
+
+def test_metrics_exposition():
+    print("\nTesting Metrics Exposition...")
+    
+    Metrics.counters.reset()
+    Metrics.observe_request('librarian_book_issue', 'POST', 302, 0.03)
+    Metrics.observe_request('librarian_book_issue', 'POST', 302, 0.2)
+    
+    output = Metrics.render()
+    assert 'lms_http_requests_total{endpoint="librarian_book_issue",method="POST",status="302"} 2' in output
+    assert 'lms_http_request_duration_seconds_bucket{endpoint="librarian_book_issue",le="0.05"} 1' in output
+    assert 'lms_http_request_duration_seconds_bucket{endpoint="librarian_book_issue",le="0.25"} 2' in output
+    assert 'lms_http_request_duration_seconds_count{endpoint="librarian_book_issue"} 2' in output
+    assert 'lms_db_pool_max_connections' in output
+    print(f"Exposition is {len(output.splitlines())} lines")
+    
+    print("Metrics exposition test completed!")
+
+
+if __name__ == "__main__":
+    test_sharded_counters()
+    test_metrics_exposition()
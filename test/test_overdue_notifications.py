@@ -0,0 +1,191 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import tempfile
+import threading
+from datetime import date, timedelta
+from app.models.notification import Notification
+from app.models.overdue_tracker import OverdueTracker
+from app.utils.notifications import FileSender, NotificationDispatcher
+from app.utils.scheduler import Scheduler
+from fake_db import FakeConnection, use_connection
+
+
+class FakeLoansConnection(FakeConnection):
+    # Drives OverdueTracker.sweep against a list of loans.
+    HANDLERS = (
+        (r"^SELECT issueID, due_date FROM issued_books WHERE status = 'Issued' AND due_date < %s", 'due_loans'),
+        (r"^UPDATE issued_books SET status = 'Overdue' WHERE status = 'Issued' AND issueID IN", 'mark_overdue'),
+    )
+    
+    def __init__(self, loans):
+        super().__init__()
+        self.loans = loans
+    
+    def due_loans(self, params):
+        today, limit = params
+        due = sorted((loan for loan in self.loans if loan['status'] == 'Issued' and loan['due_date'] < today),
+                     key=lambda loan: loan['due_date'])
+        self.rows = [(loan['issueID'], loan['due_date']) for loan in due[:limit]]
+    
+    def mark_overdue(self, params):
+        for loan in self.loans:
+            if loan['issueID'] in params and loan['status'] == 'Issued':
+                loan['status'] = 'Overdue'
+                self.rowcount += 1
+
+
+class FakeScanConnection(FakeConnection):
+    # Notification.scan against a list of loans; only the overdue INSERT is
+    # evaluated, the other kinds queue nothing.
+    HANDLERS = (
+        (r"^INSERT IGNORE INTO notifications .* WHERE ib.status = 'Overdue' AND ib.due_date >= %s AND ib.due_date < %s$", 'queue_overdue'),
+        (r"^INSERT IGNORE INTO notifications", None),
+    )
+    
+    def __init__(self, loans):
+        super().__init__()
+        self.loans = loans
+        self.queued = set()
+    
+    def queue_overdue(self, params):
+        start, end = params
+        for loan in self.loans:
+            if loan['status'] == 'Overdue' and start <= loan['due_date'] < end and loan['issueID'] not in self.queued:
+                self.queued.add(loan['issueID'])
+                self.rowcount += 1
+
+
+def test_overdue_sweep():
+    print("Testing Overdue Sweep...")
+    
+    today = date(2025, 9, 10)
+    loans = [{'issueID': number, 'status': 'Issued', 'due_date': today - timedelta(days=number - 2)}
+             for number in range(1, 8)]
+    connection = FakeLoansConnection(loans)
+    with use_connection(connection):
+        marked = OverdueTracker.sweep(today=today, batch_size=2)
+        print(f"Marked overdue: {marked}")
+        assert marked == 5
+        assert [loan['issueID'] for loan in loans if loan['status'] == 'Overdue'] == [3, 4, 5, 6, 7]
+        
+        # A second run on the same day finds nothing new to do.
+        assert OverdueTracker.sweep(today=today, batch_size=2) == 0
+    
+    # Due 1 to 5 days ago: 15 days late in total.
+    summary = OverdueTracker.get_summary(today=today, counts=connection.counters)
+    print(f"Summary: {summary}")
+    assert summary == {'overdue_loans': 5, 'accrued_fines': 150.0}
+    assert OverdueTracker.get_summary(today=today + timedelta(days=1), counts=connection.counters)['accrued_fines'] == 200.0
+    assert OverdueTracker.get_summary(counts={}) is None
+    
+    print("Overdue sweep test completed!")
+
+
+def test_notification_render():
+    print("\nTesting Notification Rendering...")
+    
+    subject, message = Notification.render('overdue', json.dumps({'title': 'Data Structures', 'due_date': '2025-09-01'}))
+    print(f"{subject}: {message}")
+    assert subject == 'Library book overdue'
+    assert message == 'Book "Data Structures" was due on 2025-09-01. A fine of 10 Taka per day is accruing.'
+    assert Notification.render('reservation_ready', {'title': 'Algorithms'})[1] == 'Your reservation for "Algorithms" is ready to collect.'
+    
+    print("Notification rendering test completed!")
+
+
+def test_notification_scan_window():
+    print("\nTesting Notification Scan Window...")
+    
+    today = date(2025, 9, 10)
+    loans = [{'issueID': number, 'status': 'Overdue', 'due_date': today - timedelta(days=number)}
+             for number in (1, 3, 30)]
+    connection = FakeScanConnection(loans)
+    with use_connection(connection):
+        queued = Notification.scan(today=today, overdue_within_days=7)
+        print(f"Queued: {queued}")
+        # The loan that fell due a month ago is outside the window.
+        assert queued['overdue'] == 2
+        assert connection.queued == {1, 3}
+        assert Notification.scan(today=today, overdue_within_days=7)['overdue'] == 0
+    
+    print("Notification scan window test completed!")
+
+
+def test_notification_dispatch():
+    print("\nTesting Notification Dispatch...")
+    
+    queue = [{'notification_id': number, 'user_id': 'u1', 'kind': 'due_soon', 'attempts': 0,
+              'recipient': 'bounce@lms.test' if number == 3 else f"student{number}@lms.test",
+              'payload': json.dumps({'title': f"Book {number}", 'due_date': '2025-09-12'})}
+             for number in range(1, 6)]
+    outcome = {'sent': [], 'failed': []}
+    
+    def claim_batch(limit):
+        batch = queue[:limit]
+        del queue[:limit]
+        return batch
+    
+    def mark_failed(failures, max_attempts, retry_base_seconds):
+        outcome['failed'].extend((notification['notification_id'], str(error)) for notification, error in failures)
+    
+    class BouncingSender(FileSender):
+        def send(self, recipient, subject, body):
+            if recipient.startswith('bounce'):
+                raise ConnectionError("mailbox unavailable")
+            super().send(recipient, subject, body)
+    
+    originals = (Notification.claim_batch, Notification.mark_sent, Notification.mark_failed, Notification.release_stale_claims)
+    Notification.claim_batch = staticmethod(claim_batch)
+    Notification.mark_sent = staticmethod(lambda ids: outcome['sent'].extend(ids))
+    Notification.mark_failed = staticmethod(mark_failed)
+    Notification.release_stale_claims = staticmethod(lambda lease_seconds: True)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'outbox.jsonl')
+            totals = NotificationDispatcher(BouncingSender(path), workers=3, batch_size=2).run()
+            with open(path, encoding='utf-8') as delivered:
+                lines = [json.loads(line) for line in delivered]
+    finally:
+        (Notification.claim_batch, Notification.mark_sent,
+         Notification.mark_failed, Notification.release_stale_claims) = [staticmethod(func) for func in originals]
+    
+    print(f"Totals: {totals}, failed: {outcome['failed']}")
+    assert totals == {'sent': 4, 'failed': 1}
+    assert sorted(outcome['sent']) == [1, 2, 4, 5]
+    assert outcome['failed'] == [(3, 'mailbox unavailable')]
+    assert len(lines) == 4 and lines[0]['subject'] == 'Library book due soon'
+    
+    print("Notification dispatch test completed!")
+
+
+def test_scheduler():
+    print("\nTesting Scheduler...")
+    
+    runs = []
+    done = threading.Event()
+    
+    def job():
+        runs.append(1)
+        if len(runs) == 3:
+            done.set()
+    
+    Scheduler.every('test-job', 0.01, job)
+    Scheduler.start()
+    try:
+        assert done.wait(2)
+    finally:
+        Scheduler.stop(timeout=1)
+    print(f"Job ran {len(runs)} times")
+    
+    print("Scheduler test completed!")
+
+
+if __name__ == "__main__":
+    test_overdue_sweep()
+    test_notification_render()
+    test_notification_scan_window()
+    test_notification_dispatch()
+    test_scheduler()
@@ -0,0 +1,112 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import base64
+import json
+import re
+from datetime import date
+from app.models.book import Book
+from app.models.issued_book import IssuedBook
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_condition
+from fake_db import FakeConnection, use_connection
+
+
+def test_cursor_tokens():
+    print("Testing Pagination Cursor Tokens...")
+    
+    token = encode_cursor('issue_date', [date(2025, 8, 1), 42])
+    print(f"Encoded cursor: {token}")
+    assert decode_cursor(token, 'issue_date') == [date(2025, 8, 1), 42]
+    assert decode_cursor(token, 'title') is None
+    assert decode_cursor('not-a-cursor', 'issue_date') is None
+    tampered = base64.urlsafe_b64encode(json.dumps({'s': 'issue_date', 'k': [{'d': '2025-13-45'}, 42]}).encode()).decode()
+    assert decode_cursor(tampered, 'issue_date') is None
+    tampered = base64.urlsafe_b64encode(json.dumps({'s': 'issue_date', 'k': [{'dt': 7}, 42]}).encode()).decode()
+    assert decode_cursor(tampered, 'issue_date') is None
+    
+    condition, params = keyset_condition(['title', 'book_id'], ['Physics', 'book-005'])
+    print(f"Keyset condition: {condition} {params}")
+    assert condition == "((title > %s) OR (title = %s AND book_id > %s))"
+    assert params == ['Physics', 'Physics', 'book-005']
+    
+    print("Pagination cursor test completed!")
+
+
+class FakeKeysetConnection(FakeConnection):
+    # Evaluates the keyset page queries over rows in a list: the ORDER BY
+    # columns give the sort, the last of the keyset parameters the cursor.
+    HANDLERS = (
+        (r"^SELECT .* FROM (books|issued_books ib) .*ORDER BY .* LIMIT %s$", 'page'),
+    )
+    
+    def __init__(self, rows):
+        super().__init__()
+        self.table = rows
+    
+    def page(self, params):
+        query = self.statements[-1][0]
+        order = re.search(r"ORDER BY (.*) LIMIT %s$", query).group(1).split(', ')
+        columns = [part.split()[0].replace('ib.', '') for part in order]
+        descending = order[0].endswith('DESC')
+        params = list(params)
+        limit = params.pop()
+        rows = self.table
+        if ' OR ' in query:
+            cursor = tuple(params[-len(columns):])
+            rows = [row for row in rows
+                    if (tuple(row[column] for column in columns) < cursor) == descending
+                    and tuple(row[column] for column in columns) != cursor]
+        rows = sorted(rows, key=lambda row: [row[column] for column in columns], reverse=descending)
+        self.rows = [dict(row) for row in rows[:limit]]
+
+
+def test_book_pages():
+    print("\nTesting Book Keyset Pagination...")
+    
+    books = [{'book_id': f"b{number}", 'title': title, 'author': 'A', 'subject': 'CSE', 'isbn': '', 'status': 'Available'}
+             for number, title in enumerate(['Databases', 'Algorithms', 'Compilers', 'Algorithms', 'Networks', 'Graphics', 'Ethics'])]
+    with use_connection(FakeKeysetConnection(books)):
+        first_page = Book.get_books_page(sort_by='title', page_size=3)
+        second_page = Book.get_books_page(sort_by='title', cursor=first_page['next_cursor'], page_size=3)
+        back_page = Book.get_books_page(sort_by='title', cursor=second_page['prev_cursor'], direction='prev', page_size=3)
+    
+    ids = lambda page: [book['book_id'] for book in page['books']]
+    print(f"Pages: {ids(first_page)} {ids(second_page)} back {ids(back_page)}")
+    # Equal titles are ordered by book_id, so neither copy of Algorithms is skipped.
+    assert ids(first_page) == ['b1', 'b3', 'b2']
+    assert ids(second_page) == ['b0', 'b6', 'b5']
+    assert first_page['prev_cursor'] is None and second_page['next_cursor'] is not None
+    assert ids(back_page) == ids(first_page)
+    assert back_page['prev_cursor'] is None
+    
+    print("Book pagination test completed!")
+
+
+def test_issued_book_pages():
+    print("\nTesting Issued Book Keyset Pagination...")
+    
+    loans = [{'issueID': number, 'issue_date': date(2025, 9, 1 + number // 2), 'due_date': None, 'book_id': 'b1',
+              'UserID': 's1', 'title': '', 'author': '', 'isbn': '', 'student_name': '', 'student_email': ''}
+             for number in range(1, 6)]
+    with use_connection(FakeKeysetConnection(loans)):
+        first_page = IssuedBook.get_issued_books_page(page_size=2)
+        second_page = IssuedBook.get_issued_books_page(cursor=first_page['next_cursor'], page_size=2)
+        last_page = IssuedBook.get_issued_books_page(cursor=second_page['next_cursor'], page_size=2)
+        back_page = IssuedBook.get_issued_books_page(cursor=second_page['prev_cursor'], direction='prev', page_size=2)
+    
+    ids = lambda page: [loan['issueID'] for loan in page['issued_books']]
+    print(f"Pages: {ids(first_page)} {ids(second_page)} {ids(last_page)} back {ids(back_page)}")
+    # Newest issue date first; loans issued the same day by issueID, descending.
+    assert ids(first_page) == [5, 4]
+    assert ids(second_page) == [3, 2]
+    assert ids(last_page) == [1] and last_page['next_cursor'] is None
+    assert ids(back_page) == [5, 4]
+    
+    print("Issued book pagination test completed!")
+
+
+if __name__ == "__main__":
+    test_cursor_tokens()
+    test_book_pages()
+    test_issued_book_pages()
@@ -0,0 +1,95 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from app.utils import password_hasher
+from app.utils.password_hasher import PasswordHasher
+
+
+def test_password_hashing():
+    print("Testing Password Hashing...")
+    
+    original_iterations = Config.PASSWORD_PBKDF2_ITERATIONS
+    Config.PASSWORD_PBKDF2_ITERATIONS = 1000
+    try:
+        encoded = PasswordHasher.hash('student123')
+        print(f"Encoded hash: {encoded[:40]}...")
+        assert encoded.startswith('pbkdf2_sha256$1000$')
+        assert encoded != PasswordHasher.hash('student123')
+        assert PasswordHasher.verify('student123', encoded)
+        assert not PasswordHasher.verify('student124', encoded)
+        assert not PasswordHasher.needs_rehash(encoded)
+        
+        scrypt_encoded = PasswordHasher.hash('student123', algorithm='scrypt')
+        assert PasswordHasher.verify('student123', scrypt_encoded)
+        assert PasswordHasher.needs_rehash(scrypt_encoded)
+        
+        Config.PASSWORD_PBKDF2_ITERATIONS = 2000
+        assert PasswordHasher.needs_rehash(encoded)
+    finally:
+        Config.PASSWORD_PBKDF2_ITERATIONS = original_iterations
+    
+    print("Password hashing test completed!")
+
+
+def test_legacy_hashes():
+    print("\nTesting Legacy SHA-256 Hashes...")
+    
+    legacy = hashlib.sha256('lib123'.encode()).hexdigest()
+    assert PasswordHasher.verify('lib123', legacy)
+    assert not PasswordHasher.verify('lib124', legacy)
+    assert PasswordHasher.needs_rehash(legacy)
+    assert PasswordHasher.check('lib123', legacy)
+    assert not PasswordHasher.check('lib123', 'not-a-hash')
+    
+    print("Legacy hash test completed!")
+
+
+def test_hashing_concurrency_cap():
+    print("\nTesting Password Hashing Concurrency Cap...")
+    
+    original_iterations = Config.PASSWORD_PBKDF2_ITERATIONS
+    Config.PASSWORD_PBKDF2_ITERATIONS = 1000
+    try:
+        encoded = PasswordHasher.hash('student123', algorithm='pbkdf2_sha256')
+    finally:
+        Config.PASSWORD_PBKDF2_ITERATIONS = original_iterations
+    running = {'now': 0, 'most': 0}
+    lock = threading.Lock()
+    # Pairs meet here, so two derivations provably overlap; a third would
+    # show up in running['most'].
+    pair = threading.Barrier(2, timeout=5)
+    
+    def pbkdf2_hmac(*args):
+        with lock:
+            running['now'] += 1
+            running['most'] = max(running['most'], running['now'])
+        pair.wait()
+        with lock:
+            running['now'] -= 1
+        return hashlib.pbkdf2_hmac(*args)
+    
+    original_hashlib, original_slots = password_hasher.hashlib, PasswordHasher._slots
+    password_hasher.hashlib = type('Hashlib', (), {'pbkdf2_hmac': staticmethod(pbkdf2_hmac), 'sha256': hashlib.sha256})
+    PasswordHasher._slots = threading.BoundedSemaphore(2)
+    try:
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            results = list(executor.map(lambda _: PasswordHasher.check('student123', encoded), range(6)))
+    finally:
+        password_hasher.hashlib, PasswordHasher._slots = original_hashlib, original_slots
+    
+    print(f"Most derivations at once: {running['most']}")
+    assert results == [True] * 6
+    assert running['most'] == 2
+    
+    print("Password hashing concurrency cap test completed!")
+
+
+if __name__ == "__main__":
+    test_password_hashing()
+    test_legacy_hashes()
+    test_hashing_concurrency_cap()
@@ -0,0 +1,64 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import contextvars
+import threading
+from app.utils.query_batch import QueryBatch
+
+
+request_id = contextvars.ContextVar('request_id', default=None)
+
+
+def query(name, barrier=None):
+    # With a barrier the call returns only once every other call in the
+    # batch is running too; run one after the other, it would time out.
+    if barrier:
+        barrier.wait()
+    return name, request_id.get(), threading.current_thread().name
+
+
+def test_query_batch():
+    print("Testing Query Batch...")
+    
+    request_id.set('req-7')
+    barrier = threading.Barrier(3, timeout=5)
+    batch = QueryBatch()
+    batch.add('books', query, 'books', barrier)
+    batch.add('students', query, 'students', barrier)
+    batch.add('issued', query, 'issued', barrier)
+    
+    results = batch.run()
+    print(f"Results: {results}")
+    assert {name: result[:2] for name, result in results.items()} == {
+        'books': ('books', 'req-7'), 'students': ('students', 'req-7'), 'issued': ('issued', 'req-7')
+    }
+    assert results['issued'][2] == threading.current_thread().name
+    assert results['books'][2].startswith('async-db')
+    assert QueryBatch().run() == {}
+    
+    print("Query batch test completed!")
+
+
+def test_query_batch_errors():
+    print("\nTesting Query Batch Errors...")
+    
+    def failing():
+        raise RuntimeError("boom")
+    
+    batch = QueryBatch()
+    batch.add('failing', failing)
+    batch.add('books', query, 'books')
+    try:
+        batch.run()
+        raise AssertionError("expected the error to propagate")
+    except RuntimeError as e:
+        print(f"Propagated: {e}")
+        assert str(e) == 'boom'
+    
+    print("Query batch errors test completed!")
+
+
+if __name__ == "__main__":
+    test_query_batch()
+    test_query_batch_errors()
@@ -0,0 +1,81 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.database import Database
+from app.utils.migrations import MigrationRunner, add_index
+from fake_db import FakeConnection
+
+
+HOT_QUERIES = [
+    ("books by status", "SELECT book_id FROM books WHERE status = 'Available'", 'idx_books_status'),
+    ("books by subject", "SELECT book_id FROM books WHERE subject = 'Computer Science' ORDER BY title", 'idx_books_subject_title'),
+    ("books ordered by title", "SELECT title FROM books ORDER BY title LIMIT 20", 'idx_books_title'),
+    ("active reservations per user", "SELECT COUNT(*) FROM book_reservations WHERE user_id = 'student-001' AND status = 'Active'", 'idx_reservations_user_status'),
+    ("loans per student", "SELECT COUNT(*) FROM issued_books WHERE UserID = 'student-001'", 'idx_issued_books_user'),
+    ("transactions with fines", "SELECT TransactionID FROM transaction WHERE Fine > 0", 'idx_transaction_fine'),
+    ("users by role", "SELECT COUNT(*) FROM users WHERE Role = 'Student'", 'idx_users_role'),
+]
+
+
+def test_hot_queries_use_indexes():
+    print("Testing Hot Query Index Usage...")
+    
+    if Database.execute_single_query("SELECT 1 as ok") is None:
+        print("Database not reachable, skipping EXPLAIN checks")
+        return
+    
+    assert MigrationRunner.run()
+    
+    for name, query, index in HOT_QUERIES:
+        plan = Database.execute_query("EXPLAIN " + query)
+        if not plan:
+            # The table or column is missing from this schema, so the
+            # migration skipped the index.
+            print(f"  {name}: not in this schema, skipping")
+            continue
+        row = plan[0]
+        print(f"  {name}: type={row.get('type')} key={row.get('key')} possible_keys={row.get('possible_keys')}")
+        assert row['key'] == index, f"{name} uses {row['key']} instead of {index}"
+        assert row['type'] != 'ALL', f"{name} scans the whole table"
+    
+    print("Hot query index test completed!")
+
+
+class FakeSchemaConnection(FakeConnection):
+    # information_schema for a schema with only the given table columns.
+    HANDLERS = (
+        (r"FROM information_schema.statistics", 'no_index'),
+        (r"FROM information_schema.columns", 'table_columns'),
+        (r"^CREATE INDEX", None),
+    )
+    
+    def __init__(self, columns):
+        super().__init__()
+        self.columns = columns
+    
+    def no_index(self, params):
+        self.rows = [(0,)]
+    
+    def table_columns(self, params):
+        self.rows = [(column,) for column in self.columns.get(params[0], [])]
+
+
+def test_add_index_skips_missing_columns():
+    print("\nTesting Index Migration Steps...")
+    
+    # issued_books as DatabaseInitializer creates it, and no transaction table.
+    connection = FakeSchemaConnection({'issued_books': ['issue_id', 'book_id', 'user_id', 'due_date']})
+    add_index('issued_books', 'idx_issued_books_user', ['UserID'])(connection)
+    add_index('transaction', 'idx_transaction_fine', ['Fine'])(connection)
+    assert not [query for query, _ in connection.statements if query.startswith('CREATE')]
+    
+    add_index('issued_books', 'idx_issued_books_due', ['due_date'])(connection)
+    assert connection.statements[-1][0] == "CREATE INDEX `idx_issued_books_due` ON `issued_books` (`due_date`)"
+    
+    print("Index migration steps test completed!")
+
+
+if __name__ == "__main__":
+    test_hot_queries_use_indexes()
+    test_add_index_skips_missing_columns()
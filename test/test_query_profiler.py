@@ -0,0 +1,43 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.database import ProfilingCursor, QueryProfiler
+
+
+class FakeCursor:
+    rowcount = 3
+    
+    def execute(self, operation, params=None):
+        pass
+
+
+def test_query_profiler():
+    print("Testing Query Profiler...")
+    
+    QueryProfiler.reset()
+    QueryProfiler.start_request()
+    cursor = ProfilingCursor(FakeCursor())
+    cursor.execute("SELECT * FROM books\n        WHERE book_id IN (%s, %s, %s)", ('a', 'b', 'c'))
+    cursor.execute("SELECT * FROM books WHERE book_id IN (%s)", ('a',))
+    
+    profile = QueryProfiler.current()
+    print(f"Queries in request: {profile['count']}, DB time: {profile['db_ms']:.3f} ms")
+    assert profile['count'] == 2
+    assert profile['queries'][0]['rows'] == 3
+    assert profile['queries'][0]['site'].startswith(os.path.join('test', 'test_query_profiler.py'))
+    
+    summary = QueryProfiler.finish_request('book_status', '/librarian/book-status', 200)
+    assert summary['queries'] == 2
+    assert QueryProfiler.current() is None
+    assert QueryProfiler.recent_requests()[0]['path'] == '/librarian/book-status'
+    
+    statements = QueryProfiler.top_statements()
+    print(f"Distinct statements: {len(statements)}")
+    assert [stats['sql'] for stats in statements].count("SELECT * FROM books WHERE book_id IN (%s, ...)") == 1
+    
+    print("Query profiler test completed!")
+
+
+if __name__ == "__main__":
+    test_query_profiler()
@@ -0,0 +1,131 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime, timedelta
+from app.models.reservation_queue import ReservationQueue
+from fake_db import FakeConnection, use_connection
+
+
+class FakeReservationsConnection(FakeConnection):
+    # Books and reservations in plain dicts. Books in locked are skipped by
+    # the SKIP LOCKED read, as if another transaction held them.
+    HANDLERS = (
+        (r"^SELECT reservation_id, user_id FROM book_reservations WHERE book_id = %s AND status = 'Queued'", 'queue_head'),
+        (r"^UPDATE book_reservations SET status = 'Active'", 'activate'),
+        (r"^UPDATE books SET status = %s WHERE book_id = %s$", 'set_book_status'),
+        (r"^SELECT reservation_id, book_id FROM book_reservations WHERE status = 'Active' AND hold_expires_at < %s", 'due_holds'),
+        (r"^SELECT book_id, status FROM books WHERE book_id IN \(.*\) .*FOR UPDATE SKIP LOCKED$", 'lock_books'),
+        (r"^UPDATE book_reservations SET status = 'Expired'", 'expire'),
+        (r"^SELECT 1 FROM book_reservations WHERE book_id = %s AND status = 'Active'", 'active_hold'),
+    )
+    
+    def __init__(self, books, reservations, locked=()):
+        super().__init__()
+        self.books = books
+        self.reservations = reservations
+        self.locked = set(locked)
+    
+    def queue_head(self, params):
+        queued = [r for r in self.reservations if r['book_id'] == params[0] and r['status'] == 'Queued']
+        queued.sort(key=lambda r: (r['created_at'], r['reservation_id']))
+        self.rows = [(r['reservation_id'], r['user_id']) for r in queued[:1]]
+    
+    def activate(self, params):
+        expires, reservation_id = params
+        for r in self.reservations:
+            if r['reservation_id'] == reservation_id:
+                r['status'], r['hold_expires_at'] = 'Active', expires
+                self.rowcount += 1
+    
+    def set_book_status(self, params):
+        self.books[params[1]] = params[0]
+        self.rowcount = 1
+    
+    def due_holds(self, params):
+        now, limit = params
+        due = sorted((r for r in self.reservations if r['status'] == 'Active' and r['hold_expires_at'] < now),
+                     key=lambda r: r['hold_expires_at'])
+        self.rows = [(r['reservation_id'], r['book_id']) for r in due[:limit]]
+    
+    def lock_books(self, params):
+        self.rows = [(book_id, self.books[book_id]) for book_id in params
+                     if book_id in self.books and book_id not in self.locked]
+    
+    def expire(self, params):
+        reservation_id, now = params
+        for r in self.reservations:
+            if r['reservation_id'] == reservation_id and r['status'] == 'Active' and r['hold_expires_at'] < now:
+                r['status'] = 'Expired'
+                self.rowcount += 1
+    
+    def active_hold(self, params):
+        self.rows = [(1,) for r in self.reservations if r['book_id'] == params[0] and r['status'] == 'Active'][:1]
+
+
+def reservation(number, book_id, status, created_at, hold_expires_at=None):
+    return {'reservation_id': f"r{number}", 'book_id': book_id, 'user_id': f"u{number}",
+            'status': status, 'created_at': created_at, 'hold_expires_at': hold_expires_at}
+
+
+def test_assign_next():
+    print("Testing Reservation Queue Assignment...")
+    
+    now = datetime(2025, 9, 10, 12, 0)
+    reservations = [
+        reservation(1, 'b1', 'Queued', now - timedelta(hours=1)),
+        reservation(2, 'b1', 'Queued', now - timedelta(hours=3)),
+        reservation(3, 'b1', 'Fulfilled', now - timedelta(hours=5))
+    ]
+    connection = FakeReservationsConnection({'b1': 'Borrowed', 'b2': 'Borrowed'}, reservations)
+    
+    # The oldest queued reservation gets the copy, whatever the insert order.
+    assert ReservationQueue.assign_next(connection, 'b1', 'Borrowed', now) == 'u2'
+    assert connection.books['b1'] == 'Reserved'
+    assert reservations[1]['status'] == 'Active'
+    assert reservations[1]['hold_expires_at'] == ReservationQueue.hold_expiry(now)
+    assert reservations[0]['status'] == 'Queued'
+    
+    # Nobody waiting: the copy goes back on the shelf.
+    assert ReservationQueue.assign_next(connection, 'b2', 'Borrowed', now) is None
+    assert connection.books['b2'] == 'Available'
+    print(f"Counters: {connection.counters}")
+    assert connection.counters == {'Borrowed': -2, 'Reserved': 1, 'Available': 1}
+    
+    print("Reservation queue assignment test completed!")
+
+
+def test_expire_holds():
+    print("\nTesting Reservation Hold Expiry...")
+    
+    now = datetime(2025, 9, 10, 12, 0)
+    expired_at = now - timedelta(hours=1)
+    reservations = [
+        reservation(1, 'b1', 'Active', now - timedelta(days=4), expired_at),
+        reservation(2, 'b1', 'Queued', now - timedelta(days=2)),
+        reservation(3, 'b2', 'Active', now - timedelta(days=4), expired_at),
+        reservation(4, 'b3', 'Active', now - timedelta(days=4), expired_at),
+        reservation(5, 'b4', 'Active', now - timedelta(days=1), now + timedelta(days=2))
+    ]
+    books = {'b1': 'Reserved', 'b2': 'Reserved', 'b3': 'Reserved', 'b4': 'Reserved'}
+    connection = FakeReservationsConnection(books, reservations, locked={'b3'})
+    with use_connection(connection):
+        expired = ReservationQueue.expire_holds(now=now, batch_size=1)
+        print(f"Expired holds: {expired}")
+        assert expired == 2
+        assert [r['status'] for r in reservations] == ['Expired', 'Active', 'Expired', 'Active', 'Active']
+        # b1 passed to the next in its queue, b2 went back on the shelf and
+        # b3, locked by another transaction, is left for the next run.
+        assert books == {'b1': 'Reserved', 'b2': 'Available', 'b3': 'Reserved', 'b4': 'Reserved'}
+        
+        connection.locked.clear()
+        assert ReservationQueue.expire_holds(now=now, batch_size=1) == 1
+        assert books['b3'] == 'Available'
+        assert ReservationQueue.expire_holds(now=now) == 0
+    
+    print("Reservation hold expiry test completed!")
+
+
+if __name__ == "__main__":
+    test_assign_next()
+    test_expire_holds()
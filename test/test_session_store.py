@@ -0,0 +1,113 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import time
+from flask import Flask, session
+from app.utils.session_store import MemorySessionBackend, SQLiteSessionBackend, ServerSessionInterface, SessionStore
+
+
+def make_app():
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.session_interface = ServerSessionInterface()
+    
+    @app.route('/login/<user_id>/<role>')
+    def login(user_id, role):
+        session['user_id'] = user_id
+        session['user_name'] = f"User {user_id}"
+        session['user_email'] = f"{user_id}@lms.test"
+        session['user_role'] = role
+        return 'ok'
+    
+    @app.route('/whoami')
+    def whoami():
+        return f"{session.get('user_id')}:{session.get('user_role')}"
+    
+    @app.route('/logout')
+    def logout():
+        session.clear()
+        return 'bye'
+    
+    return app
+
+
+def session_cookie(client):
+    cookie = client.get_cookie('session')
+    return cookie.value if cookie else None
+
+
+def test_server_side_session():
+    print("Testing Server-Side Session...")
+    
+    SessionStore.set_backend(MemorySessionBackend())
+    client = make_app().test_client()
+    
+    client.get('/login/u1/Student')
+    sid = session_cookie(client)
+    print(f"Cookie value: {sid}")
+    assert sid and len(sid) < 64
+    assert client.get('/whoami').text == 'u1:Student'
+    
+    # Only the id is persisted; name, email and role come from the User cache.
+    raw, _ = SessionStore.get_backend().load(sid)
+    assert 'user_role' not in raw
+    
+    client.get('/login/u2/Librarian')
+    assert session_cookie(client) != sid
+    assert SessionStore.get_backend().load(sid) is None
+    
+    client.get('/logout')
+    assert session_cookie(client) is None
+    assert client.get('/whoami').text == 'None:None'
+    
+    print("Server-side session test completed!")
+
+
+def test_revoke_user():
+    print("\nTesting Session Revocation...")
+    
+    SessionStore.set_backend(MemorySessionBackend())
+    app = make_app()
+    first, second, other = app.test_client(), app.test_client(), app.test_client()
+    first.get('/login/u1/Student')
+    second.get('/login/u1/Student')
+    other.get('/login/u3/Student')
+    
+    revoked = SessionStore.revoke_user('u1')
+    print(f"Revoked sessions: {revoked}")
+    assert revoked == 2
+    assert first.get('/whoami').text == 'None:None'
+    assert second.get('/whoami').text == 'None:None'
+    assert other.get('/whoami').text == 'u3:Student'
+    
+    print("Session revocation test completed!")
+
+
+def test_sqlite_backend():
+    print("\nTesting SQLite Session Backend...")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        backend = SQLiteSessionBackend(os.path.join(directory, 'sessions.sqlite3'))
+        backend.save('a', '{"user_id": "u1"}', 'u1', 60)
+        backend.save('b', '{"user_id": "u1"}', 'u1', 60)
+        backend.save('c', '{}', None, -1)
+        
+        data, expires_at = backend.load('a')
+        assert data == '{"user_id": "u1"}'
+        assert expires_at > time.time()
+        assert backend.load('c') is None
+        
+        backend.touch('a', 120)
+        assert backend.load('a')[1] > expires_at
+        assert sorted(backend.delete_user('u1')) == ['a', 'b']
+        assert backend.load('a') is None
+    
+    print("SQLite session backend test completed!")
+
+
+if __name__ == "__main__":
+    test_server_side_session()
+    test_revoke_user()
+    test_sqlite_backend()
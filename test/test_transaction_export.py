@@ -0,0 +1,93 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+from datetime import date
+from decimal import Decimal
+from app.models.issued_book import IssuedBook
+from app.utils.export import csv_stream, ndjson_stream
+from fake_db import FakeConnection, use_connection
+
+
+class FakeHistoryConnection(FakeConnection):
+    # An unbuffered cursor over transaction ids; records each fetchmany size
+    # and whether the connection was closed or discarded.
+    HANDLERS = (
+        (r"^SET SESSION net_write_timeout", None),
+        (r"^SELECT t.TransactionID, .* FROM transaction t .* ORDER BY t.ReturnDate, t.TransactionID$", 'history'),
+    )
+    
+    def __init__(self, transaction_ids):
+        super().__init__()
+        self.pending = [{'TransactionID': transaction_id} for transaction_id in transaction_ids]
+        self.fetches = []
+        self.closes = 0
+        self.discarded = False
+    
+    def history(self, params):
+        self.rows = self.pending
+    
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        self.fetches.append(len(batch))
+        return batch
+    
+    def close(self):
+        self.closes += 1
+    
+    def discard(self):
+        self.discarded = True
+
+
+def test_export_streams():
+    print("Testing Transaction Export Streams...")
+    
+    def rows():
+        for number in range(5):
+            yield {'TransactionID': number, 'ReturnDate': date(2025, 8, number + 1), 'Fine': Decimal('2.50')}
+    
+    columns = ('TransactionID', 'ReturnDate', 'Fine')
+    chunks = list(csv_stream(rows(), columns, rows_per_chunk=2))
+    print(f"CSV chunks: {len(chunks)}")
+    lines = ''.join(chunks).splitlines()
+    assert lines[0] == 'TransactionID,ReturnDate,Fine'
+    assert lines[1] == '0,2025-08-01,2.50'
+    assert len(lines) == 6
+    
+    records = [json.loads(line) for line in ''.join(ndjson_stream(rows(), columns, rows_per_chunk=2)).splitlines()]
+    assert records[4] == {'TransactionID': 4, 'ReturnDate': '2025-08-05', 'Fine': '2.50'}
+    
+    print("Transaction export stream test completed!")
+
+
+def test_transaction_history_iterator():
+    print("\nTesting Transaction History Iterator...")
+    
+    connection = FakeHistoryConnection(range(1, 8))
+    with use_connection(connection):
+        exported = [row['TransactionID'] for row in
+                    IssuedBook.iter_transaction_history(date(2025, 1, 1), date(2025, 12, 31), batch_size=3)]
+    print(f"Exported {exported} in fetches of {connection.fetches}")
+    assert exported == list(range(1, 8))
+    assert connection.fetches == [3, 3, 1, 0]
+    query, params = connection.statements[1]
+    assert params == (date(2025, 1, 1), date(2026, 1, 1))
+    assert connection.closes == 2 and not connection.discarded
+    
+    # A client that disconnects mid-export closes the generator early; the
+    # half-read result set is dropped with the connection, not drained.
+    connection = FakeHistoryConnection(range(1, 8))
+    with use_connection(connection):
+        rows = IssuedBook.iter_transaction_history(batch_size=3)
+        assert next(rows)['TransactionID'] == 1
+        rows.close()
+    assert connection.discarded and connection.closes == 0
+    assert connection.fetches == [3]
+    
+    print("Transaction history iterator test completed!")
+
+
+if __name__ == "__main__":
+    test_export_streams()
+    test_transaction_history_iterator()